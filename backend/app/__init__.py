@@ -44,3 +44,31 @@ def create_app():
         return {"name": "the-nanner-planner-backend", "status": "ok"}
 
     return app
+
+
+def warm():
+    """Load the heavy dependencies that `create_app()` leaves for first use.
+
+    Importing the agent runtime (Gemini SDK and tools) and the schedule renderer
+    (matplotlib, if configured) costs over a second; without this the first chat
+    or schedule request pays it. Call it once in a pre-fork server's parent
+    (e.g. `gunicorn --preload` with APP_PRELOAD=1) so every worker inherits the
+    loaded modules.
+
+    The render worker processes are not started here: a pre-fork parent never
+    renders, so each server process starts its own pool once it is serving
+    (`gunicorn.conf.py`'s `post_fork`, or `asgi.py`), or on its first render.
+    """
+    import os
+
+    from .agent import agent
+    from .agent.tools.rmp_tool import get_rmp_client
+    from .services.schedule_render import render_schedule
+
+    # The client reads GOOGLE_API_KEY/GEMINI_API_KEY and refuses to build without one
+    if os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY"):
+        agent.get_genai_client()
+    get_rmp_client()
+    # Rendering once loads the configured renderer (matplotlib's Agg backend and
+    # font cache, or Pillow and its fonts)
+    render_schedule([], cache=False)
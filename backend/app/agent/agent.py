@@ -1,29 +1,133 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Mapping, Sequence
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
-from app.services.rmp import RMPClient
-from app.agent.tools import ALL_TOOL_DECLARATIONS, ALL_TOOL_HANDLERS
-
-_MODEL_NAME = "gemini-2.5-flash"
+from app.agent import memo, replay, telemetry
+from app.agent.compaction import HistoryCompactor
+from app.agent.context_cache import ContextCache
+from app.agent.prefetch import Prefetcher
+from app.agent.response_cache import ResponseCache, ResponseKey
+from app.agent.routing import ModelRouter
+from app.agent.tools import ALL_TOOL_DECLARATIONS, ALL_TOOL_HANDLERS, data_version
+from app.agent.tools.projection import project_tool_output
+from app.services import deadline
+
+_MODEL_NAME = os.getenv("AGENT_MODEL_FULL", "gemini-2.5-flash")
 _MAX_TOOL_INTERACTIONS = 50
-
-genai_client = genai.Client()  # Assumes GOOGLE_API_KEY is set
+# Consecutive rounds made up only of calls already answered this turn before
+# the model is made to answer with what it has
+_MAX_REPEATED_TOOL_ROUNDS = 2
+_MAX_PARALLEL_TOOL_CALLS = 8
+
+# Created on first use by get_genai_client(), so importing this module needs no API key
+genai_client: genai.Client | None = None
+_genai_client_lock = threading.Lock()
 tools = types.Tool(function_declarations=ALL_TOOL_DECLARATIONS)
 config = types.GenerateContentConfig(tools=[tools])
 
+# Wall-clock budget for one turn, shared by every model and tool call in it (0 disables)
+_TURN_DEADLINE_SECONDS = float(os.getenv("AGENT_TURN_DEADLINE_SECONDS", "45"))
+# Kept back from tools and planning calls so there is always time for a final answer
+_FINAL_ANSWER_RESERVE_SECONDS = float(os.getenv("AGENT_FINAL_ANSWER_RESERVE_SECONDS", "8"))
+# The final answer may not call tools; it is sent without the context cache,
+# which cannot be combined with a per-request tool_config
+_final_config = types.GenerateContentConfig(
+    tools=[tools],
+    tool_config=types.ToolConfig(
+        function_calling_config=types.FunctionCallingConfig(mode=types.FunctionCallingConfigMode.NONE)
+    ),
+)
+_FINAL_ANSWER_NOTE = (
+    "(Time is nearly up for this reply. Answer now with the information gathered so far, "
+    "without calling any tools. If something could not be looked up in time, say so briefly.)"
+)
+_DEADLINE_FALLBACK_REPLY = "Sorry, that took me longer than expected. Could you ask me again?"
+_DEADLINE_EVENT = {"type": "deadline", "message": "Answered early to stay within the turn's time limit."}
+_TOOL_LOOP_NOTE = (
+    "(You are repeating tool calls you already made for this reply, and they return the same "
+    "results. Answer now with the information gathered so far, without calling any tools.)"
+)
+_TOOL_LOOP_FALLBACK_REPLY = "Sorry, I couldn't work that out. Could you rephrase the question?"
+_TOOL_LOOP_EVENT = {"type": "tool_loop", "message": "Stopped repeating identical tool calls."}
+# Why the tool loop ended early -> (note to the model, event, reply if the model gives none)
+_FINAL_ANSWER_REASONS = {
+    "deadline": (_FINAL_ANSWER_NOTE, _DEADLINE_EVENT, _DEADLINE_FALLBACK_REPLY),
+    "tool_loop": (_TOOL_LOOP_NOTE, _TOOL_LOOP_EVENT, _TOOL_LOOP_FALLBACK_REPLY),
+}
+_DUPLICATE_CALL_NOTE = "Already called with these arguments for this reply; this is the same result as before."
+# Raised by a model call that ran past its share of the deadline
+_MODEL_TIMEOUTS = (TimeoutError, httpx.TimeoutException)
+
+# Explicit context caching of the static conversation prefix and tool schema
+_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "1") == "1"
+_context_cache = ContextCache(ttl_seconds=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600")))
+
+# Warm caches for the likely next tool calls in the background
+_PREFETCH_ENABLED = os.getenv("AGENT_PREFETCH", "1") == "1"
+_prefetcher = Prefetcher(max_pending=int(os.getenv("AGENT_PREFETCH_MAX_PENDING", "8")))
+
+# Send chit-chat and answer phrasing to a faster model, planning to the full one
+_ROUTING_ENABLED = os.getenv("AGENT_ROUTING", "1") == "1"
+_router = ModelRouter(
+    fast_model=os.getenv("AGENT_MODEL_FAST", "gemini-2.5-flash-lite"),
+    chitchat_max_chars=int(os.getenv("AGENT_ROUTING_CHITCHAT_MAX_CHARS", "160")),
+)
+
+# Serve repeated opening questions without running the tool loop
+_RESPONSE_CACHE_ENABLED = os.getenv("AGENT_RESPONSE_CACHE", "1") == "1"
+_response_cache = ResponseCache(
+    ttl_seconds=int(os.getenv("AGENT_RESPONSE_CACHE_TTL_SECONDS", "900")),
+    max_entries=int(os.getenv("AGENT_RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    similarity=float(os.getenv("AGENT_RESPONSE_CACHE_SIMILARITY", "1.0")),
+)
+# Replies that used these tools are never cached (each call renders a new schedule)
+_UNCACHEABLE_TOOLS = {"generate_schedule"}
+
+# Digest consumed tool output and summarize old turns as conversations grow
+_COMPACTION_ENABLED = os.getenv("AGENT_COMPACTION", "1") == "1"
+_compactor = HistoryCompactor(
+    trigger_tokens=int(os.getenv("AGENT_COMPACTION_TRIGGER_TOKENS", "6000")),
+    token_budget=int(os.getenv("AGENT_HISTORY_TOKEN_BUDGET", "12000")),
+    keep_recent_turns=int(os.getenv("AGENT_COMPACTION_KEEP_TURNS", "3")),
+)
+
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
 ToolHandler = Callable[[ToolPayload], ToolResult]
 
 TOOL_HANDLERS: dict[str, ToolHandler] = ALL_TOOL_HANDLERS
 
+# Shared pool for running the function calls of one model response in parallel
+_tool_executor = ThreadPoolExecutor(
+    max_workers=_MAX_PARALLEL_TOOL_CALLS,
+    thread_name_prefix="agent-tool",
+)
+
 print(f"Available tools: {list(TOOL_HANDLERS.keys())}")
 
 
+def get_genai_client() -> genai.Client:
+    """Return the shared Gemini client, creating it on first use."""
+    global genai_client
+    if genai_client is None:
+        with _genai_client_lock:
+            if genai_client is None:
+                genai_client = genai.Client()  # Assumes GOOGLE_API_KEY is set
+    return genai_client
+
+
 def _coerce_message_to_content(message: Mapping[str, Any]) -> types.Content:
     """Normalize a conversation item into a `types.Content` instance."""
     role = message.get("role")
@@ -46,107 +150,573 @@ def _coerce_message_to_content(message: Mapping[str, Any]) -> types.Content:
     return types.Content(role=role, parts=parts)
 
 
+def _prepare_conversation(conversation_history: Sequence[Mapping[str, Any]]) -> list[types.Content]:
+    """Validate a conversation and convert it into `types.Content` items."""
+    if not conversation_history:
+        raise ValueError("conversation_history cannot be empty.")
+
+    last_message = conversation_history[-1]
+    if last_message.get("role") != "user":
+        raise ValueError("The final conversation message must come from the user.")
+
+    return [_coerce_message_to_content(item) for item in conversation_history]
+
+
+def turn_deadline() -> contextlib.AbstractContextManager[deadline.Deadline | None]:
+    """Bound the enclosed agent turn by AGENT_TURN_DEADLINE_SECONDS.
+
+    A deadline the caller already set still applies if it ends sooner.
+    """
+    return deadline.within(_TURN_DEADLINE_SECONDS or None)
+
+
+def _bounded(request_config: types.GenerateContentConfig, reserve: float) -> types.GenerateContentConfig:
+    """`request_config` with an HTTP timeout for the time left in the turn, if any.
+
+    Raises DeadlineExceeded if no time is left after `reserve`.
+    """
+    seconds = deadline.timeout(None, reserve)
+    if seconds is None:
+        return request_config
+    timeout_ms = max(1, int(seconds * 1000))
+    return request_config.model_copy(update={"http_options": types.HttpOptions(timeout=timeout_ms)})
+
+
+def _request_args(
+    model: str,
+    conversation: list[types.Content],
+    cached_prefix: int,
+    final: bool = False,
+) -> tuple[list[types.Content], types.GenerateContentConfig, str | None]:
+    """Build `(contents, config, cache_key)` for a model call.
+
+    When the first `cached_prefix` items can be served from a context cache,
+    only the rest of the conversation is sent and the tools travel with the
+    cache instead of the request. A `final` call has tools switched off and
+    may use the time reserved for it; every other call must leave that
+    reserve untouched.
+    """
+    if final:
+        return conversation, _bounded(_final_config, 0.0), None
+
+    reserve = _FINAL_ANSWER_RESERVE_SECONDS
+    if _CONTEXT_CACHE_ENABLED and 0 < cached_prefix < len(conversation):
+        # Creating or refreshing the cache counts against the turn's deadline too
+        timeout = deadline.timeout(None, reserve)
+        cached = _context_cache.get(get_genai_client(), model, conversation[:cached_prefix], [tools], timeout)
+        if cached is not None:
+            cache_key, cache_name = cached
+            cached_config = types.GenerateContentConfig(cached_content=cache_name)
+            return conversation[cached_prefix:], _bounded(cached_config, reserve), cache_key
+    return conversation, _bounded(config, reserve), None
+
+
+def _generate_content(
+    model: str,
+    conversation: list[types.Content],
+    cached_prefix: int,
+    tier: str = "full",
+) -> types.GenerateContentResponse:
+    """Call the model, falling back to a full request if the cache was rejected."""
+    with telemetry.model_span(model, tier) as span:
+        contents, request_config, cache_key = _request_args(model, conversation, cached_prefix, tier == "final")
+        span.sent()
+        try:
+            response = get_genai_client().models.generate_content(
+                model=model,
+                contents=contents,
+                config=request_config,
+            )
+        except genai_errors.ClientError as exc:
+            if cache_key is None or not _context_cache.rejects_handle(exc):
+                raise
+            _context_cache.invalidate(cache_key)
+            response = get_genai_client().models.generate_content(
+                model=model,
+                contents=conversation,
+                config=_bounded(config, _FINAL_ANSWER_RESERVE_SECONDS),
+            )
+        span.first_byte()
+        span.usage(response.usage_metadata)
+        replay.capture_model(response)
+        return response
+
+
+def _generate_content_stream(
+    model: str,
+    conversation: list[types.Content],
+    cached_prefix: int,
+    turn: deadline.Deadline | None = None,
+) -> Iterator[types.GenerateContentResponse]:
+    """Streaming counterpart of `_generate_content`.
+
+    A context variable cannot be held across yields, so the turn's deadline is
+    passed in and bound only while the request is being set up.
+    """
+    with telemetry.model_span(model) as span:
+        with deadline.bind(turn):
+            contents, request_config, cache_key = _request_args(model, conversation, cached_prefix)
+            span.sent()
+            try:
+                stream = get_genai_client().models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=request_config,
+                )
+                first_chunk = next(stream, None)
+            except genai_errors.ClientError as exc:
+                if cache_key is None or not _context_cache.rejects_handle(exc):
+                    raise
+                _context_cache.invalidate(cache_key)
+                stream = get_genai_client().models.generate_content_stream(
+                    model=model,
+                    contents=conversation,
+                    config=_bounded(config, _FINAL_ANSWER_RESERVE_SECONDS),
+                )
+                first_chunk = next(stream, None)
+        span.first_byte()
+
+        if first_chunk is None:
+            return
+        chunks = []
+        for chunk in itertools.chain([first_chunk], stream):
+            if chunk.usage_metadata is not None:
+                span.usage(chunk.usage_metadata)
+            chunks.append(chunk)
+            yield chunk
+        replay.capture_model(*chunks)
+
+
+def _compact(conversation: list[types.Content], cached_prefix: int, prompt_tokens: int | None) -> None:
+    """Shrink the uncached part of the conversation before the next model call."""
+    if _COMPACTION_ENABLED:
+        _compactor.maybe_compact(conversation, start=cached_prefix, prompt_tokens=prompt_tokens)
+
+
+def _uncached_prompt_tokens(usage: types.GenerateContentResponseUsageMetadata | None) -> int | None:
+    """Prompt tokens of a call that were not served from the context cache."""
+    if usage is None or usage.prompt_token_count is None:
+        return None
+    return usage.prompt_token_count - (usage.cached_content_token_count or 0)
+
+
+def _route(model: str, conversation: list[types.Content], escalated: bool = False) -> tuple[str, str]:
+    """Pick `(model, tier)` for the next call; `model` is the full tier."""
+    if not _ROUTING_ENABLED:
+        return model, "full"
+    return _router.route(conversation, full_model=model, escalated=escalated)
+
+
+def _response_key(conversation: list[types.Content], model: str, cached_prefix: int) -> ResponseKey | None:
+    if not _RESPONSE_CACHE_ENABLED:
+        return None
+    return _response_cache.key(conversation, start=cached_prefix, model=model, data_version=data_version())
+
+
+def _cached_response(
+    key: ResponseKey | None,
+    tool_events: list[dict[str, Any]] | None,
+) -> tuple[str, str] | None:
+    """Return `(reply, chat)` for a cached opener, replaying its tool events."""
+    if key is None:
+        return None
+    cached = _response_cache.get(key)
+    telemetry.record_response_cache(cached is not None)
+    if cached is None:
+        return None
+    if tool_events is not None:
+        tool_events.extend(cached.events)
+    return cached.reply, cached.chat
+
+
+def _cacheable(events: list[dict[str, Any]]) -> bool:
+    """False for replies that rendered a schedule or were cut short (deadline, repeated calls)."""
+    for event in events:
+        if event.get("type") in ("deadline", "tool_loop"):
+            return False
+        if event.get("type") != "tool_call":
+            continue
+        if event.get("name") in _UNCACHEABLE_TOOLS:
+            return False
+        output = event.get("output")
+        if isinstance(output, dict) and output.get("timed_out"):
+            return False
+    return True
+
+
+def _store_response(key: ResponseKey | None, reply: str, chat: str, events: list[dict[str, Any]]) -> None:
+    if key is None:
+        return
+    if not _cacheable(events):
+        _response_cache.skip()
+        return
+    _response_cache.put(key, reply, chat, events)
+
+
+def response_cache_stats() -> dict[str, int]:
+    return _response_cache.stats()
+
+
+def compaction_stats() -> dict[str, int]:
+    """Running totals of history compaction for this process."""
+    return _compactor.stats()
+
+
+def _resolve_function_calls(
+    function_calls: Sequence[types.FunctionCall],
+) -> list[tuple[str, ToolHandler, dict[str, Any]]]:
+    """Look up the handler and arguments for each function call."""
+    calls: list[tuple[str, ToolHandler, dict[str, Any]]] = []
+    for function_call in function_calls:
+        function_name = function_call.name
+        call_args = dict(function_call.args or {})
+        print(f"Agent called function {function_name} with args {call_args}")
+
+        handler = TOOL_HANDLERS.get(function_name)
+        if handler is None:
+            raise ValueError(f"Unsupported function call: {function_name}")
+        calls.append((function_name, handler, call_args))
+    return calls
+
+
+def _call_tool(
+    function_name: str,
+    handler: ToolHandler,
+    call_args: dict[str, Any],
+    submitted_at: float | None = None,
+) -> tuple[dict[str, Any], ToolResult, str | None]:
+    """Run one tool handler inside a telemetry span.
+
+    A call already made this turn (see `memo`) is answered from the turn's
+    memo, with a note for the model and no second chat block. A handler that
+    raises is reported to the model as an error result for that call only.
+    """
+    turn_memo = memo.current()
+    duplicate = False
+    with telemetry.tool_span(function_name, submitted_at) as span:
+        try:
+            if turn_memo is None:
+                tool_output, chat = handler(call_args)
+            else:
+                (tool_output, chat), duplicate = turn_memo.call(
+                    function_name, call_args, lambda: handler(call_args), timeout=deadline.remaining()
+                )
+        except TimeoutError:
+            # Out of time: the model answers without this result rather than the turn failing
+            span.error = True
+            tool_output, chat = _timed_out_result(function_name), None
+        except Exception as exc:
+            # One failing tool must not take down the calls running beside it
+            span.error = True
+            tool_output, chat = _failed_result(function_name, exc), None
+        if duplicate:
+            telemetry.record_cache(hit=True)
+    if duplicate:
+        return call_args, _duplicate_result(tool_output), None
+    replay.capture_tool(function_name, call_args, tool_output, chat)
+    return call_args, tool_output, chat
+
+
+def _duplicate_result(tool_output: ToolResult) -> ToolResult:
+    if isinstance(tool_output, dict):
+        return {**tool_output, "note": _DUPLICATE_CALL_NOTE}
+    return {"output": tool_output, "note": _DUPLICATE_CALL_NOTE}
+
+
+def _repeats_only(turn_memo: memo.TurnMemo, function_calls: Sequence[types.FunctionCall]) -> bool:
+    """True if the model asked only for calls it already made this turn."""
+    return turn_memo.repeats_only((fc.name, dict(fc.args or {})) for fc in function_calls)
+
+
+def _timed_out_result(function_name: str) -> ToolResult:
+    return {
+        "timed_out": True,
+        "message": f"{function_name} did not finish in time. Answer without it.",
+    }
+
+
+def _failed_result(function_name: str, exc: Exception) -> ToolResult:
+    print(f"[warn] Tool {function_name} failed: {exc}")
+    return {"error": f"{function_name} failed: {exc}"}
+
+
+def _run_function_calls(
+    function_calls: Sequence[types.FunctionCall],
+    turn_memo: memo.TurnMemo | None = None,
+) -> list[tuple[dict[str, Any], ToolResult, str | None]]:
+    """Run every function call from one model response concurrently.
+
+    Returns `(args, output, chat)` tuples in the same order as `function_calls`.
+    Tools share the turn's deadline minus the final-answer reserve; a call
+    still running when that is up is reported to the model as timed out.
+    Calls already made this turn are answered from `turn_memo`.
+    """
+    calls = _resolve_function_calls(function_calls)
+
+    with memo.bind(turn_memo), deadline.within(deadline.remaining(_FINAL_ANSWER_RESERVE_SECONDS)):
+        if len(calls) == 1:
+            results = [_call_tool(*calls[0])]
+        else:
+            # Copy the context per call so each tool's spans land in this turn's
+            # trace and it sees the deadline and the turn's memo
+            futures = [
+                _tool_executor.submit(
+                    contextvars.copy_context().run, _call_tool, name, handler, call_args, time.perf_counter()
+                )
+                for name, handler, call_args in calls
+            ]
+            results = []
+            for (name, _, call_args), future in zip(calls, futures):
+                try:
+                    results.append(future.result(timeout=deadline.remaining()))
+                except TimeoutError:
+                    results.append((call_args, _timed_out_result(name), None))
+
+    _after_function_calls(function_calls, results)
+    return results
+
+
+def _after_function_calls(
+    function_calls: Sequence[types.FunctionCall],
+    results: Sequence[tuple[dict[str, Any], ToolResult, str | None]],
+) -> None:
+    """Kick off background work that follows tool results (prefetching).
+
+    The prefetch pool does not copy the caller's context, so prefetches are not
+    bound by the turn's deadline and their results still land in the caches.
+    """
+    if _PREFETCH_ENABLED:
+        for function_call, (_, tool_output, _) in zip(function_calls, results):
+            _prefetcher.after_tool(function_call.name, tool_output)
+
+
+def _model_content(response: types.GenerateContentResponse) -> types.Content:
+    """Return the first candidate's content, rejecting empty responses."""
+    if not response.candidates:
+        raise RuntimeError("Model returned no candidates.")
+
+    candidate = response.candidates[0]
+    content = candidate.content
+    if content is None:
+        raise RuntimeError("Model returned an empty content payload.")
+
+    parts = content.parts or []
+    if len(parts) == 0:
+        raise RuntimeError("Model returned an empty parts payload.")
+    return content
+
+
+def _apply_function_results(
+    conversation: list[types.Content],
+    function_calls: Sequence[types.FunctionCall],
+    results: Sequence[tuple[dict[str, Any], ToolResult, str | None]],
+    tool_events: list[dict[str, Any]] | None,
+) -> list[str]:
+    """Append the function responses for one model turn and record tool events.
+
+    Returns the chat markdown blocks produced by the tools, in call order.
+    """
+    chats = []
+    response_parts = []
+    for function_call, (call_args, tool_output, chat) in zip(function_calls, results):
+        function_name = function_call.name
+        if chat is not None:
+            chats.append(chat)
+
+        print(f"Tool output: {tool_output}")
+
+        if tool_events is not None:
+            _record_tool_events(tool_events, function_name, call_args, tool_output)
+
+        response_parts.append(
+            types.Part.from_function_response(
+                name=function_name,
+                response={"output": project_tool_output(function_name, tool_output)},
+            )
+        )
+
+    # All responses for this turn go back to the model together
+    conversation.append(types.Content(role="function", parts=response_parts))
+    return chats
+
+
+def _final_answer(
+    conversation: list[types.Content],
+    model: str,
+    cached_prefix: int,
+    tool_events: list[dict[str, Any]] | None,
+    reason: str = "deadline",
+) -> str:
+    """Answer from what the turn has gathered so far, with tools switched off.
+
+    Used once the turn's deadline is close (`reason="deadline"`) or the model
+    keeps repeating calls it already made (`reason="tool_loop"`). The reply is
+    appended to `conversation`; if even this call fails, a fixed apology is.
+    """
+    note, event, fallback = _FINAL_ANSWER_REASONS[reason]
+    if tool_events is not None:
+        tool_events.append(dict(event))
+    request = [*conversation, types.Content(role="user", parts=[types.Part.from_text(text=note)])]
+    try:
+        content = _model_content(_generate_content(model, request, cached_prefix, "final"))
+        text = "".join(part.text or "" for part in content.parts if part.text).strip()
+    except (*_MODEL_TIMEOUTS, RuntimeError):
+        text = ""
+    text = text or fallback
+    conversation.append(types.Content(role="model", parts=[types.Part.from_text(text=text)]))
+    return text
+
+
+def _join_chat(chat_text: str, chat: str) -> str:
+    """Append a markdown block to the accumulated chat text."""
+    if len(chat_text) > 0:
+        chat_text += "\n\n"
+    return chat_text + chat
+
+
+def _record_tool_events(
+    tool_events: list[dict[str, Any]],
+    function_name: str,
+    call_args: dict[str, Any],
+    tool_output: ToolResult,
+) -> None:
+    """Record tool call event(s) for the caller."""
+    tool_events.append({
+        "type": "tool_call",
+        "name": function_name,
+        "args": call_args,
+        "output": tool_output,
+    })
+    if function_name == "get_professor_summary":
+        prof_name = str(call_args.get("professor_name", "")).strip()
+        if prof_name.lower() == "qing hui":
+            tool_events.append({
+                "type": "rmp_professor",
+                "name": prof_name,
+                "match": True,
+            })
+
+
 def run_academic_advisor_agent(
     conversation_history: Sequence[Mapping[str, Any]],
     *,
     model: str = _MODEL_NAME,
     tool_events: list[dict[str, Any]] | None = None,
+    cached_prefix: int = 0,
 ) -> str:
     """Send a conversation to Gemini, handling tool calls until text is returned.
 
     Args:
         conversation_history: Ordered list of messages. The final message must be
             from the user and contain a "parts" sequence.
-        model: Optional override of the Gemini model name.
+        model: Optional override of the full-tier Gemini model name. Unless
+            routing is disabled (AGENT_ROUTING=0), chit-chat and phrasing the
+            answer after tool results go to AGENT_MODEL_FAST instead.
+        cached_prefix: Number of leading messages that never change between
+            requests (system preamble, transcript). These are served from a
+            Gemini context cache together with the tool schema when possible.
+            Conversations with a single student message after them are
+            openers, and their replies are cached (AGENT_RESPONSE_CACHE).
 
     Returns:
         The model's textual response once it concludes without additional tool
         calls. Never returns an empty string - raises RuntimeError if no text is produced.
     """
-    if not conversation_history:
-        raise ValueError("conversation_history cannot be empty.")
+    conversation = _prepare_conversation(conversation_history)
+    key = _response_key(conversation, model, cached_prefix)
+    cached = _cached_response(key, tool_events)
+    if cached is not None:
+        return cached
+
+    events: list[dict[str, Any]] = []
+    with turn_deadline():
+        reply_text, chat_text = _run_agent_loop(
+            conversation, model=model, tool_events=events, cached_prefix=cached_prefix
+        )
+    if tool_events is not None:
+        tool_events.extend(events)
+    _store_response(key, reply_text, chat_text, events)
+    return reply_text, chat_text
 
-    last_message = conversation_history[-1]
-    if last_message.get("role") != "user":
-        raise ValueError("The final conversation message must come from the user.")
 
-    conversation = [_coerce_message_to_content(item) for item in conversation_history]
+def run_agent_turn(
+    history: list[types.Content],
+    user_message: str,
+    *,
+    model: str = _MODEL_NAME,
+    tool_events: list[dict[str, Any]] | None = None,
+    cached_prefix: int = 0,
+) -> tuple[str, str]:
+    """Append one user message to an already parsed history and run the agent.
+
+    Unlike `run_academic_advisor_agent`, the history is not re-validated or
+    re-coerced: it is extended in place with the user message, every model and
+    function turn, and nothing else. If the turn fails, the history is rolled
+    back to how it was before the call.
+    """
+    if not user_message or not user_message.strip():
+        raise ValueError("user_message cannot be empty.")
+
+    original_length = len(history)
+    history.append(types.Content(role="user", parts=[types.Part.from_text(text=user_message)]))
+    try:
+        with turn_deadline():
+            return _run_agent_loop(
+                history, model=model, tool_events=tool_events, cached_prefix=cached_prefix
+            )
+    except BaseException:
+        del history[original_length:]
+        raise
 
+
+def _run_agent_loop(
+    conversation: list[types.Content],
+    *,
+    model: str,
+    tool_events: list[dict[str, Any]] | None,
+    cached_prefix: int = 0,
+) -> tuple[str, str]:
+    """Drive the tool loop, appending every turn to `conversation` in place.
+
+    Once the current deadline (see `turn_deadline`) leaves only the final-answer
+    reserve, or a model call runs out of its share, the model is asked for a
+    final answer without tools. So it is after `_MAX_REPEATED_TOOL_ROUNDS`
+    rounds in a row of calls the turn's memo has already answered.
+    """
     chat_text = ""
+    prompt_tokens: int | None = None
+    turn_memo = memo.TurnMemo()
+    repeated_rounds = 0
+    escalated = False
 
     for _ in range(_MAX_TOOL_INTERACTIONS):
-        response = genai_client.models.generate_content(
-            model=model,
-            contents=conversation,
-            config=config,
-        )
-
-        if not response.candidates:
-            raise RuntimeError("Model returned no candidates.")
-
-        candidate = response.candidates[0]
-        content = candidate.content
-        if content is None:
-            raise RuntimeError("Model returned an empty content payload.")
-
-        parts = content.parts or []
-        if len(parts) == 0:
-            raise RuntimeError("Model returned an empty parts payload.")
+        _compact(conversation, cached_prefix, prompt_tokens)
+        if deadline.expired(_FINAL_ANSWER_RESERVE_SECONDS):
+            return _final_answer(conversation, model, cached_prefix, tool_events), chat_text
+        try:
+            routed_model, tier = _route(model, conversation, escalated)
+            response = _generate_content(routed_model, conversation, cached_prefix, tier)
+            content = _model_content(response)
+            if _router.should_escalate(tier, content):
+                # The fast tier wants tools, so this is planning after all
+                escalated = True
+                response = _generate_content(model, conversation, cached_prefix, "escalated")
+                content = _model_content(response)
+        except _MODEL_TIMEOUTS:
+            return _final_answer(conversation, model, cached_prefix, tool_events), chat_text
+        prompt_tokens = _uncached_prompt_tokens(response.usage_metadata)
+
+        parts = content.parts
         conversation.append(content)
 
-        function_called = False
-        for part in parts:
-            function_call = part.function_call
-            if not function_call:
-                continue
-
-            function_called = True
-            function_name = function_call.name
-            call_args = dict(function_call.args or {})
-
-            # print(f"Conversation history: {conversation_history}")
-            print(f"Agent called function {function_name} with args {call_args}")
-
-            handler = TOOL_HANDLERS.get(function_name)
-            if handler is None:
-                raise ValueError(f"Unsupported function call: {function_name}")
-
-            tool_output, chat = handler(call_args)
-            if chat is not None:
-                if len(chat_text) > 0:
-                    chat_text += "\n\n"
-                chat_text += chat
-
-            print(f"Tool output: {tool_output}")
-
-            # Record tool call event(s) for the caller, if requested
-            if tool_events is not None:
-                tool_event = {
-                    "type": "tool_call",
-                    "name": function_name,
-                    "args": call_args,
-                    "output": tool_output,
-                }
-                tool_events.append(tool_event)
-                if function_name == "get_professor_summary":
-                    prof_name = str(call_args.get("professor_name", "")).strip()
-                    if prof_name.lower() == "qing hui":
-                        tool_events.append({
-                            "type": "rmp_professor",
-                            "name": prof_name,
-                            "match": True,
-                        })
-
-            response_part = types.Part.from_function_response(
-                name=function_name,
-                response={"output": tool_output},
-            )
-            conversation.append(
-                types.Content(role="function", parts=[response_part])
-            )
-            break
-
-        if function_called:
+        function_calls = [part.function_call for part in parts if part.function_call]
+        if function_calls:
+            repeated_rounds = repeated_rounds + 1 if _repeats_only(turn_memo, function_calls) else 0
+            results = _run_function_calls(function_calls, turn_memo)
+            for chat in _apply_function_results(conversation, function_calls, results, tool_events):
+                chat_text = _join_chat(chat_text, chat)
+            if repeated_rounds >= _MAX_REPEATED_TOOL_ROUNDS:
+                return _final_answer(conversation, model, cached_prefix, tool_events, "tool_loop"), chat_text
             continue
 
         text_response = "".join(part.text or "" for part in parts if part.text)
@@ -160,4 +730,160 @@ def run_academic_advisor_agent(
 
     raise RuntimeError(
         f"Exceeded maximum of {_MAX_TOOL_INTERACTIONS} tool interactions without a text response."
-    )
\ No newline at end of file
+    )
+
+
+def stream_academic_advisor_agent(
+    conversation_history: Sequence[Mapping[str, Any]],
+    *,
+    model: str = _MODEL_NAME,
+    cached_prefix: int = 0,
+) -> Iterator[dict[str, Any]]:
+    """Streaming variant of `run_academic_advisor_agent`.
+
+    Yields events as they happen instead of returning once the tool loop ends:
+
+    - `{"type": "text", "delta": str}` for each chunk of model text
+    - `{"type": "tool_call_start", "name": str, "args": dict}` before a tool runs
+    - the same tool events `run_academic_advisor_agent` records (`tool_call`,
+      `rmp_professor`) once a tool finishes
+    - `{"type": "chat", "markdown": str}` for each markdown block a tool produces
+    - `{"type": "deadline", "message": str}` if the turn ran short of time and
+      the reply was produced without further tool calls
+    - `{"type": "tool_loop", "message": str}` likewise, if the model kept
+      repeating calls it had already made
+    - `{"type": "done", "reply": str, "chat": str}` as the final event
+
+    The conversation is validated eagerly, so a ValueError is raised here rather
+    than on the first iteration. The turn deadline starts here too.
+    """
+    conversation = _prepare_conversation(conversation_history)
+    # Only resolve the deadline here; the generator binds it around each step
+    with turn_deadline() as turn:
+        pass
+    return _stream_agent_loop(conversation, model=model, cached_prefix=cached_prefix, turn=turn)
+
+
+def _stream_final_answer(
+    conversation: list[types.Content],
+    model: str,
+    cached_prefix: int,
+    turn: deadline.Deadline | None,
+    chat_text: str,
+    reason: str = "deadline",
+) -> Iterator[dict[str, Any]]:
+    """Stream the events of `_final_answer` once the tool loop has to stop."""
+    events: list[dict[str, Any]] = []
+    with deadline.bind(turn):
+        reply = _final_answer(conversation, model, cached_prefix, events, reason)
+    yield from events
+    yield {"type": "text", "delta": reply}
+    yield {"type": "done", "reply": reply, "chat": chat_text}
+
+
+def _stream_agent_loop(
+    conversation: list[types.Content],
+    *,
+    model: str,
+    cached_prefix: int = 0,
+    turn: deadline.Deadline | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Drive the streaming tool loop for `stream_academic_advisor_agent`.
+
+    `turn` is bound around each blocking step rather than across the whole
+    generator, since the consumer may resume it from another context.
+
+    Every call goes to `model`, without tier routing: a fast-tier call that
+    turns out to want tools has already streamed its text, so it could only be
+    escalated by buffering the reply, which is what streaming avoids.
+    """
+    chat_text = ""
+    prompt_tokens: int | None = None
+    turn_memo = memo.TurnMemo()
+    repeated_rounds = 0
+
+    for _ in range(_MAX_TOOL_INTERACTIONS):
+        _compact(conversation, cached_prefix, prompt_tokens)
+        if turn is not None and turn.expired(_FINAL_ANSWER_RESERVE_SECONDS):
+            yield from _stream_final_answer(conversation, model, cached_prefix, turn, chat_text)
+            return
+        stream = _generate_content_stream(model, conversation, cached_prefix, turn)
+
+        # Function calls arrive whole, text arrives in pieces; keep every part
+        # so the model turn can be replayed verbatim on the next iteration.
+        model_parts: list[types.Part] = []
+        text_response = ""
+        try:
+            for chunk in stream:
+                if chunk.usage_metadata is not None:
+                    prompt_tokens = _uncached_prompt_tokens(chunk.usage_metadata)
+                if not chunk.candidates:
+                    continue
+                content = chunk.candidates[0].content
+                if content is None or not content.parts:
+                    continue
+                for part in content.parts:
+                    model_parts.append(part)
+                    if part.text:
+                        text_response += part.text
+                        yield {"type": "text", "delta": part.text}
+        except _MODEL_TIMEOUTS:
+            if not text_response.strip():
+                yield from _stream_final_answer(conversation, model, cached_prefix, turn, chat_text)
+                return
+            # Text is already on screen: finish with it and drop any half-planned tool calls
+            model_parts = [part for part in model_parts if not part.function_call]
+
+        if len(model_parts) == 0:
+            raise RuntimeError("Model returned an empty parts payload.")
+        conversation.append(types.Content(role="model", parts=model_parts))
+
+        function_calls = [part.function_call for part in model_parts if part.function_call]
+        if function_calls:
+            for function_call in function_calls:
+                yield {
+                    "type": "tool_call_start",
+                    "name": function_call.name,
+                    "args": dict(function_call.args or {}),
+                }
+
+            repeated_rounds = repeated_rounds + 1 if _repeats_only(turn_memo, function_calls) else 0
+            with deadline.bind(turn):
+                results = _run_function_calls(function_calls, turn_memo)
+
+            response_parts = []
+            for function_call, (call_args, tool_output, chat) in zip(function_calls, results):
+                function_name = function_call.name
+                finished_events: list[dict[str, Any]] = []
+                _record_tool_events(finished_events, function_name, call_args, tool_output)
+                yield from finished_events
+
+                if chat is not None:
+                    chat_text = _join_chat(chat_text, chat)
+                    yield {"type": "chat", "markdown": chat}
+
+                response_parts.append(
+                    types.Part.from_function_response(
+                        name=function_name,
+                        response={"output": project_tool_output(function_name, tool_output)},
+                    )
+                )
+
+            conversation.append(types.Content(role="function", parts=response_parts))
+            if repeated_rounds >= _MAX_REPEATED_TOOL_ROUNDS:
+                yield from _stream_final_answer(conversation, model, cached_prefix, turn, chat_text, "tool_loop")
+                return
+            continue
+
+        text_response = text_response.strip()
+
+        # Never finish on an empty reply - continue the loop to get a proper response
+        if not text_response:
+            continue
+
+        yield {"type": "done", "reply": text_response, "chat": chat_text}
+        return
+
+    raise RuntimeError(
+        f"Exceeded maximum of {_MAX_TOOL_INTERACTIONS} tool interactions without a text response."
+    )
@@ -2,17 +2,27 @@
 from __future__ import annotations
 
 from dataclasses import asdict
-from typing import Any, Literal, Sequence, TypedDict
+from typing import TYPE_CHECKING, Any, Literal, Sequence, TypedDict
 
-from agents import Agent, WebSearchTool, Runner, ItemHelpers, Session, RunResult
+if TYPE_CHECKING:
+    from agents import Agent, RunResult, Session
 
+# The OpenAI Agents SDK is slow to import, so it is only loaded on first use
+_agent: Agent | None = None
 
-agent = Agent(
-    name="Academic Advisor",
-    instructions="You provide academic advice and assistance to college students. You are given a student's transcript and you need to help them plan their courses for the next semester.",
-    tools=[WebSearchTool()],
-    model="gpt-5",
-)
+
+def _get_agent() -> Agent:
+    global _agent
+    if _agent is None:
+        from agents import Agent, WebSearchTool
+
+        _agent = Agent(
+            name="Academic Advisor",
+            instructions="You provide academic advice and assistance to college students. You are given a student's transcript and you need to help them plan their courses for the next semester.",
+            tools=[WebSearchTool()],
+            model="gpt-5",
+        )
+    return _agent
 
 
 ROLE_ALIASES: dict[str, str] = {
@@ -61,6 +71,8 @@ def _to_response_items(chat_history: Sequence[ChatMessage]) -> list[dict[str, st
 
 def _extract_final_reply(run_result: RunResult) -> str:
     """Return the advisor's textual reply from a run result."""
+    from agents import ItemHelpers
+
     final_output = run_result.final_output
 
     if isinstance(final_output, str) and final_output.strip():
@@ -123,10 +135,12 @@ def get_advisor_completion(
     if not chat_history:
         raise ValueError("chat_history cannot be empty when requesting a completion.")
 
+    from agents import Runner
+
     response_items = _to_response_items(chat_history)
 
     run_result = Runner.run_sync(
-        starting_agent=agent,
+        starting_agent=_get_agent(),
         input=response_items,
         context=context,
         max_turns=max_turns,
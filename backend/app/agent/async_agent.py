@@ -0,0 +1,228 @@
+"""Asyncio runtime for the academic advisor agent.
+
+Same tool loop as `app.agent.agent`, but model calls go through the async
+Gemini client, so a turn that is waiting on the model holds no thread. Served
+from the ASGI app (`asgi.py`), one process can keep hundreds of advising turns
+in flight. Tools with a native coroutine handler are awaited directly; the
+rest are blocking `requests`-based handlers and run on a bounded thread pool.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from google.genai import types
+
+from app.agent import agent, memo, replay, telemetry
+from app.agent.tools import ALL_ASYNC_TOOL_HANDLERS
+from app.services import deadline
+
+AsyncToolHandler = Callable[[agent.ToolPayload], Awaitable[tuple[agent.ToolResult, str | None]]]
+
+ASYNC_TOOL_HANDLERS: dict[str, AsyncToolHandler] = ALL_ASYNC_TOOL_HANDLERS
+
+# Blocking tool handlers only hold these threads for upstream I/O, never while
+# the model is thinking, so a modest pool serves many concurrent turns.
+_blocking_tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_ASYNC_TOOL_WORKERS", "32")),
+    thread_name_prefix="agent-async-tool",
+)
+
+
+async def _generate_content_async(
+    model: str,
+    conversation: list[types.Content],
+    cached_prefix: int,
+    tier: str = "full",
+) -> types.GenerateContentResponse:
+    """Async counterpart of `agent._generate_content`."""
+    with telemetry.model_span(model, tier) as span:
+        # Resolving the context cache may create or refresh it over the network
+        contents, request_config, cache_key = await asyncio.to_thread(
+            agent._request_args, model, conversation, cached_prefix, tier == "final"
+        )
+        span.sent()
+        try:
+            response = await agent.get_genai_client().aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=request_config,
+            )
+        except agent.genai_errors.ClientError as exc:
+            if cache_key is None or not agent._context_cache.rejects_handle(exc):
+                raise
+            agent._context_cache.invalidate(cache_key)
+            response = await agent.get_genai_client().aio.models.generate_content(
+                model=model,
+                contents=conversation,
+                config=agent._bounded(agent.config, agent._FINAL_ANSWER_RESERVE_SECONDS),
+            )
+        span.first_byte()
+        span.usage(response.usage_metadata)
+        replay.capture_model(response)
+        return response
+
+
+async def _call_tool_async(
+    function_name: str,
+    handler: agent.ToolHandler,
+    call_args: dict[str, Any],
+) -> tuple[dict[str, Any], agent.ToolResult, str | None]:
+    async_handler = ASYNC_TOOL_HANDLERS.get(function_name)
+    if async_handler is None:
+        # run_in_executor does not carry context over; copy it so spans reach the
+        # trace and upstream calls see the deadline
+        call = functools.partial(
+            contextvars.copy_context().run,
+            agent._call_tool, function_name, handler, call_args, time.perf_counter(),
+        )
+        future = asyncio.get_running_loop().run_in_executor(_blocking_tool_executor, call)
+        try:
+            return await asyncio.wait_for(future, deadline.remaining())
+        except TimeoutError:
+            # The thread finishes in the background; the model goes on without it
+            return call_args, agent._timed_out_result(function_name), None
+
+    # Coroutine handlers cannot wait on another call's result, so identical
+    # calls issued together each run; later ones are answered from the memo
+    turn_memo = memo.current()
+    if turn_memo is not None:
+        seen, result = turn_memo.peek(function_name, call_args)
+        if seen:
+            tool_output, _ = result
+            return call_args, agent._duplicate_result(tool_output), None
+
+    with telemetry.tool_span(function_name) as span:
+        try:
+            tool_output, chat = await asyncio.wait_for(async_handler(call_args), deadline.remaining())
+        except TimeoutError:
+            span.error = True
+            tool_output, chat = agent._timed_out_result(function_name), None
+        except Exception as exc:
+            span.error = True
+            tool_output, chat = agent._failed_result(function_name, exc), None
+        else:
+            if turn_memo is not None:
+                turn_memo.store(function_name, call_args, (tool_output, chat))
+    replay.capture_tool(function_name, call_args, tool_output, chat)
+    return call_args, tool_output, chat
+
+
+async def _run_function_calls_async(
+    function_calls: Sequence[types.FunctionCall],
+    turn_memo: memo.TurnMemo | None = None,
+) -> list[tuple[dict[str, Any], agent.ToolResult, str | None]]:
+    """Run every function call from one model response concurrently, within the tool budget."""
+    calls = agent._resolve_function_calls(function_calls)
+    with memo.bind(turn_memo), deadline.within(deadline.remaining(agent._FINAL_ANSWER_RESERVE_SECONDS)):
+        results = list(await asyncio.gather(
+            *(_call_tool_async(name, handler, call_args) for name, handler, call_args in calls)
+        ))
+    agent._after_function_calls(function_calls, results)
+    return results
+
+
+async def run_academic_advisor_agent_async(
+    conversation_history: Sequence[Mapping[str, Any]],
+    *,
+    model: str = agent._MODEL_NAME,
+    tool_events: list[dict[str, Any]] | None = None,
+    cached_prefix: int = 0,
+) -> tuple[str, str]:
+    """Async variant of `run_academic_advisor_agent` with the same arguments and result."""
+    conversation = agent._prepare_conversation(conversation_history)
+    key = agent._response_key(conversation, model, cached_prefix)
+    cached = agent._cached_response(key, tool_events)
+    if cached is not None:
+        return cached
+
+    events: list[dict[str, Any]] = []
+    with agent.turn_deadline():
+        reply_text, chat_text = await _run_agent_loop_async(conversation, model, events, cached_prefix)
+    if tool_events is not None:
+        tool_events.extend(events)
+    agent._store_response(key, reply_text, chat_text, events)
+    return reply_text, chat_text
+
+
+async def _final_answer_async(
+    conversation: list[types.Content],
+    model: str,
+    cached_prefix: int,
+    tool_events: list[dict[str, Any]],
+    reason: str = "deadline",
+) -> str:
+    """Async counterpart of `agent._final_answer`."""
+    note, event, fallback = agent._FINAL_ANSWER_REASONS[reason]
+    tool_events.append(dict(event))
+    request = [*conversation, types.Content(role="user", parts=[types.Part.from_text(text=note)])]
+    try:
+        content = agent._model_content(await _generate_content_async(model, request, cached_prefix, "final"))
+        text = "".join(part.text or "" for part in content.parts if part.text).strip()
+    except (*agent._MODEL_TIMEOUTS, RuntimeError):
+        text = ""
+    text = text or fallback
+    conversation.append(types.Content(role="model", parts=[types.Part.from_text(text=text)]))
+    return text
+
+
+async def _run_agent_loop_async(
+    conversation: list[types.Content],
+    model: str,
+    tool_events: list[dict[str, Any]],
+    cached_prefix: int,
+) -> tuple[str, str]:
+    chat_text = ""
+    prompt_tokens: int | None = None
+    turn_memo = memo.TurnMemo()
+    repeated_rounds = 0
+    escalated = False
+
+    for _ in range(agent._MAX_TOOL_INTERACTIONS):
+        agent._compact(conversation, cached_prefix, prompt_tokens)
+        if deadline.expired(agent._FINAL_ANSWER_RESERVE_SECONDS):
+            return await _final_answer_async(conversation, model, cached_prefix, tool_events), chat_text
+        try:
+            routed_model, tier = agent._route(model, conversation, escalated)
+            response = await _generate_content_async(routed_model, conversation, cached_prefix, tier)
+            content = agent._model_content(response)
+            if agent._router.should_escalate(tier, content):
+                # The fast tier wants tools, so this is planning after all
+                escalated = True
+                response = await _generate_content_async(model, conversation, cached_prefix, "escalated")
+                content = agent._model_content(response)
+        except agent._MODEL_TIMEOUTS:
+            return await _final_answer_async(conversation, model, cached_prefix, tool_events), chat_text
+        prompt_tokens = agent._uncached_prompt_tokens(response.usage_metadata)
+
+        parts = content.parts
+        conversation.append(content)
+
+        function_calls = [part.function_call for part in parts if part.function_call]
+        if function_calls:
+            repeated_rounds = repeated_rounds + 1 if agent._repeats_only(turn_memo, function_calls) else 0
+            results = await _run_function_calls_async(function_calls, turn_memo)
+            for chat in agent._apply_function_results(conversation, function_calls, results, tool_events):
+                chat_text = agent._join_chat(chat_text, chat)
+            if repeated_rounds >= agent._MAX_REPEATED_TOOL_ROUNDS:
+                final = await _final_answer_async(conversation, model, cached_prefix, tool_events, "tool_loop")
+                return final, chat_text
+            continue
+
+        text_response = "".join(part.text or "" for part in parts if part.text).strip()
+
+        # Never return an empty string - continue the loop to get a proper response
+        if not text_response:
+            continue
+
+        return text_response, chat_text
+
+    raise RuntimeError(
+        f"Exceeded maximum of {agent._MAX_TOOL_INTERACTIONS} tool interactions without a text response."
+    )
@@ -0,0 +1,285 @@
+"""Run the agent over a corpus of conversations in parallel and record the results.
+
+Run from backend/:
+
+    python -m app.agent.batch_eval CORPUS... [--output results.jsonl] [--workers N] [--rate R] [--stub]
+
+A corpus target is any mix of:
+
+- a `.jsonl` file of scripted conversations, one per line:
+  `{"id": "csce-electives", "messages": ["What electives can I take?", "Which is easiest?"]}`.
+  Each message is one turn, run in order against the same history with the
+  production system prompt, the way a chat session would be.
+- a recorded fixture (`.json`, see app/agent/replay.py) or a directory of them.
+  These replay their model and tool calls, so they never touch the network.
+
+Conversations are spread over a process pool; the turns of one conversation
+run in order in one worker. Turns that reach the live model are rate limited
+across all workers (`--rate` turns per second). With `--stub`, scripted
+conversations are answered by `StubClient` instead of Gemini, which measures
+the backend alone and needs no network or API key.
+
+Each conversation becomes one line in the results file: per-turn reply, time,
+model and tool call counts and token usage, plus whether a replayed fixture
+still produced its recorded reply. The reply cache is off in the workers, so
+every turn runs the loop.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from google.genai import types
+
+from app.agent import replay
+
+_DEFAULT_RATE = 2.0
+
+
+class StubClient:
+    """Stand-in for `genai.Client` that answers every call with a short text reply.
+
+    It never asks for tools, so a stubbed turn is a single model call and its
+    time is what the backend spends around it.
+    """
+
+    def __init__(self):
+        self.models = self
+        self.aio = SimpleNamespace(models=_StubAsyncModels(self))
+        self.caches = replay._NoCaches()
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        last = next((c for c in reversed(contents) if c.role == "user"), None)
+        text = "".join(part.text or "" for part in last.parts) if last is not None else ""
+        reply = f"(stub reply to: {' '.join(text.split())[:80]})"
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part.from_text(text=reply)]))]
+        )
+
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None) -> Iterator[types.GenerateContentResponse]:
+        return iter([self.generate_content(model=model, contents=contents, config=config)])
+
+
+class _StubAsyncModels:
+    def __init__(self, client: StubClient):
+        self._client = client
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        return self._client.generate_content(model=model, contents=contents, config=config)
+
+
+class RateLimiter:
+    """Spaces turn starts `1 / rate` seconds apart across processes.
+
+    The next free slot lives in shared memory, so every worker of the pool
+    draws from the same budget.
+    """
+
+    def __init__(self, rate: float, context: Any = multiprocessing):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = context.Value("d", 0.0)
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._next_at.get_lock():
+            now = time.time()
+            slot = max(now, self._next_at.value)
+            self._next_at.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def load_corpus(targets: Iterable[str | os.PathLike[str]]) -> list[dict[str, Any]]:
+    """Read scripted conversations and fixtures into `{"id", "kind", ...}` entries."""
+    entries: list[dict[str, Any]] = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            entries.extend(
+                {"id": fixture.stem, "kind": "fixture", "fixture": replay.load_fixture(fixture)}
+                for fixture in sorted(path.glob("*.json"))
+            )
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as handle:
+                for number, line in enumerate(handle, start=1):
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    messages = item.get("messages")
+                    if not isinstance(messages, list) or not messages or not all(isinstance(m, str) for m in messages):
+                        raise ValueError(f"{path}:{number}: 'messages' must be a non-empty list of strings.")
+                    entries.append({"id": str(item.get("id") or f"{path.stem}-{number}"), "kind": "scripted", "messages": messages})
+        else:
+            entries.append({"id": path.stem, "kind": "fixture", "fixture": replay.load_fixture(path)})
+
+    seen = Counter(entry["id"] for entry in entries)
+    duplicates = sorted(name for name, count in seen.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate conversation ids: {', '.join(duplicates)}")
+    return entries
+
+
+# Set in each worker process by `_init_worker`
+_limiter: RateLimiter | None = None
+_stub = False
+
+
+def _init_worker(limiter: RateLimiter, stub: bool) -> None:
+    global _limiter, _stub
+    _limiter, _stub = limiter, stub
+
+    from app.agent import agent
+
+    agent._RESPONSE_CACHE_ENABLED = False
+    if stub:
+        agent.genai_client = StubClient()
+        agent._CONTEXT_CACHE_ENABLED = False
+        agent._PREFETCH_ENABLED = False
+
+
+def _turn_result(message: str | None, reply: str, seconds: float, events: Sequence[Mapping[str, Any]], trace: Any) -> dict[str, Any]:
+    tools = Counter(event["name"] for event in events if event.get("type") == "tool_call")
+    return {
+        "message": message,
+        "reply": reply,
+        "seconds": round(seconds, 3),
+        "model_calls": len(trace.model_calls),
+        "tool_calls": sum(tools.values()),
+        "tools": dict(tools),
+        "input_tokens": sum(span.input_tokens or 0 for span in trace.model_calls),
+        "output_tokens": sum(span.output_tokens or 0 for span in trace.model_calls),
+        "events": [event["type"] for event in events if event.get("type") != "tool_call"],
+    }
+
+
+def _run_fixture(fixture: Mapping[str, Any]) -> tuple[list[dict[str, Any]], bool]:
+    from app.agent import agent, telemetry
+
+    kwargs: dict[str, Any] = {"cached_prefix": fixture.get("cached_prefix", 0)}
+    if fixture.get("model"):
+        kwargs["model"] = fixture["model"]
+    events: list[dict[str, Any]] = []
+    with replay.replay(fixture), telemetry.trace_turn() as trace:
+        started = time.perf_counter()
+        reply, _ = agent.run_academic_advisor_agent(fixture["conversation"], tool_events=events, **kwargs)
+        seconds = time.perf_counter() - started
+    return [_turn_result(None, reply, seconds, events, trace)], reply == fixture.get("reply")
+
+
+def _run_scripted(messages: Sequence[str], turns: list[dict[str, Any]]) -> None:
+    from app.agent import agent, telemetry
+    from app.routes.agent import _PREAMBLE_LENGTH, _initial_messages
+
+    history = [agent._coerce_message_to_content(message) for message in _initial_messages()]
+    for message in messages:
+        if not _stub and _limiter is not None:
+            _limiter.acquire()
+        events: list[dict[str, Any]] = []
+        with telemetry.trace_turn() as trace:
+            started = time.perf_counter()
+            reply, _ = agent.run_agent_turn(history, message, tool_events=events, cached_prefix=_PREAMBLE_LENGTH)
+            seconds = time.perf_counter() - started
+        turns.append(_turn_result(message, reply, seconds, events, trace))
+
+
+def run_conversation(entry: Mapping[str, Any]) -> dict[str, Any]:
+    """Run one corpus entry in this process and summarize it; never raises."""
+    result: dict[str, Any] = {"id": entry["id"], "kind": entry["kind"], "ok": True, "error": None}
+    turns: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    # The agent's debug prints would interleave across workers; drop them
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            if entry["kind"] == "fixture":
+                turns, result["matches_recording"] = _run_fixture(entry["fixture"])
+            else:
+                _run_scripted(entry["messages"], turns)
+        except Exception as exc:
+            result["ok"] = False
+            result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["tool_calls"] = sum(turn["tool_calls"] for turn in turns)
+    result["turns"] = turns
+    return result
+
+
+def run_batch(
+    entries: Sequence[Mapping[str, Any]],
+    output: str | os.PathLike[str],
+    *,
+    workers: int | None = None,
+    rate: float = _DEFAULT_RATE,
+    stub: bool = False,
+) -> list[dict[str, Any]]:
+    """Run every entry on a process pool, writing each result to `output` as it finishes."""
+    context = multiprocessing.get_context("spawn")
+    limiter = RateLimiter(rate, context)
+    results: list[dict[str, Any]] = []
+    with open(output, "w", encoding="utf-8") as handle, ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(limiter, stub),
+    ) as pool:
+        futures = [pool.submit(run_conversation, entry) for entry in entries]
+        for future in as_completed(futures):
+            result = future.result()
+            handle.write(json.dumps(result, default=str) + "\n")
+            handle.flush()
+            results.append(result)
+    return results
+
+
+def summarize(results: Sequence[Mapping[str, Any]], wall_seconds: float) -> str:
+    turn_seconds = sorted(turn["seconds"] for result in results for turn in result["turns"])
+    failed = [result["id"] for result in results if not result["ok"]]
+    changed = [result["id"] for result in results if result.get("matches_recording") is False]
+
+    lines = [
+        f"conversations: {len(results)} ({len(failed)} failed)",
+        f"turns:         {len(turn_seconds)} in {wall_seconds:.1f} s",
+        f"tool calls:    {sum(result['tool_calls'] for result in results)}",
+    ]
+    if turn_seconds:
+        p95 = turn_seconds[min(len(turn_seconds) - 1, int(len(turn_seconds) * 0.95))]
+        lines.append(f"turn time:     p50 {statistics.median(turn_seconds):.2f} s, p95 {p95:.2f} s")
+    if failed:
+        lines.append(f"failed:        {', '.join(sorted(failed))}")
+    if changed:
+        lines.append(f"reply changed: {', '.join(sorted(changed))}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="+", help="scripted .jsonl files, fixture files or fixture directories")
+    parser.add_argument("--output", default="batch_eval_results.jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--rate", type=float, default=_DEFAULT_RATE, help="live turns per second, 0 for no limit")
+    parser.add_argument("--stub", action="store_true", help="answer scripted conversations with StubClient")
+    args = parser.parse_args(argv)
+
+    entries = load_corpus(args.corpus)
+    if not entries:
+        raise SystemExit("No conversations found.")
+
+    started = time.perf_counter()
+    results = run_batch(entries, args.output, workers=args.workers, rate=args.rate, stub=args.stub)
+    print(summarize(results, time.perf_counter() - started))
+    print(f"Results written to {args.output}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
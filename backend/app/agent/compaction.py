@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any
+
+from google.genai import types
+
+# Marks the synthetic user message that replaces summarized turns
+_SUMMARY_PREFIX = "Summary of our earlier conversation:"
+_SUMMARY_ACK = "Got it, I'll keep that in mind."
+
+# Tool outputs smaller than this are left as they are
+_MIN_DIGEST_CHARS = 400
+_SNIPPET_CHARS = 200
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """Rough token count (~4 characters per token of serialized content)."""
+    return sum(len(content.model_dump_json(exclude_none=True)) for content in contents) // 4
+
+
+def _is_user_text(content: types.Content) -> bool:
+    """True for a real student message (not a tool response or an earlier summary)."""
+    texts = [part.text for part in content.parts or [] if part.text]
+    return content.role == "user" and bool(texts) and not texts[0].startswith(_SUMMARY_PREFIX)
+
+
+def _text_of(content: types.Content) -> str:
+    return " ".join(part.text.strip() for part in content.parts or [] if part.text).strip()
+
+
+def _snippet(text: str, limit: int = _SNIPPET_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def digest_tool_output(name: str, output: Any) -> dict[str, Any]:
+    """Reduce a tool output the model has already read to a few key facts."""
+    if not isinstance(output, dict):
+        return {"digest": _snippet(json.dumps(output, default=str))}
+
+    digest: dict[str, Any] = {}
+    for key in ("found", "success", "message"):
+        if key in output:
+            digest[key] = output[key]
+
+    # Course info as projected for the model (see tools/projection.py)
+    course = output.get("course")
+    if isinstance(course, dict):
+        digest["course"] = f"{course.get('course_code', '')} {course.get('course_title', '')}".strip()
+    if isinstance(output.get("sections"), list):
+        digest["sections_offered"] = len(output["sections"])
+
+    data = output.get("data")
+    if isinstance(data, dict):
+        catalog = data.get("catalog")
+        if isinstance(catalog, dict):
+            digest["course"] = f"{catalog.get('course_code', '')} {catalog.get('course_title', '')}".strip()
+        blocks = data.get("registration_blocks")
+        if isinstance(blocks, dict) and isinstance(blocks.get("sections"), list):
+            digest["sections_offered"] = len(blocks["sections"])
+        courses = data.get("courses")
+        if isinstance(courses, list):
+            digest["courses"] = [c.get("course_code", "") for c in courses if isinstance(c, dict)]
+
+    if not digest:
+        digest["digest"] = _snippet(json.dumps(output, default=str))
+    digest["note"] = f"Earlier {name} result, compacted. Call the tool again if details are needed."
+    return digest
+
+
+class HistoryCompactor:
+    """Keeps long agent conversations from re-sending stale tool output.
+
+    Once the prompt for a model call grows past `trigger_tokens`:
+
+    1. Function responses from earlier user turns (already consumed by the
+       model) are replaced by small digests.
+    2. If the history is still over `token_budget`, every turn except the last
+       `keep_recent_turns` user turns is folded into one summary message.
+
+    The first `start` items (the cached preamble) are never touched. Running
+    totals are available from `stats()`.
+    """
+
+    def __init__(self, trigger_tokens: int = 6000, token_budget: int = 12000, keep_recent_turns: int = 3):
+        self.trigger_tokens = trigger_tokens
+        self.token_budget = token_budget
+        self.keep_recent_turns = max(1, keep_recent_turns)
+        self._lock = threading.Lock()
+        self._stats = {
+            "compactions": 0,
+            "tool_responses_digested": 0,
+            "turns_summarized": 0,
+            "tokens_saved": 0,
+        }
+
+    def maybe_compact(
+        self,
+        conversation: list[types.Content],
+        *,
+        start: int = 0,
+        prompt_tokens: int | None = None,
+    ) -> int:
+        """Compact `conversation[start:]` in place if it is over the trigger.
+
+        `prompt_tokens` is the provider-reported prompt size of the previous
+        call, when known; otherwise the size is estimated. Returns the estimated
+        number of tokens saved.
+        """
+        tokens = prompt_tokens if prompt_tokens is not None else estimate_tokens(conversation[start:])
+        if tokens < self.trigger_tokens:
+            return 0
+
+        before = estimate_tokens(conversation[start:])
+        digested = self._digest_consumed_tool_responses(conversation, start)
+        summarized = 0
+        if estimate_tokens(conversation[start:]) > self.token_budget:
+            summarized = self._summarize_old_turns(conversation, start)
+        saved = max(0, before - estimate_tokens(conversation[start:]))
+
+        if digested or summarized:
+            with self._lock:
+                self._stats["compactions"] += 1
+                self._stats["tool_responses_digested"] += digested
+                self._stats["turns_summarized"] += summarized
+                self._stats["tokens_saved"] += saved
+            print(f"Compacted history: {digested} tool response(s) digested, "
+                  f"{summarized} turn(s) summarized, ~{saved} tokens saved")
+        return saved
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _digest_consumed_tool_responses(self, conversation: list[types.Content], start: int) -> int:
+        # Responses from the current user turn may still be needed; stop there
+        last_user = max(
+            (i for i in range(start, len(conversation)) if _is_user_text(conversation[i])),
+            default=start,
+        )
+        digested = 0
+        for index in range(start, last_user):
+            content = conversation[index]
+            parts = content.parts or []
+            if not any(part.function_response for part in parts):
+                continue
+
+            new_parts = []
+            changed = False
+            for part in parts:
+                response = part.function_response
+                if response is None or (response.response or {}).get("compacted"):
+                    new_parts.append(part)
+                    continue
+                output = (response.response or {}).get("output")
+                if len(json.dumps(output, default=str)) < _MIN_DIGEST_CHARS:
+                    new_parts.append(part)
+                    continue
+                new_parts.append(types.Part.from_function_response(
+                    name=response.name,
+                    response={"output": digest_tool_output(response.name or "", output), "compacted": True},
+                ))
+                changed = True
+                digested += 1
+
+            if changed:
+                conversation[index] = types.Content(role=content.role, parts=new_parts)
+        return digested
+
+    def _summarize_old_turns(self, conversation: list[types.Content], start: int) -> int:
+        user_turns = [i for i in range(start, len(conversation)) if _is_user_text(conversation[i])]
+        if len(user_turns) <= self.keep_recent_turns:
+            return 0
+        boundary = user_turns[-self.keep_recent_turns]
+
+        lines = []
+        turns = 0
+        for content in conversation[start:boundary]:
+            text = _text_of(content)
+            if content.role == "user" and text.startswith(_SUMMARY_PREFIX):
+                lines.append(text[len(_SUMMARY_PREFIX):].strip())
+            elif text == _SUMMARY_ACK:
+                continue
+            elif _is_user_text(content):
+                turns += 1
+                lines.append(f"- Student: {_snippet(text)}")
+            elif content.role == "model":
+                calls = [
+                    f"{part.function_call.name}({json.dumps(dict(part.function_call.args or {}), default=str)})"
+                    for part in content.parts or []
+                    if part.function_call
+                ]
+                if calls:
+                    lines.append(f"- Tools used: {', '.join(calls)}")
+                if text:
+                    lines.append(f"- Advisor: {_snippet(text)}")
+
+        summary = [
+            types.Content(role="user", parts=[types.Part.from_text(text=f"{_SUMMARY_PREFIX}\n" + "\n".join(lines))]),
+            types.Content(role="model", parts=[types.Part.from_text(text=_SUMMARY_ACK)]),
+        ]
+        conversation[start:boundary] = summary
+        return turns
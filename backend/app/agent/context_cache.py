@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any
+
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from app.services.singleflight import SingleFlight
+
+
+class ContextCache:
+    """Gemini explicit context caches for a conversation's static prefix.
+
+    The system preamble (and transcript, when it is injected) plus the tool
+    schema are identical on every model call, so they are uploaded once as a
+    `CachedContent` and referenced by name afterwards. Handles are keyed by a
+    hash of the model, prefix and tools, refreshed shortly before they expire,
+    and recreated if refreshing fails. When the provider refuses to create a
+    cache (e.g. the prefix is below the minimum cacheable size), the key is not
+    retried until `retry_after_seconds` have passed and callers send the full
+    request instead. Creating or refreshing a cache takes at most `timeout`
+    seconds, so it fits in the caller's deadline.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        retry_after_seconds: int = 600,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._handles: dict[str, tuple[str, float]] = {}
+        self._failed_until: dict[str, float] = {}
+        self._flight = SingleFlight()
+
+    def get(
+        self,
+        client: Any,
+        model: str,
+        prefix: list[types.Content],
+        tools: list[types.Tool],
+        timeout: float | None = None,
+    ) -> tuple[str, str] | None:
+        """Return `(key, cached_content_name)` for this prefix, or None if uncached."""
+        if not prefix:
+            return None
+
+        key = self._key(model, prefix, tools)
+        now = time.monotonic()
+        with self._lock:
+            if self._failed_until.get(key, 0.0) > now:
+                return None
+            handle = self._handles.get(key)
+        if handle is not None and handle[1] - now > self.refresh_margin_seconds:
+            return key, handle[0]
+
+        name = self._flight.do(key, lambda: self._refresh(client, key, model, prefix, tools, timeout))
+        return (key, name) if name else None
+
+    def invalidate(self, key: str) -> None:
+        """Forget a handle the provider no longer accepts (expired or deleted)."""
+        with self._lock:
+            self._handles.pop(key, None)
+
+    @staticmethod
+    def rejects_handle(exc: genai_errors.ClientError) -> bool:
+        """Whether a model call failed because its cached content is gone.
+
+        The API answers a request for an expired or deleted cache with 404, or
+        with 403 since it cannot tell a missing cache from someone else's. Other
+        client errors (rate limits, bad requests) say nothing about the cache.
+        """
+        return exc.code in (403, 404)
+
+    def _refresh(
+        self,
+        client: Any,
+        key: str,
+        model: str,
+        prefix: list[types.Content],
+        tools: list[types.Tool],
+        timeout: float | None,
+    ) -> str | None:
+        ttl = f"{self.ttl_seconds}s"
+        http_options = None if timeout is None else types.HttpOptions(timeout=max(1, int(timeout * 1000)))
+        with self._lock:
+            handle = self._handles.get(key)
+
+        if handle is not None:
+            try:
+                client.caches.update(name=handle[0], config=types.UpdateCachedContentConfig(ttl=ttl, http_options=http_options))
+                self._remember(key, handle[0])
+                return handle[0]
+            except Exception as exc:
+                print(f"Context cache refresh failed, recreating: {exc}")
+
+        try:
+            cached = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    contents=prefix,
+                    tools=tools,
+                    ttl=ttl,
+                    display_name=f"nanner-planner-{key[:12]}",
+                    http_options=http_options,
+                ),
+            )
+        except Exception as exc:
+            print(f"Context cache unavailable, sending full requests: {exc}")
+            with self._lock:
+                self._handles.pop(key, None)
+                self._failed_until[key] = time.monotonic() + self.retry_after_seconds
+            return None
+
+        self._remember(key, cached.name)
+        return cached.name
+
+    def _remember(self, key: str, name: str) -> None:
+        with self._lock:
+            self._handles[key] = (name, time.monotonic() + self.ttl_seconds)
+            self._failed_until.pop(key, None)
+
+    @staticmethod
+    def _key(model: str, prefix: list[types.Content], tools: list[types.Tool]) -> str:
+        material = {
+            "model": model,
+            "prefix": [content.model_dump(mode="json", exclude_none=True) for content in prefix],
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
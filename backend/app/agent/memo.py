@@ -0,0 +1,148 @@
+"""Turn-scoped memo of tool results.
+
+Within one agent turn the model often repeats a call it already made (the
+same `get_course_info` from reasoning and again before `generate_schedule`),
+and tools call each other (`generate_schedule` looks up every course). The
+agent loop binds a `TurnMemo` for the turn; every tool call, including
+nested ones made through `call`, runs at most once per tool name and
+canonical arguments, and identical calls issued together share one run.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, Mapping, TypeVar
+
+from app.services import deadline
+
+T = TypeVar("T")
+
+
+def _canonical(value: Any) -> Any:
+    """Argument values that mean the same thing compare equal: case and spacing are ignored."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+class _Entry:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class TurnMemo:
+    """Results of the tool calls made so far in one turn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self.hits = 0
+
+    @staticmethod
+    def key(name: str, args: Mapping[str, Any]) -> str:
+        return f"{name}:{json.dumps(_canonical(args), sort_keys=True, default=str)}"
+
+    def seen(self, name: str, args: Mapping[str, Any]) -> bool:
+        with self._lock:
+            return self.key(name, args) in self._entries
+
+    def repeats_only(self, calls: Iterable[tuple[str, Mapping[str, Any]]]) -> bool:
+        """True if every `(name, args)` call was already made this turn."""
+        calls = list(calls)
+        return bool(calls) and all(self.seen(name, args) for name, args in calls)
+
+    def peek(self, name: str, args: Mapping[str, Any]) -> tuple[bool, Any]:
+        """`(True, result)` if this call already finished this turn, else `(False, None)`.
+
+        For coroutine handlers, which cannot block on `call`; they `store` their result.
+        """
+        with self._lock:
+            entry = self._entries.get(self.key(name, args))
+            if entry is None or not entry.done.is_set() or entry.error is not None:
+                return False, None
+            self.hits += 1
+            return True, entry.result
+
+    def store(self, name: str, args: Mapping[str, Any], result: Any) -> None:
+        entry = _Entry()
+        entry.result = result
+        entry.done.set()
+        with self._lock:
+            self._entries.setdefault(self.key(name, args), entry)
+
+    def call(
+        self,
+        name: str,
+        args: Mapping[str, Any],
+        run: Callable[[], T],
+        timeout: float | None = None,
+    ) -> tuple[T, bool]:
+        """Return `(result, duplicate)`, running `run` only for the first call with this key.
+
+        A duplicate of a call still running waits at most `timeout` seconds for
+        it, then raises TimeoutError. A call that raised is forgotten, so a
+        later identical call tries again.
+        """
+        key = self.key(name, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            first = entry is None
+            if first:
+                entry = self._entries[key] = _Entry()
+            else:
+                self.hits += 1
+
+        if not first:
+            if not entry.done.wait(timeout):
+                raise TimeoutError(f"{name} is still running.")
+            if entry.error is not None:
+                raise entry.error
+            return entry.result, True
+
+        try:
+            entry.result = run()
+        except BaseException as exc:
+            entry.error = exc
+            with self._lock:
+                self._entries.pop(key, None)
+            raise
+        finally:
+            entry.done.set()
+        return entry.result, False
+
+
+_current: ContextVar[TurnMemo | None] = ContextVar("agent_turn_memo", default=None)
+
+
+def current() -> TurnMemo | None:
+    return _current.get()
+
+
+@contextmanager
+def bind(memo: TurnMemo | None) -> Iterator[TurnMemo | None]:
+    """Make `memo` the current turn's memo for the enclosed tool calls."""
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        _current.reset(token)
+
+
+def call(name: str, args: Mapping[str, Any], run: Callable[[], T]) -> T:
+    """Run a tool lookup through the current turn's memo, if there is one.
+
+    For tools that call other tools, e.g. `generate_schedule` fetching course
+    info the model already asked for.
+    """
+    memo = _current.get()
+    if memo is None:
+        return run()
+    return memo.call(name, args, run, timeout=deadline.remaining())[0]
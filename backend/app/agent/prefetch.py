@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.agent.tools.course_info_tool import TOOL_HANDLERS as COURSE_INFO_TOOL_HANDLERS, is_course_info_cached
+from app.agent.tools.rmp_tool import TOOL_HANDLERS as RMP_TOOL_HANDLERS, is_professor_summary_cached
+
+# Placeholder instructor names that have no RateMyProfessors page
+_NON_PROFESSORS = {"", "staff", "tba", "tbd", "instructor tba"}
+
+_get_course_info = COURSE_INFO_TOOL_HANDLERS["get_course_info"]
+_get_professor_summary = RMP_TOOL_HANDLERS["get_professor_summary"]
+
+
+def _likely_courses(output: Any, limit: int) -> list[str]:
+    """Top course codes from a search_courses result."""
+    data = output.get("data") if isinstance(output, dict) else None
+    courses = data.get("courses") if isinstance(data, dict) else None
+    codes = []
+    for course in courses or []:
+        code = course.get("course_code") if isinstance(course, dict) else None
+        if code and code not in codes:
+            codes.append(code)
+        if len(codes) >= limit:
+            break
+    return codes
+
+
+def _likely_professors(output: Any, limit: int) -> list[str]:
+    """Distinct instructor names from a get_course_info result."""
+    data = output.get("data") if isinstance(output, dict) else None
+    blocks = data.get("registration_blocks") if isinstance(data, dict) else None
+    sections = blocks.get("sections") if isinstance(blocks, dict) else None
+    names = []
+    for section in sections or []:
+        for instructor in (section.get("instructor") or []) if isinstance(section, dict) else []:
+            name = instructor.get("name") if isinstance(instructor, dict) else None
+            if name and name.strip().lower() not in _NON_PROFESSORS and name not in names:
+                names.append(name)
+                if len(names) >= limit:
+                    return names
+    return names
+
+
+class Prefetcher:
+    """Warms tool caches for the calls the model is likely to make next.
+
+    The tool sequence is predictable: `search_courses` is usually followed by
+    `get_course_info` on the top hits, and `get_course_info` by
+    `get_professor_summary` for its instructors. After each tool result, those
+    follow-ups are fetched on a small background pool so they are already
+    cached (or in flight, and joined) when the model asks for them.
+
+    Work is capped at `max_pending` outstanding fetches; anything over budget
+    is dropped rather than queued, so prefetching never competes with
+    foreground requests for long.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        max_courses: int = 3,
+        max_professors: int = 3,
+    ):
+        self.max_pending = max_pending
+        self.max_courses = max_courses
+        self.max_professors = max_professors
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-prefetch")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def after_tool(self, name: str, output: Any) -> int:
+        """Schedule prefetches following a tool result. Returns how many were scheduled."""
+        scheduled = 0
+        if name == "search_courses":
+            for course_id in _likely_courses(output, self.max_courses):
+                if not is_course_info_cached(course_id):
+                    scheduled += self._submit(_get_course_info, {"course_id": course_id})
+        elif name == "get_course_info":
+            for professor_name in _likely_professors(output, self.max_professors):
+                if not is_professor_summary_cached(professor_name):
+                    scheduled += self._submit(_get_professor_summary, {"professor_name": professor_name})
+        return scheduled
+
+    def _submit(self, handler: Callable[[dict[str, Any]], Any], payload: dict[str, Any]) -> int:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return 0
+            self._pending += 1
+        self._executor.submit(self._run, handler, payload)
+        return 1
+
+    def _run(self, handler: Callable[[dict[str, Any]], Any], payload: dict[str, Any]) -> None:
+        try:
+            handler(payload)
+        except Exception as exc:
+            # A failed guess only costs the cache warmup; the model can still ask
+            print(f"Prefetch {payload} failed: {exc}")
+        finally:
+            with self._lock:
+                self._pending -= 1
@@ -0,0 +1,318 @@
+"""Record agent turns to fixture files and replay them without network access.
+
+Recording: set `AGENT_RECORD_DIR` and every `/api/agent/chat` (and session
+chat) turn is written there as one JSON fixture containing the input
+conversation, each model response in order, every tool call with its output,
+and the final reply.
+
+Replay: `with replay(fixture): ...` swaps `agent.genai_client` and every tool
+handler for fakes that serve the recorded data, so the real agent loop
+(sync, streaming or async) runs end to end offline. Replay patches module
+globals and is meant for tests and benchmarks, not concurrent use.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, Mapping, Sequence
+
+from google.genai import types
+
+FIXTURE_VERSION = 1
+
+
+class ReplayError(RuntimeError):
+    """The agent asked for something the fixture did not record."""
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (types.Content, types.GenerateContentResponse)):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def _tool_key(name: str, args: Mapping[str, Any]) -> str:
+    return f"{name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+
+class Recording:
+    """Model responses and tool calls captured during one agent turn."""
+
+    def __init__(
+        self,
+        conversation: Sequence[Any],
+        *,
+        model: str | None = None,
+        cached_prefix: int = 0,
+        directory: str | None = None,
+    ):
+        # Serializing the history is only worth it when the fixture will be written
+        self.conversation = [_dump(item) for item in conversation] if directory else []
+        self.model = model
+        self.cached_prefix = cached_prefix
+        self.directory = directory
+        self.routing = _routing_enabled()
+        self.model_calls: list[list[dict[str, Any]]] = []
+        self.tool_calls: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_model(self, chunks: Sequence[types.GenerateContentResponse]) -> None:
+        with self._lock:
+            self.model_calls.append([_dump(chunk) for chunk in chunks])
+            if self.model is None:
+                self.model = next((chunk.model_version for chunk in chunks if chunk.model_version), None)
+
+    def add_tool(self, name: str, args: Mapping[str, Any], output: Any, chat: str | None) -> None:
+        entry = {"name": name, "args": dict(args), "output": output, "chat": chat}
+        with self._lock:
+            self.tool_calls.append(json.loads(json.dumps(entry, default=str)))
+
+    def to_fixture(self, reply: str, chat: str) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "version": FIXTURE_VERSION,
+                "model": self.model,
+                "cached_prefix": self.cached_prefix,
+                "routing": self.routing,
+                "conversation": self.conversation,
+                "model_calls": list(self.model_calls),
+                "tool_calls": list(self.tool_calls),
+                "reply": reply,
+                "chat": chat,
+            }
+
+    def finish(self, reply: str, chat: str) -> Path | None:
+        """Write the fixture if recording is enabled; returns its path."""
+        if not self.directory:
+            return None
+        fixture = self.to_fixture(reply, chat)
+        body = json.dumps(fixture, indent=2, default=str)
+        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:10]
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(body, encoding="utf-8")
+        os.replace(tmp, path)
+        print(f"Recorded agent turn to {path}")
+        return path
+
+
+_current_recording: ContextVar[Recording | None] = ContextVar("agent_recording", default=None)
+
+
+@contextmanager
+def record_turn(
+    conversation: Sequence[Any],
+    *,
+    model: str | None = None,
+    cached_prefix: int = 0,
+    record_dir: str | None = None,
+) -> Iterator[Recording]:
+    """Capture one turn; call `finish(reply, chat)` on the yielded recording.
+
+    With neither `record_dir` nor `AGENT_RECORD_DIR` set, nothing is captured
+    and `finish` does nothing.
+    """
+    directory = record_dir or os.getenv("AGENT_RECORD_DIR", "")
+    recording = Recording(conversation, model=model, cached_prefix=cached_prefix, directory=directory or None)
+    if not directory:
+        yield recording
+        return
+
+    token = _current_recording.set(recording)
+    try:
+        yield recording
+    finally:
+        _current_recording.reset(token)
+
+
+def capture_model(*chunks: types.GenerateContentResponse) -> None:
+    """Record a model response (or the chunks of a streamed one) for the current turn."""
+    recording = _current_recording.get()
+    if recording is not None:
+        recording.add_model(chunks)
+
+
+def capture_tool(name: str, args: Mapping[str, Any], output: Any, chat: str | None) -> None:
+    """Record a tool call and its result for the current turn."""
+    recording = _current_recording.get()
+    if recording is not None:
+        recording.add_tool(name, args, output, chat)
+
+
+def _routing_enabled() -> bool:
+    from app.agent import agent
+
+    return agent._ROUTING_ENABLED
+
+
+def load_fixture(path: str | os.PathLike[str]) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        fixture = json.load(handle)
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported agent fixture version in {path}: {fixture.get('version')}")
+    return fixture
+
+
+class _ReplayModels:
+    """Serves recorded model responses in order.
+
+    Requests are still serialized the way the SDK would, so replays measure
+    that cost; the accumulated time is in `serialize_seconds`.
+    """
+
+    def __init__(self, model_calls: Sequence[Sequence[Mapping[str, Any]]]):
+        self._calls = deque(model_calls)
+        self.requests = 0
+        self.serialize_seconds = 0.0
+
+    def _next(self, contents: Sequence[types.Content], config: Any) -> list[types.GenerateContentResponse]:
+        started = time.perf_counter()
+        json.dumps({
+            "contents": [content.model_dump(mode="json", exclude_none=True) for content in contents],
+            "config": config.model_dump(mode="json", exclude_none=True) if config is not None else None,
+        })
+        self.serialize_seconds += time.perf_counter() - started
+        self.requests += 1
+
+        if not self._calls:
+            raise ReplayError(f"Model call {self.requests} was not recorded.")
+        return [types.GenerateContentResponse.model_validate(chunk) for chunk in self._calls.popleft()]
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        chunks = self._next(contents, config)
+        if len(chunks) == 1:
+            return chunks[0]
+        # A streamed recording served to a non-streaming call: merge the parts
+        parts = [part for chunk in chunks for part in _chunk_parts(chunk)]
+        usage = next((chunk.usage_metadata for chunk in reversed(chunks) if chunk.usage_metadata), None)
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+            usage_metadata=usage,
+        )
+
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None) -> Iterator[types.GenerateContentResponse]:
+        return iter(self._next(contents, config))
+
+
+def _chunk_parts(chunk: types.GenerateContentResponse) -> list[types.Part]:
+    if not chunk.candidates or chunk.candidates[0].content is None:
+        return []
+    return list(chunk.candidates[0].content.parts or [])
+
+
+class _ReplayAsyncModels:
+    def __init__(self, models: _ReplayModels):
+        self._models = models
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        return self._models.generate_content(model=model, contents=contents, config=config)
+
+
+class _NoCaches:
+    def create(self, **_: Any) -> Any:
+        raise ReplayError("Context caches are not available during replay.")
+
+    def update(self, **_: Any) -> Any:
+        raise ReplayError("Context caches are not available during replay.")
+
+
+class ReplayClient:
+    """Stand-in for `genai.Client` backed by recorded model responses."""
+
+    def __init__(self, model_calls: Sequence[Sequence[Mapping[str, Any]]]):
+        self.models = _ReplayModels(model_calls)
+        self.aio = SimpleNamespace(models=_ReplayAsyncModels(self.models))
+        self.caches = _NoCaches()
+
+
+def _replay_handlers(tool_calls: Sequence[Mapping[str, Any]], names: Sequence[str]) -> dict[str, Any]:
+    recorded: dict[str, deque[tuple[Any, str | None]]] = defaultdict(deque)
+    for call in tool_calls:
+        recorded[_tool_key(call["name"], call.get("args") or {})].append((call.get("output"), call.get("chat")))
+    lock = threading.Lock()
+
+    def handler_for(name: str):
+        def handler(payload: Mapping[str, Any]) -> tuple[Any, str | None]:
+            key = _tool_key(name, payload)
+            with lock:
+                queue = recorded.get(key)
+                if not queue:
+                    raise ReplayError(f"Tool call {key} was not recorded.")
+                # Keep the last result so repeated identical calls keep working
+                return queue.popleft() if len(queue) > 1 else queue[0]
+        return handler
+
+    return {name: handler_for(name) for name in names}
+
+
+@contextmanager
+def replay(fixture: Mapping[str, Any]) -> Iterator[ReplayClient]:
+    """Serve the agent's model and tool calls from a recorded fixture.
+
+    Context caching, prefetching and the reply cache are switched off for the
+    duration: the first two would call out to the network, and the last would
+    answer repeated replays without running the loop. Model routing is set the
+    way it was when the fixture was recorded, so responses line up with the
+    same calls.
+    """
+    from app.agent import agent, async_agent
+
+    client = ReplayClient(fixture.get("model_calls") or [])
+    handlers = _replay_handlers(fixture.get("tool_calls") or [], list(agent.TOOL_HANDLERS))
+
+    saved = (
+        agent.genai_client,
+        dict(agent.TOOL_HANDLERS),
+        dict(async_agent.ASYNC_TOOL_HANDLERS),
+        agent._CONTEXT_CACHE_ENABLED,
+        agent._PREFETCH_ENABLED,
+        agent._ROUTING_ENABLED,
+        agent._RESPONSE_CACHE_ENABLED,
+    )
+    agent.genai_client = client
+    agent.TOOL_HANDLERS.update(handlers)
+    async_agent.ASYNC_TOOL_HANDLERS.clear()
+    agent._CONTEXT_CACHE_ENABLED = False
+    agent._PREFETCH_ENABLED = False
+    agent._ROUTING_ENABLED = bool(fixture.get("routing", False))
+    agent._RESPONSE_CACHE_ENABLED = False
+    try:
+        yield client
+    finally:
+        agent.genai_client = saved[0]
+        agent.TOOL_HANDLERS.clear()
+        agent.TOOL_HANDLERS.update(saved[1])
+        async_agent.ASYNC_TOOL_HANDLERS.clear()
+        async_agent.ASYNC_TOOL_HANDLERS.update(saved[2])
+        agent._CONTEXT_CACHE_ENABLED = saved[3]
+        agent._PREFETCH_ENABLED = saved[4]
+        agent._ROUTING_ENABLED = saved[5]
+        agent._RESPONSE_CACHE_ENABLED = saved[6]
+
+
+def replay_turn(fixture: Mapping[str, Any], *, stream: bool = False) -> tuple[str, str]:
+    """Run the agent over a fixture's conversation and return `(reply, chat)`."""
+    from app.agent import agent
+
+    kwargs: dict[str, Any] = {"cached_prefix": fixture.get("cached_prefix", 0)}
+    if fixture.get("model"):
+        kwargs["model"] = fixture["model"]
+
+    with replay(fixture):
+        if not stream:
+            return agent.run_academic_advisor_agent(fixture["conversation"], **kwargs)
+        done = {}
+        for event in agent.stream_academic_advisor_agent(fixture["conversation"], **kwargs):
+            if event["type"] == "done":
+                done = event
+        return done.get("reply", ""), done.get("chat", "")
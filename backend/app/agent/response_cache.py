@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from google.genai import types
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# A near-duplicate that adds or drops one of these asks the opposite question
+# ("don't" normalizes to "don t")
+_NEGATIONS = frozenset({"not", "no", "never", "t", "without", "nor", "none", "avoid", "except", "instead"})
+
+
+def _normalize_text(text: str) -> str:
+    """Case, whitespace and punctuation-insensitive form of a message."""
+    return " ".join(_WORD.findall(text.casefold()))
+
+
+def _canonical(content: types.Content) -> dict[str, Any]:
+    parts = []
+    for part in content.parts or []:
+        if part.text:
+            parts.append(_normalize_text(part.text))
+        else:
+            parts.append(part.model_dump(mode="json", exclude_none=True))
+    return {"role": content.role, "parts": parts}
+
+
+def _digest(material: Any) -> str:
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class ResponseKey:
+    """Everything a cached reply depends on, computed before the agent runs."""
+
+    exact: str
+    # Hash of everything except the last user message, for near-duplicate lookups
+    context: str
+    words: frozenset[str]
+    # Words with digits (course numbers, times) must match exactly
+    codes: frozenset[str]
+
+
+@dataclass
+class CachedResponse:
+    reply: str
+    chat: str
+    events: list[dict[str, Any]] = field(default_factory=list)
+    stored_at: float = 0.0
+
+
+class ResponseCache:
+    """Agent replies for repeated opening questions.
+
+    Only conversations with at most `max_user_turns` student messages after the
+    fixed preamble are cached; those are the openers many sessions share. The
+    key is a canonical hash of the normalized conversation, the model and a
+    data-version stamp from the tool caches, so replies built on course data
+    that has since changed are never served. Only exact matches are served
+    by default; with `similarity` below 1.0 (opt-in), the last student message
+    may also match an earlier one by word overlap (Jaccard), provided every
+    word containing a digit matches exactly and no negation is added or dropped.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 900,
+        max_entries: int = 256,
+        max_user_turns: int = 1,
+        similarity: float = 1.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_user_turns = max_user_turns
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[ResponseKey, CachedResponse]] = OrderedDict()
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "skipped": 0}
+
+    def key(
+        self,
+        conversation: list[types.Content],
+        *,
+        start: int,
+        model: str,
+        data_version: str,
+    ) -> ResponseKey | None:
+        """Key for `conversation`, or None if it is not a cacheable opener."""
+        turns = conversation[start:]
+        user_turns = [c for c in turns if c.role == "user" and any(p.text for p in c.parts or [])]
+        if not turns or len(user_turns) > self.max_user_turns or turns[-1].role != "user":
+            return None
+
+        canonical = [_canonical(content) for content in conversation]
+        last_text = " ".join(p for p in canonical[-1]["parts"] if isinstance(p, str))
+        context = _digest({"model": model, "data": data_version, "conversation": canonical[:-1]})
+        words = frozenset(last_text.split())
+        return ResponseKey(
+            exact=_digest({"context": context, "last": canonical[-1]}),
+            context=context,
+            words=words,
+            codes=frozenset(w for w in words if any(ch.isdigit() for ch in w)),
+        )
+
+    def get(self, key: ResponseKey) -> CachedResponse | None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key.exact)
+            if entry is not None:
+                self._entries.move_to_end(key.exact)
+                self._stats["hits"] += 1
+                return copy.deepcopy(entry[1])
+
+            if self.similarity < 1.0:
+                best, best_score = None, self.similarity
+                for stored_key, response in self._entries.values():
+                    if stored_key.context != key.context or stored_key.codes != key.codes:
+                        continue
+                    if (stored_key.words ^ key.words) & _NEGATIONS:
+                        continue
+                    score = _jaccard(stored_key.words, key.words)
+                    if score >= best_score:
+                        best, best_score = response, score
+                if best is not None:
+                    self._stats["near_hits"] += 1
+                    return copy.deepcopy(best)
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: ResponseKey, reply: str, chat: str, events: list[dict[str, Any]]) -> None:
+        response = CachedResponse(reply=reply, chat=chat, events=copy.deepcopy(events), stored_at=time.monotonic())
+        with self._lock:
+            self._entries[key.exact] = (key, response)
+            self._entries.move_to_end(key.exact)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["stores"] += 1
+
+    def skip(self) -> None:
+        """Count a reply that was not stored (e.g. it generated a schedule)."""
+        with self._lock:
+            self._stats["skipped"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def _expire(self, now: float) -> None:
+        expired = [k for k, (_, r) in self._entries.items() if now - r.stored_at > self.ttl_seconds]
+        for k in expired:
+            del self._entries[k]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+
+from google.genai import types
+
+# Requests that mention any of these need the planning model
+_PLANNING_PATTERN = re.compile(
+    r"\b[A-Z]{2,4}\s?\d{3}[A-Z]?\b"  # course codes, e.g. CSCE 310, MATH208
+    r"|\b(course|class|schedul|plan|semester|requirement|graduat|prereq|credit|section"
+    r"|professor|prof|instructor|teach|major|minor|degree|elective|register|enroll|take|taking|taken|transcript|gpa)",
+    re.IGNORECASE,
+)
+
+
+def _latest_text(content: types.Content) -> str:
+    return " ".join(part.text for part in content.parts or [] if part.text).strip()
+
+
+class ModelRouter:
+    """Pick the model tier for each call of the agent loop.
+
+    The fast tier handles calls that need no planning:
+
+    - short chit-chat from the student (greetings, thanks, small talk) that
+      mentions no course, requirement or professor, and
+    - phrasing the answer once tool results are back.
+
+    Everything else goes to the full model. The fast tier still sees the tool
+    schema; if it decides a tool is needed, the call is planning after all and
+    the caller should retry it on the full model (see `should_escalate`). A
+    turn that escalated once is a multi-step tool chain, so the caller passes
+    `escalated=True` and the rest of the turn stays on the full model rather
+    than paying for a fast call and an escalation at every step.
+    """
+
+    def __init__(self, fast_model: str, chitchat_max_chars: int = 160):
+        self.fast_model = fast_model
+        self.chitchat_max_chars = chitchat_max_chars
+
+    def route(
+        self,
+        conversation: list[types.Content],
+        full_model: str,
+        *,
+        escalated: bool = False,
+    ) -> tuple[str, str]:
+        """Return `(model, tier)` for the next call on `conversation`.
+
+        `escalated` is True once a fast-tier call in the current turn had to be
+        redone on the full model.
+        """
+        if escalated or not conversation or not self.fast_model or self.fast_model == full_model:
+            return full_model, "full"
+
+        last = conversation[-1]
+        if any(part.function_response for part in last.parts or []):
+            return self.fast_model, "fast"
+
+        if last.role == "user":
+            text = _latest_text(last)
+            if text and len(text) <= self.chitchat_max_chars and not _PLANNING_PATTERN.search(text):
+                return self.fast_model, "fast"
+
+        return full_model, "full"
+
+    @staticmethod
+    def should_escalate(tier: str, content: types.Content) -> bool:
+        """True if a fast-tier reply asked for tools and must be redone on the full model."""
+        return tier == "fast" and any(part.function_call for part in content.parts or [])
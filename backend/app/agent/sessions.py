@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from google.genai import types
+
+# Session IDs double as spill file names, so only accept what `create` issues
+_SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# A temp file this old belongs to a write that will never finish
+_STALE_TMP_SECONDS = 300
+
+
+@dataclass
+class AgentSession:
+    """A server-held conversation: its parsed history and a per-session lock.
+
+    Hold `lock` while running a turn so concurrent requests for the same
+    session are applied one after another.
+    """
+
+    session_id: str
+    history: list[types.Content]
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    # Set by `SessionStore.delete`; a deleted session is never re-admitted
+    deleted: bool = field(default=False, compare=False)
+
+
+class SessionStore:
+    """In-memory LRU of agent sessions with optional on-disk spill.
+
+    At most `max_sessions` sessions are kept in memory. When one is evicted it is
+    written to `spill_dir` (if configured) and transparently reloaded the next
+    time it is requested; without a spill directory evicted sessions are gone.
+    Spilled sessions expire after `spill_max_age_seconds`, and a background
+    thread removes expired ones, then the oldest while more than
+    `spill_max_files` are left.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        spill_dir: str | os.PathLike | None = None,
+        spill_max_age_seconds: float = 7 * 24 * 3600,
+        spill_max_files: int = 10000,
+        gc_interval_seconds: float = 600,
+    ):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1.")
+        self.max_sessions = max_sessions
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.spill_max_age_seconds = spill_max_age_seconds
+        self.spill_max_files = spill_max_files
+        self.gc_interval_seconds = gc_interval_seconds
+        self._sessions: OrderedDict[str, AgentSession] = OrderedDict()
+        # Every session object still referenced anywhere (e.g. by a running turn
+        # or a spill in progress), so an evicted one is handed out again instead
+        # of reloaded as a copy
+        self._live: weakref.WeakValueDictionary[str, AgentSession] = weakref.WeakValueDictionary()
+        # Guards the in-memory maps only, so a lookup never waits on the disk
+        self._lock = threading.Lock()
+        # Serializes spill file reads, writes and removals. When both are
+        # needed it is taken first; it is never acquired while holding `_lock`
+        self._io_lock = threading.Lock()
+        self._gc_thread: threading.Thread | None = None
+
+    def create(self, history: list[types.Content]) -> AgentSession:
+        """Start a new session seeded with `history`."""
+        session = AgentSession(session_id=uuid.uuid4().hex, history=list(history))
+        self.put(session)
+        return session
+
+    def get(self, session_id: str) -> AgentSession | None:
+        """Return a session by ID, reloading it from disk if it was spilled.
+
+        Concurrent requests for the same session always get the same object,
+        including one still referenced by a running turn after being spilled.
+        """
+        if not _SESSION_ID_PATTERN.match(session_id or ""):
+            return None
+
+        session, readmitted, evicted = self._get_in_memory(session_id)
+        if self.spill_dir is not None and (session is None or readmitted):
+            with self._io_lock:
+                if session is None:
+                    # Another request may have reloaded it while this one waited
+                    session, readmitted, evicted = self._get_in_memory(session_id)
+                if session is None:
+                    session = self._load(session_id)
+                    if session is None:
+                        return None
+                    with self._lock:
+                        evicted = self._admit(session)
+                    readmitted = True
+                if readmitted:
+                    self._drop_stale_spill(session)
+        self._spill_all(evicted)
+        return session
+
+    def put(self, session: AgentSession) -> None:
+        """Insert or refresh a session as most recently used.
+
+        Call this after each turn so a session evicted mid-turn is re-admitted
+        with its latest history. A session deleted in the meantime stays deleted.
+        """
+        with self._lock:
+            if session.deleted:
+                return
+            # Evicted (and maybe spilled) while its turn ran
+            readmitted = (
+                self._live.get(session.session_id) is session
+                and self._sessions.get(session.session_id) is not session
+            )
+            evicted = self._admit(session)
+        if readmitted and self.spill_dir is not None:
+            with self._io_lock:
+                self._drop_stale_spill(session)
+        self._spill_all(evicted)
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session, in memory and on disk. Returns True if it existed."""
+        if not _SESSION_ID_PATTERN.match(session_id or ""):
+            return False
+        # Holding the I/O lock keeps a reload in progress from re-admitting it
+        with self._io_lock:
+            with self._lock:
+                session = self._sessions.pop(session_id, None)
+                session = self._live.pop(session_id, None) or session
+                if session is not None:
+                    session.deleted = True
+            return self._discard_spill(session_id) or session is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def gc(self, now: float | None = None) -> int:
+        """Apply the spill age and count limits now; returns how many files were removed."""
+        if self.spill_dir is None:
+            return 0
+        now = time.time() if now is None else now
+        with self._io_lock:
+            try:
+                entries = [(entry.stat().st_mtime, entry) for entry in os.scandir(self.spill_dir) if entry.is_file()]
+            except FileNotFoundError:
+                return 0
+
+            removed = 0
+            spills = []
+            for mtime, entry in entries:
+                if entry.name.endswith(".tmp"):
+                    # Left behind by a write that crashed part-way
+                    if now - mtime > _STALE_TMP_SECONDS:
+                        removed += _remove(entry.path)
+                elif entry.name.endswith(".json"):
+                    if now - mtime > self.spill_max_age_seconds:
+                        removed += _remove(entry.path)
+                    else:
+                        spills.append((mtime, entry.path))
+
+            spills.sort()
+            for _, path in spills[: max(0, len(spills) - self.spill_max_files)]:
+                removed += _remove(path)
+            return removed
+
+    def _get_in_memory(self, session_id: str) -> tuple[AgentSession | None, bool, list[AgentSession]]:
+        """Look up a session without touching the disk.
+
+        Returns the session (or None), whether it had been evicted and was
+        re-admitted, and the sessions that re-admitting it pushed out.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                return session, False, []
+            session = self._live.get(session_id)
+            if session is None:
+                return None, False, []
+            return session, True, self._admit(session)
+
+    def _admit(self, session: AgentSession) -> list[AgentSession]:
+        """Make `session` most recently used; returns the sessions it pushed out.
+
+        Call with `_lock` held, and pass the result to `_spill_all` after releasing it.
+        """
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        self._live[session.session_id] = session
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            evicted.append(self._sessions.popitem(last=False)[1])
+        if self.spill_dir is None:
+            # Without a spill directory an evicted session is gone
+            for gone in evicted:
+                self._live.pop(gone.session_id, None)
+            return []
+        return evicted
+
+    def _drop_stale_spill(self, session: AgentSession) -> None:
+        # Call with `_io_lock` held. Memory has the latest history again, unless
+        # the session was pushed out (and is waiting to be spilled) since
+        with self._lock:
+            current = self._sessions.get(session.session_id) is session
+        if current:
+            self._discard_spill(session.session_id)
+
+    def _spill_all(self, sessions: list[AgentSession]) -> None:
+        # The list keeps each session alive (and so in `_live`) until it is on disk
+        if not sessions:
+            return
+        with self._io_lock:
+            for session in sessions:
+                with self._lock:
+                    # Deleted, or re-admitted while waiting: memory has the latest
+                    current = self._sessions.get(session.session_id) is session
+                    if session.deleted or current:
+                        continue
+                self._spill(session)
+        self._start_gc()
+
+    def _spill_path(self, session_id: str) -> Path | None:
+        if self.spill_dir is None:
+            return None
+        return self.spill_dir / f"{session_id}.json"
+
+    def _spill(self, session: AgentSession) -> None:
+        path = self._spill_path(session.session_id)
+        if path is None:
+            return
+        data = [content.model_dump(mode="json", exclude_none=True) for content in session.history]
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _load(self, session_id: str) -> AgentSession | None:
+        path = self._spill_path(session_id)
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > self.spill_max_age_seconds:
+                self._discard_spill(session_id)
+                return None
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        history = [types.Content.model_validate(item) for item in data]
+        return AgentSession(session_id=session_id, history=history)
+
+    def _discard_spill(self, session_id: str) -> bool:
+        path = self._spill_path(session_id)
+        if path is None:
+            return False
+        return bool(_remove(str(path)))
+
+    def _start_gc(self) -> None:
+        if self.gc_interval_seconds <= 0 or self._gc_thread is not None:
+            return
+        with self._lock:
+            if self._gc_thread is not None:
+                return
+            self._gc_thread = threading.Thread(target=self._gc_loop, name="agent-session-gc", daemon=True)
+            self._gc_thread.start()
+
+    def _gc_loop(self) -> None:
+        while True:
+            try:
+                self.gc()
+            except OSError as exc:
+                print(f"[warn] Agent session spill GC failed: {exc}")
+            time.sleep(self.gc_interval_seconds)
+
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
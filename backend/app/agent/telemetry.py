@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+# Samples kept per series for percentiles
+_WINDOW = 512
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+@dataclass
+class ModelSpan:
+    """One model call.
+
+    `queue_ms` is the time spent preparing the request (compaction, resolving
+    the context cache) before it is sent. `ttfb_ms` is the time from sending to
+    the first response chunk; for non-streaming calls the whole response
+    arrives at once, so it equals the network part of `total_ms`.
+    """
+
+    model: str
+    tier: str = "full"
+    queue_ms: float = 0.0
+    ttfb_ms: float | None = None
+    total_ms: float = 0.0
+    input_tokens: int | None = None
+    cached_tokens: int | None = None
+    output_tokens: int | None = None
+    error: bool = False
+
+    def __post_init__(self) -> None:
+        self._started = time.perf_counter()
+        self._sent: float | None = None
+
+    def sent(self) -> None:
+        """Mark the request as handed to the provider."""
+        self._sent = time.perf_counter()
+        self.queue_ms = _ms(self._sent - self._started)
+
+    def first_byte(self) -> None:
+        if self.ttfb_ms is None:
+            self.ttfb_ms = _ms(time.perf_counter() - (self._sent or self._started))
+
+    def usage(self, usage: Any) -> None:
+        """Copy token counts from a `GenerateContentResponseUsageMetadata`."""
+        if usage is None:
+            return
+        self.input_tokens = usage.prompt_token_count
+        self.cached_tokens = usage.cached_content_token_count
+        output = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+        self.output_tokens = output or None
+
+
+@dataclass
+class ToolSpan:
+    """One tool call. `cache` is "hit", "miss", "partial" or None if uncached."""
+
+    name: str
+    queue_ms: float = 0.0
+    total_ms: float = 0.0
+    upstream_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    error: bool = False
+
+    @property
+    def cache(self) -> str | None:
+        if self.cache_hits and self.cache_misses:
+            return "partial"
+        if self.cache_hits:
+            return "hit"
+        if self.cache_misses:
+            return "miss"
+        return None
+
+
+@dataclass
+class TurnTrace:
+    """Every span recorded while answering one chat request."""
+
+    model_calls: list[ModelSpan] = field(default_factory=list)
+    tool_calls: list[ToolSpan] = field(default_factory=list)
+    total_ms: float = 0.0
+    # "hit" or "miss" when the reply cache was consulted
+    response_cache: str | None = None
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def add(self, span: ModelSpan | ToolSpan) -> None:
+        with self._lock:
+            if isinstance(span, ModelSpan):
+                self.model_calls.append(span)
+            else:
+                self.tool_calls.append(span)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "total_ms": self.total_ms,
+                "response_cache": self.response_cache,
+                "model_ms": round(sum(s.total_ms for s in self.model_calls), 1),
+                "tool_ms": round(sum(s.total_ms for s in self.tool_calls), 1),
+                "model_calls": [asdict(s) for s in self.model_calls],
+                "tool_calls": [{**asdict(s), "cache": s.cache} for s in self.tool_calls],
+            }
+
+
+class _Series:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=_WINDOW)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def summary(self) -> dict[str, float]:
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        return {
+            "avg": round(self.total / self.count, 1),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+
+class AgentMetrics:
+    """Process-wide aggregates of every span, served by `/api/agent/metrics`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._turns = _Series()
+            self._models: dict[tuple[str, str], dict[str, Any]] = {}
+            self._tools: dict[str, dict[str, Any]] = {}
+
+    def record_turn(self, trace: TurnTrace) -> None:
+        with self._lock:
+            self._turns.add(trace.total_ms)
+
+    def record_model(self, span: ModelSpan) -> None:
+        with self._lock:
+            entry = self._models.setdefault((span.model, span.tier), {
+                "calls": 0, "errors": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+                "queue_ms": _Series(), "ttfb_ms": _Series(), "total_ms": _Series(),
+            })
+            entry["calls"] += 1
+            entry["errors"] += int(span.error)
+            entry["input_tokens"] += span.input_tokens or 0
+            entry["cached_tokens"] += span.cached_tokens or 0
+            entry["output_tokens"] += span.output_tokens or 0
+            entry["queue_ms"].add(span.queue_ms)
+            if span.ttfb_ms is not None:
+                entry["ttfb_ms"].add(span.ttfb_ms)
+            entry["total_ms"].add(span.total_ms)
+
+    def record_tool(self, span: ToolSpan) -> None:
+        with self._lock:
+            entry = self._tools.setdefault(span.name, {
+                "calls": 0, "errors": 0, "cache_hits": 0, "cache_misses": 0,
+                "queue_ms": _Series(), "upstream_ms": _Series(), "total_ms": _Series(),
+            })
+            entry["calls"] += 1
+            entry["errors"] += int(span.error)
+            entry["cache_hits"] += span.cache_hits
+            entry["cache_misses"] += span.cache_misses
+            entry["queue_ms"].add(span.queue_ms)
+            entry["upstream_ms"].add(span.upstream_ms)
+            entry["total_ms"].add(span.total_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        def flatten(entry: dict[str, Any]) -> dict[str, Any]:
+            return {k: v.summary() if isinstance(v, _Series) else v for k, v in entry.items()}
+
+        with self._lock:
+            return {
+                "turns": {"count": self._turns.count, "total_ms": self._turns.summary()},
+                "models": [
+                    {"model": model, "tier": tier, **flatten(entry)}
+                    for (model, tier), entry in self._models.items()
+                ],
+                "tools": {name: flatten(entry) for name, entry in self._tools.items()},
+            }
+
+
+METRICS = AgentMetrics()
+
+_current_trace: ContextVar[TurnTrace | None] = ContextVar("agent_turn_trace", default=None)
+_current_tool: ContextVar[ToolSpan | None] = ContextVar("agent_tool_span", default=None)
+
+
+@contextmanager
+def trace_turn() -> Iterator[TurnTrace]:
+    """Collect the spans of one chat request.
+
+    Spans started in worker threads only land in the trace if the submitting
+    context was copied (`contextvars.copy_context().run`).
+    """
+    trace = TurnTrace()
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.total_ms = _ms(time.perf_counter() - started)
+        METRICS.record_turn(trace)
+
+
+@contextmanager
+def model_span(model: str, tier: str = "full") -> Iterator[ModelSpan]:
+    span = ModelSpan(model=model, tier=tier)
+    try:
+        yield span
+    except Exception:
+        span.error = True
+        raise
+    finally:
+        span.total_ms = _ms(time.perf_counter() - span._started)
+        METRICS.record_model(span)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(span)
+
+
+@contextmanager
+def tool_span(name: str, submitted_at: float | None = None) -> Iterator[ToolSpan]:
+    """Time a tool call. `submitted_at` (a `perf_counter` value) measures pool queueing."""
+    span = ToolSpan(name=name)
+    started = time.perf_counter()
+    if submitted_at is not None:
+        span.queue_ms = _ms(started - submitted_at)
+    token = _current_tool.set(span)
+    try:
+        yield span
+    except Exception:
+        span.error = True
+        raise
+    finally:
+        _current_tool.reset(token)
+        span.total_ms = _ms(time.perf_counter() - started)
+        METRICS.record_tool(span)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(span)
+
+
+def record_response_cache(hit: bool) -> None:
+    """Note whether the current turn was answered from the agent reply cache."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.response_cache = "hit" if hit else "miss"
+
+
+def record_cache(hit: bool) -> None:
+    """Note a cache lookup made by the tool currently running, if any."""
+    span = _current_tool.get()
+    if span is None:
+        return
+    if hit:
+        span.cache_hits += 1
+    else:
+        span.cache_misses += 1
+
+
+@contextmanager
+def upstream() -> Iterator[None]:
+    """Attribute the enclosed time to upstream calls of the running tool."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        span = _current_tool.get()
+        if span is not None:
+            span.upstream_ms = round(span.upstream_ms + _ms(time.perf_counter() - started), 1)
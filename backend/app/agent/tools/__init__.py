@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from .course_info_tool import (
+    course_info_version,
     TOOL_DECLARATIONS as COURSE_INFO_TOOL_DECLARATIONS,
     TOOL_HANDLERS as COURSE_INFO_TOOL_HANDLERS,
 )
@@ -11,10 +12,12 @@ from .generate_schedule_tool import (
     TOOL_HANDLERS as GENERATE_SCHEDULE_TOOL_HANDLERS,
 )
 from .graduation_requirements_tool import (
+    ASYNC_TOOL_HANDLERS as GRADUATION_REQUIREMENTS_ASYNC_TOOL_HANDLERS,
     TOOL_DECLARATIONS as GRADUATION_REQUIREMENTS_TOOL_DECLARATIONS,
     TOOL_HANDLERS as GRADUATION_REQUIREMENTS_TOOL_HANDLERS,
 )
 from .rmp_tool import (
+    professor_summary_version,
     TOOL_DECLARATIONS as RMP_TOOL_DECLARATIONS,
     TOOL_HANDLERS as RMP_TOOL_HANDLERS,
 )
@@ -22,6 +25,11 @@ from .search_courses_tool import (
     TOOL_DECLARATIONS as SEARCH_COURSES_TOOL_DECLARATIONS,
     TOOL_HANDLERS as SEARCH_COURSES_TOOL_HANDLERS,
 )
+from .transcript_tool import (
+    ASYNC_TOOL_HANDLERS as TRANSCRIPT_ASYNC_TOOL_HANDLERS,
+    TOOL_DECLARATIONS as TRANSCRIPT_TOOL_DECLARATIONS,
+    TOOL_HANDLERS as TRANSCRIPT_TOOL_HANDLERS,
+)
 
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
@@ -32,6 +40,7 @@ ALL_TOOL_DECLARATIONS = (
     + list(GENERATE_SCHEDULE_TOOL_DECLARATIONS)
     + list(GRADUATION_REQUIREMENTS_TOOL_DECLARATIONS)
     + list(SEARCH_COURSES_TOOL_DECLARATIONS)
+    + list(TRANSCRIPT_TOOL_DECLARATIONS)
 )
 ALL_TOOL_HANDLERS = {
     **RMP_TOOL_HANDLERS,
@@ -39,7 +48,26 @@ ALL_TOOL_HANDLERS = {
     **GENERATE_SCHEDULE_TOOL_HANDLERS,
     **GRADUATION_REQUIREMENTS_TOOL_HANDLERS,
     **SEARCH_COURSES_TOOL_HANDLERS,
+    **TRANSCRIPT_TOOL_HANDLERS,
+}
+# Native coroutine handlers; tools without one run their sync handler on a thread
+ALL_ASYNC_TOOL_HANDLERS = {
+    **GRADUATION_REQUIREMENTS_ASYNC_TOOL_HANDLERS,
+    **TRANSCRIPT_ASYNC_TOOL_HANDLERS,
 }
 
-__all__ = ["ALL_TOOL_DECLARATIONS", "ALL_TOOL_HANDLERS", "ToolPayload", "ToolResult"]
+
+def data_version() -> str:
+    """Stamp that changes whenever any cached tool data is replaced or dropped."""
+    return f"course:{course_info_version()}/professor:{professor_summary_version()}"
+
+
+__all__ = [
+    "ALL_ASYNC_TOOL_HANDLERS",
+    "ALL_TOOL_DECLARATIONS",
+    "ALL_TOOL_HANDLERS",
+    "ToolPayload",
+    "ToolResult",
+    "data_version",
+]
 
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
 from typing import Any, Dict
 
+from app.agent import telemetry
+from app.services import deadline
 from app.services.collegescheduler import get_registration_blocks
+from app.services.singleflight import SingleFlight
 from app.services.unl import get_unl_course_info
 
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
 
-# In-memory cache for course info, keyed by normalized course ID
-_COURSE_INFO_CACHE: Dict[str, tuple[ToolResult, str | None]] = {}
+# In-memory cache for course info, keyed by normalized course ID:
+# (result, markdown table, time.monotonic() when fetched)
+_COURSE_INFO_CACHE: Dict[str, tuple[ToolResult, str | None, float]] = {}
+_COURSE_INFO_CACHE_LOCK = threading.Lock()
+# Concurrent lookups for the same course share one upstream fetch
+_COURSE_INFO_FLIGHT = SingleFlight()
+# Bumped whenever cached course data is replaced or dropped, so anything derived
+# from it (e.g. cached agent replies) can tell it is stale
+_COURSE_INFO_VERSION = 0
+# Entries older than this are refetched (sections fill up and move); a refetch
+# that finds different data bumps the version
+_COURSE_INFO_TTL_SECONDS = float(os.getenv("COURSE_INFO_CACHE_TTL_SECONDS", "3600"))
+
+
+def _fresh(entry: tuple[ToolResult, str | None, float] | None) -> bool:
+    return entry is not None and time.monotonic() - entry[2] < _COURSE_INFO_TTL_SECONDS
 
 _TOOL_DECLARATIONS = [
     {
@@ -117,6 +137,15 @@ def _generate_sections_markdown_table(sections: list[Dict[str, Any]], course_id:
     return f"{heading}\n\n{table}"
 
 
+def is_course_info_cached(course_id: str) -> bool:
+    """True if a course's info is cached or already being fetched."""
+    normalized_id = _normalize_course_id(course_id)
+    with _COURSE_INFO_CACHE_LOCK:
+        if _fresh(_COURSE_INFO_CACHE.get(normalized_id)):
+            return True
+    return _COURSE_INFO_FLIGHT.in_flight(normalized_id)
+
+
 def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
     course_id = payload.get("course_id")
     if not course_id:
@@ -125,13 +154,28 @@ def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
     normalized_id = _normalize_course_id(course_id)
     
     # Check cache first
-    if normalized_id in _COURSE_INFO_CACHE:
+    with _COURSE_INFO_CACHE_LOCK:
+        cached = _COURSE_INFO_CACHE.get(normalized_id)
+    if _fresh(cached):
         print("=============== CACHE HIT FOR COURSE INFO ===============")
-        cached_result, cached_markdown = _COURSE_INFO_CACHE[normalized_id]
+        telemetry.record_cache(hit=True)
+        cached_result, cached_markdown, _ = cached
         return cached_result, cached_markdown
-    
+
+    telemetry.record_cache(hit=False)
+    with telemetry.upstream():
+        return _COURSE_INFO_FLIGHT.do(
+            normalized_id, lambda: _fetch_course_info(normalized_id), timeout=deadline.remaining()
+        )
+
+
+def _fetch_course_info(normalized_id: str) -> tuple[ToolResult, str | None]:
+    """Fetch catalog and registration data for a course and cache the result."""
     errors: Dict[str, str] = {}
 
+    # A source that ran out of time may answer next time, so such results are not cached
+    timed_out = False
+
     catalog_data: Dict[str, Any] | None = None
     try:
         unl_response = get_unl_course_info(normalized_id)
@@ -142,12 +186,16 @@ def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
             catalog_data = dict(unl_response)
         elif isinstance(unl_response, dict):
             errors["catalog"] = unl_response.get("error", "Unknown catalog error.")
+            timed_out = bool(unl_response.get("timed_out"))
         else:  # pragma: no cover - defensive
             errors["catalog"] = "Unexpected response from catalog service."
 
     registration_data: Any | None = None
     try:
         registration_response = get_registration_blocks(normalized_id)
+    except TimeoutError as exc:
+        errors["registration_blocks"] = str(exc)
+        timed_out = True
     except Exception as exc:  # pragma: no cover - defensive
         errors["registration_blocks"] = str(exc)
     else:
@@ -160,7 +208,9 @@ def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
         combined_data["registration_blocks"] = registration_data
 
     found = bool(combined_data)
-    if found and errors:
+    if timed_out:
+        message = "Course data could not be fully retrieved in time; answer with what is available."
+    elif found and errors:
         message = "Course data retrieved with partial errors."
     elif found:
         message = "Course data retrieved successfully."
@@ -175,6 +225,8 @@ def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
 
     if errors:
         result["errors"] = errors
+    if timed_out:
+        result["timed_out"] = True
 
     # Generate markdown table if sections are available
     markdown_table = None
@@ -183,12 +235,34 @@ def _handle_get_course_info(payload: ToolPayload) -> ToolResult:
         if sections:
             markdown_table = _generate_sections_markdown_table(sections, normalized_id)
 
-    # Store in cache before returning
-    _COURSE_INFO_CACHE[normalized_id] = (result, markdown_table)
+    if timed_out:
+        return result, markdown_table
+
+    # Store in cache before returning; an expired entry being refreshed with
+    # different data makes everything derived from the old data stale
+    global _COURSE_INFO_VERSION
+    with _COURSE_INFO_CACHE_LOCK:
+        previous = _COURSE_INFO_CACHE.get(normalized_id)
+        if previous is not None and previous[:2] != (result, markdown_table):
+            _COURSE_INFO_VERSION += 1
+        _COURSE_INFO_CACHE[normalized_id] = (result, markdown_table, time.monotonic())
 
     return result, markdown_table
 
 
+def course_info_version() -> int:
+    with _COURSE_INFO_CACHE_LOCK:
+        return _COURSE_INFO_VERSION
+
+
+def clear_course_info_cache() -> None:
+    """Drop all cached course info (e.g. after the next semester's sections change)."""
+    global _COURSE_INFO_VERSION
+    with _COURSE_INFO_CACHE_LOCK:
+        _COURSE_INFO_CACHE.clear()
+        _COURSE_INFO_VERSION += 1
+
+
 TOOL_DECLARATIONS = _TOOL_DECLARATIONS
 TOOL_HANDLERS = {
     "get_course_info": _handle_get_course_info,
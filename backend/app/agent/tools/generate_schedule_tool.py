@@ -1,20 +1,22 @@
 from __future__ import annotations
 
-import uuid
-from pathlib import Path
 from typing import Any, Dict
 
-from app.services.schedule_visualizer import generate_schedule_png
+from app.agent import memo
+from app.services.render_jobs import render_jobs
 from .course_info_tool import _handle_get_course_info, _normalize_course_id
 
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
 
+# Formats the model may ask for; without one, SCHEDULE_IMAGE_FORMAT applies
+_IMAGE_FORMATS = ("svg", "png")
+
 _TOOL_DECLARATIONS = [
     {
         "name": "generate_schedule",
         "description": (
-            "Generate a visual schedule PNG image for a list of courses. "
+            "Generate a visual schedule image for a list of courses. "
             "Takes an array of course objects, each containing a course_id and section_id. "
             "The tool will fetch course information and create a schedule visualization showing "
             "when and where each course meets. "
@@ -43,6 +45,14 @@ _TOOL_DECLARATIONS = [
                         "required": ["course_id", "section_id"],
                     },
                 },
+                "format": {
+                    "type": "string",
+                    "enum": list(_IMAGE_FORMATS),
+                    "description": (
+                        "Optional image format: 'svg' (sharp at any zoom, the usual choice) or "
+                        "'png' (when the student wants a picture to save or share)."
+                    ),
+                },
             },
             "required": ["courses"],
         },
@@ -61,6 +71,10 @@ def _handle_generate_schedule(payload: ToolPayload) -> tuple[ToolResult, str | N
     
     if not courses:
         raise ValueError("'courses' array cannot be empty.")
+
+    image_format = payload.get("format")
+    if image_format is not None and image_format not in _IMAGE_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(_IMAGE_FORMATS)}.")
     
     # Collect course data for each course
     course_data_list = []
@@ -85,9 +99,13 @@ def _handle_generate_schedule(payload: ToolPayload) -> tuple[ToolResult, str | N
         # Normalize course_id for consistency
         normalized_course_id = _normalize_course_id(course_id)
         
-        # Call the course_info_tool handler to get course data
+        # Call the course_info_tool handler to get course data, reusing a lookup
+        # the model already made this turn
+        lookup = {"course_id": normalized_course_id}
         try:
-            course_info_result, _ = _handle_get_course_info({"course_id": normalized_course_id})
+            course_info_result, _ = memo.call(
+                "get_course_info", lookup, lambda: _handle_get_course_info(lookup)
+            )
         except Exception as exc:
             errors.append(f"Failed to fetch info for {course_id}: {str(exc)}")
             continue
@@ -135,29 +153,11 @@ def _handle_generate_schedule(payload: ToolPayload) -> tuple[ToolResult, str | N
         }
         return result, None
     
-    # Generate the schedule PNG
+    # Render the schedule in the requested format (or SCHEDULE_IMAGE_FORMAT) in
+    # the background; the image route waits for it when the browser asks
     try:
-        png_buffer = generate_schedule_png(course_data_list)
-        
-        # Generate a UUID filename
-        filename = f"schedule-{uuid.uuid4()}.png"
-        
-        # Determine the path to the public directory
-        # From backend/app/agent/tools/, go up to project root, then to frontend/public/
-        current_file = Path(__file__)
-        project_root = current_file.parent.parent.parent.parent.parent
-        public_dir = project_root / "frontend" / "public"
-        
-        # Ensure the public directory exists
-        public_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Write the PNG file
-        png_path = public_dir / filename
-        with open(png_path, "wb") as f:
-            f.write(png_buffer.getvalue())
-        
-        # Return the URL path (relative to public directory)
-        image_url = f"/{filename}"
+        image_id = render_jobs.submit(course_data_list, image_format)
+        image_url = f"/api/schedule/image/{image_id}"
         
         result: ToolResult = {
             "success": True,
@@ -177,7 +177,7 @@ def _handle_generate_schedule(payload: ToolPayload) -> tuple[ToolResult, str | N
     except Exception as exc:
         result: ToolResult = {
             "success": False,
-            "error": f"Failed to generate schedule PNG: {str(exc)}",
+            "error": f"Failed to generate schedule image: {str(exc)}",
         }
         if errors:
             result["errors"] = errors
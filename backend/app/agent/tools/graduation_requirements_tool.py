@@ -62,3 +62,12 @@ TOOL_HANDLERS = {
     "get_remaining_graduation_requirements": _handle_get_remaining_graduation_requirements,
 }
 
+
+async def _handle_get_remaining_graduation_requirements_async(payload: ToolPayload) -> tuple[ToolResult, None]:
+    """Async variant; the requirements are in memory, so no thread is needed."""
+    return _handle_get_remaining_graduation_requirements(payload)
+
+
+ASYNC_TOOL_HANDLERS = {
+    "get_remaining_graduation_requirements": _handle_get_remaining_graduation_requirements_async,
+}
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+ToolResult = Dict[str, Any]
+
+
+def _is_empty(value: Any) -> bool:
+    """True for values that carry no information for the model."""
+    return value is None or value == "" or (isinstance(value, (list, dict)) and not value)
+
+
+def _drop_empty(value: Any) -> Any:
+    """Recursively remove empty strings, None, and empty containers."""
+    if isinstance(value, dict):
+        cleaned = {k: _drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        cleaned = [_drop_empty(v) for v in value]
+        return [v for v in cleaned if not _is_empty(v)]
+    return value
+
+
+def _compact_time(time: Any) -> str:
+    """Convert an HHMM integer (e.g. 930) to 24-hour "09:30"."""
+    if not isinstance(time, int) or time <= 0:
+        return ""
+    return f"{time // 100:02d}:{time % 100:02d}"
+
+
+def _compact_meeting(meeting: Dict[str, Any]) -> str:
+    """Flatten a meeting into e.g. "MWF 09:30-10:20 @ AVH 106"."""
+    days = meeting.get("days") or meeting.get("daysRaw") or ""
+    start = _compact_time(meeting.get("startTime"))
+    end = _compact_time(meeting.get("endTime"))
+    text = f"{days} {start}-{end}".strip() if start and end else days
+    location = meeting.get("location") or " ".join(
+        str(v) for v in (meeting.get("buildingCode"), meeting.get("room")) if v
+    )
+    if location:
+        text = f"{text} @ {location}" if text else f"@ {location}"
+    return text
+
+
+def _compact_sections(sections: list[Any], instructor_ids: Dict[str, str]) -> list[str]:
+    """Flatten sections into one line each, referencing instructors by short ID."""
+    lines = []
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+
+        head = " ".join(
+            str(v) for v in (section.get("sectionNumber"), section.get("component")) if not _is_empty(v)
+        )
+        if not _is_empty(section.get("credits")):
+            head += f" {section['credits']}cr"
+        fields = [head.strip()]
+
+        meetings = [_compact_meeting(m) for m in section.get("meetings") or [] if isinstance(m, dict)]
+        meetings = [m for m in meetings if m]
+        if meetings:
+            fields.append("; ".join(meetings))
+
+        refs = []
+        for instructor in section.get("instructor") or []:
+            name = instructor.get("name") if isinstance(instructor, dict) else None
+            if not name:
+                continue
+            if name not in instructor_ids:
+                instructor_ids[name] = f"I{len(instructor_ids) + 1}"
+            refs.append(instructor_ids[name])
+        if refs:
+            fields.append(",".join(refs))
+
+        if section.get("openSeats") is not None:
+            fields.append(f"{section['openSeats']} open")
+        if section.get("waitlistOpen"):
+            fields.append("waitlist open")
+
+        lines.append(" | ".join(f for f in fields if f))
+    return lines
+
+
+def _project_course_info(output: ToolResult) -> ToolResult:
+    projected: ToolResult = {
+        k: output[k] for k in ("found", "message", "errors", "timed_out", "note") if not _is_empty(output.get(k))
+    }
+
+    data = output.get("data") or {}
+    catalog = data.get("catalog")
+    if isinstance(catalog, dict):
+        projected["course"] = _drop_empty(catalog)
+
+    blocks = data.get("registration_blocks")
+    if isinstance(blocks, dict):
+        sections = blocks.get("sections") or []
+        instructor_ids: Dict[str, str] = {}
+        lines = _compact_sections(sections, instructor_ids)
+        if instructor_ids:
+            projected["instructors"] = {ref: name for name, ref in instructor_ids.items()}
+        if lines:
+            projected["sections_format"] = "section component credits | meetings | instructors | open seats"
+        # An empty list is meaningful: the course is not offered next semester
+        projected["sections"] = lines
+        extra = _drop_empty({k: v for k, v in blocks.items() if k != "sections"})
+        if extra:
+            projected["registration"] = extra
+
+    return projected
+
+
+_PROJECTIONS = {
+    "get_course_info": _project_course_info,
+}
+
+
+def project_tool_output(name: str, output: Any) -> Any:
+    """Encode a tool result densely for the model.
+
+    The full result still goes to the frontend through tool events; only what
+    is sent back to Gemini is projected. Course info is flattened into one line
+    per section with instructors listed once, and every other tool's output
+    simply drops empty fields.
+    """
+    projection = _PROJECTIONS.get(name)
+    if projection is not None and isinstance(output, dict):
+        return projection(output)
+    return _drop_empty(output)
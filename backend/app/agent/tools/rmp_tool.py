@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
 from typing import Any, Dict
 
+from app.agent import telemetry
+from app.services import deadline
 from app.services.rmp import RMPClient
+from app.services.singleflight import SingleFlight
 
 _DEFAULT_SCHOOL = "University of Nebraska-Lincoln"
 
@@ -26,13 +32,36 @@ _TOOL_DECLARATIONS = [
     },
 ]
 
-_rmp_client = RMPClient()
+_rmp_client: RMPClient | None = None
+_rmp_client_lock = threading.Lock()
 
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
 
-# In-memory cache for professor summaries, keyed by normalized professor name
-_PROFESSOR_SUMMARY_CACHE: Dict[str, tuple[ToolResult, str | None]] = {}
+# In-memory cache for professor summaries, keyed by normalized professor name:
+# (summary, markdown table, time.monotonic() when fetched)
+_PROFESSOR_SUMMARY_CACHE: Dict[str, tuple[ToolResult, str | None, float]] = {}
+_PROFESSOR_SUMMARY_CACHE_LOCK = threading.Lock()
+# Concurrent lookups for the same professor share one upstream fetch
+_PROFESSOR_SUMMARY_FLIGHT = SingleFlight()
+# Bumped whenever a cached summary is replaced or dropped
+_PROFESSOR_SUMMARY_VERSION = 0
+# Entries older than this are refetched; a refetch with different data bumps the version
+_PROFESSOR_SUMMARY_TTL_SECONDS = float(os.getenv("PROFESSOR_SUMMARY_CACHE_TTL_SECONDS", "86400"))
+
+
+def _fresh(entry: tuple[ToolResult, str | None, float] | None) -> bool:
+    return entry is not None and time.monotonic() - entry[2] < _PROFESSOR_SUMMARY_TTL_SECONDS
+
+
+def get_rmp_client() -> RMPClient:
+    """Return the shared RMP client, creating it on first use rather than at import."""
+    global _rmp_client
+    if _rmp_client is None:
+        with _rmp_client_lock:
+            if _rmp_client is None:
+                _rmp_client = RMPClient()
+    return _rmp_client
 
 
 def _normalize_professor_name(professor_name: str) -> str:
@@ -80,6 +109,15 @@ def _generate_professor_summary_markdown_table(summary: Dict[str, Any]) -> str:
     return f"{heading}\n\n{table}"
 
 
+def is_professor_summary_cached(professor_name: str) -> bool:
+    """True if a professor's summary is cached or already being fetched."""
+    normalized_name = _normalize_professor_name(professor_name)
+    with _PROFESSOR_SUMMARY_CACHE_LOCK:
+        if _fresh(_PROFESSOR_SUMMARY_CACHE.get(normalized_name)):
+            return True
+    return _PROFESSOR_SUMMARY_FLIGHT.in_flight(normalized_name)
+
+
 def _handle_get_professor_summary(payload: ToolPayload) -> ToolResult:
     professor_name = payload.get("professor_name")
     if not professor_name:
@@ -88,14 +126,26 @@ def _handle_get_professor_summary(payload: ToolPayload) -> ToolResult:
     normalized_name = _normalize_professor_name(professor_name)
     
     # Check cache first
-    if normalized_name in _PROFESSOR_SUMMARY_CACHE:
+    with _PROFESSOR_SUMMARY_CACHE_LOCK:
+        cached = _PROFESSOR_SUMMARY_CACHE.get(normalized_name)
+    if _fresh(cached):
         print("=============== CACHE HIT FOR PROFESSOR SUMMARY ===============")
-        cached_summary, cached_markdown = _PROFESSOR_SUMMARY_CACHE[normalized_name]
+        telemetry.record_cache(hit=True)
+        cached_summary, cached_markdown, _ = cached
         return cached_summary, cached_markdown
 
-    summary = _rmp_client.get_professor_summary(
+    telemetry.record_cache(hit=False)
+    with telemetry.upstream():
+        return _PROFESSOR_SUMMARY_FLIGHT.do(
+            normalized_name, lambda: _fetch_professor_summary(normalized_name), timeout=deadline.remaining()
+        )
+
+
+def _fetch_professor_summary(normalized_name: str) -> tuple[ToolResult, str | None]:
+    """Fetch a professor summary from RateMyProfessors and cache the result."""
+    summary = get_rmp_client().get_professor_summary(
         school_name=_DEFAULT_SCHOOL,
-        professor_name=professor_name,
+        professor_name=normalized_name,
     )
 
     # Generate markdown table if summary is available
@@ -103,12 +153,31 @@ def _handle_get_professor_summary(payload: ToolPayload) -> ToolResult:
     if summary and isinstance(summary, dict):
         markdown_table = _generate_professor_summary_markdown_table(summary)
 
-    # Store in cache before returning
-    _PROFESSOR_SUMMARY_CACHE[normalized_name] = (summary, markdown_table)
+    # Store in cache before returning; refreshing an expired entry with
+    # different data makes everything derived from the old data stale
+    global _PROFESSOR_SUMMARY_VERSION
+    with _PROFESSOR_SUMMARY_CACHE_LOCK:
+        previous = _PROFESSOR_SUMMARY_CACHE.get(normalized_name)
+        if previous is not None and previous[:2] != (summary, markdown_table):
+            _PROFESSOR_SUMMARY_VERSION += 1
+        _PROFESSOR_SUMMARY_CACHE[normalized_name] = (summary, markdown_table, time.monotonic())
 
     return summary, markdown_table
 
 
+def professor_summary_version() -> int:
+    with _PROFESSOR_SUMMARY_CACHE_LOCK:
+        return _PROFESSOR_SUMMARY_VERSION
+
+
+def clear_professor_summary_cache() -> None:
+    """Drop all cached professor summaries."""
+    global _PROFESSOR_SUMMARY_VERSION
+    with _PROFESSOR_SUMMARY_CACHE_LOCK:
+        _PROFESSOR_SUMMARY_CACHE.clear()
+        _PROFESSOR_SUMMARY_VERSION += 1
+
+
 TOOL_DECLARATIONS = _TOOL_DECLARATIONS
 TOOL_HANDLERS = {
     "get_professor_summary": _handle_get_professor_summary,
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from app.agent import telemetry
 from app.services.unl import get_unl_course_info
 
 ToolPayload = Dict[str, Any]
@@ -47,7 +48,8 @@ def _handle_search_courses(payload: ToolPayload) -> tuple[ToolResult, str | None
         raise ValueError("Function call missing 'query'.")
 
     try:
-        unl_response = get_unl_course_info(query)
+        with telemetry.upstream():
+            unl_response = get_unl_course_info(query)
     except Exception as exc:
         return {
             "found": False,
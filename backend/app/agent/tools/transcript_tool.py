@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from app.services.transcript import get_transcript_index
+
+ToolPayload = Dict[str, Any]
+ToolResult = Dict[str, Any]
+
+_TOOL_DECLARATIONS = [
+    {
+        "name": "check_transcript",
+        "description": (
+            "Look up the student's transcript. Pass 'course_ids' to check whether the student "
+            "has completed, is currently taking, or has not taken each course (honors and regular "
+            "sections count as the same course; the grade and term are included). "
+            "Call it with no arguments for a summary: programs, GPA, credit hours completed "
+            "and in progress, current courses, and hours by term. "
+            "Use it before recommending a course, so you never suggest one the student has "
+            "already taken or is taking."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "course_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Course identifiers to check (e.g. ['CSCE 310', 'MATH 208']).",
+                },
+            },
+            "required": [],
+        },
+    }
+]
+
+
+def _handle_check_transcript(payload: ToolPayload) -> tuple[ToolResult, None]:
+    course_ids = payload.get("course_ids") or []
+    if isinstance(course_ids, str):
+        course_ids = [course_ids]
+
+    index = get_transcript_index()
+    if course_ids:
+        return {"courses": index.check(course_ids)}, None
+    return {"summary": index.summary()}, None
+
+
+async def _handle_check_transcript_async(payload: ToolPayload) -> tuple[ToolResult, None]:
+    """Async variant; the index is in memory, so no thread is needed."""
+    return _handle_check_transcript(payload)
+
+
+TOOL_DECLARATIONS = _TOOL_DECLARATIONS
+TOOL_HANDLERS = {
+    "check_transcript": _handle_check_transcript,
+}
+ASYNC_TOOL_HANDLERS = {
+    "check_transcript": _handle_check_transcript_async,
+}
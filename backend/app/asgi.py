@@ -0,0 +1,155 @@
+"""ASGI entry point: async agent chat plus the Flask app for everything else.
+
+`POST /api/agent/chat` is served natively by the asyncio agent runtime, so a
+turn waiting on Gemini costs a coroutine rather than a worker thread. Every
+other route (and CORS preflight) is passed through to the existing Flask app.
+
+Run with: `uvicorn asgi:app --port 8000` from `backend/`.
+"""
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+
+from . import create_app
+
+_ASYNC_CHAT_PATH = "/api/agent/chat"
+# Threads for requests served by the Flask app; each streaming turn holds one
+_FLASK_THREADS = int(os.getenv("ASGI_FLASK_THREADS", "32"))
+
+
+async def _read_body(receive: Any) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    return body
+
+
+async def _send_json(send: Any, status: int, payload: Any) -> None:
+    body = json.dumps(payload, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            # Matches the Flask app's CORS policy for /api/*
+            (b"access-control-allow-origin", b"*"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _advisor_chat(receive: Any, send: Any) -> None:
+    """Async counterpart of `routes.agent.advisor_chat`, with the same body and responses."""
+    from .agent import replay, telemetry
+    from .agent.async_agent import run_academic_advisor_agent_async
+    from .routes.agent import _PREAMBLE_LENGTH, _build_history
+
+    try:
+        payload = json.loads(await _read_body(receive) or b"null")
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        await _send_json(send, 400, {"error": "Request body must be valid JSON."})
+        return
+
+    conversation = payload.get("conversation")
+    if not isinstance(conversation, list):
+        await _send_json(send, 400, {"error": "'conversation' must be a list."})
+        return
+
+    try:
+        normalized_history = _build_history(conversation)
+        events: list[dict[str, Any]] = []
+        with telemetry.trace_turn() as trace:
+            with replay.record_turn(normalized_history, cached_prefix=_PREAMBLE_LENGTH) as recording:
+                reply_text, chat_text = await run_academic_advisor_agent_async(
+                    normalized_history, tool_events=events, cached_prefix=_PREAMBLE_LENGTH
+                )
+                recording.finish(reply_text, chat_text)
+    except ValueError as exc:
+        await _send_json(send, 400, {"error": str(exc)})
+        return
+    except Exception as exc:
+        await _send_json(send, 500, {"error": str(exc)})
+        return
+
+    body = {"reply": reply_text, "events": events, "chat": chat_text}
+    if payload.get("timings"):
+        body["timings"] = trace.to_dict()
+    await _send_json(send, 200, body)
+
+
+class _WsgiToAsgi:
+    """asgiref's `WsgiToAsgi`, but on a thread pool.
+
+    `WsgiToAsgi` runs the WSGI app with `sync_to_async`'s default
+    `thread_sensitive=True`, i.e. every request on one shared thread, one at a
+    time, so a single streaming turn would block every other Flask route.
+    """
+
+    def __init__(self, wsgi_application: Any, max_threads: int):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="asgi-flask")
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        await _WsgiToAsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+class _WsgiToAsgiInstance(WsgiToAsgiInstance):
+    def __init__(self, wsgi_application: Any, executor: ThreadPoolExecutor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body: Any) -> None:
+        # The undecorated method; the base class wraps it in a thread-sensitive sync_to_async
+        run = WsgiToAsgiInstance.__dict__["run_wsgi_app"].func
+        await sync_to_async(run, thread_sensitive=False, executor=self.executor)(self, body)
+
+
+def create_asgi_app(start_render_pool: bool = False):
+    """The ASGI app; with `start_render_pool`, render workers start at lifespan startup.
+
+    Lifespan startup runs in the serving process (after a pre-fork server has
+    forked), so the workers belong to the process that renders with them.
+    """
+    flask_app = create_app()
+    wsgi = _WsgiToAsgi(flask_app, _FLASK_THREADS)
+
+    async def app(scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    if start_render_pool:
+                        from .services import render_pool
+
+                        render_pool.start()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].rstrip("/") == _ASYNC_CHAT_PATH
+        ):
+            await _advisor_chat(receive, send)
+            return
+
+        await wsgi(scope, receive, send)
+
+    app.flask_app = flask_app
+    return app
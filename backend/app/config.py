@@ -33,6 +33,13 @@ def load_config():
     "ELEVENLABS_REALTIME_SESSION_URL": os.getenv("ELEVENLABS_REALTIME_SESSION_URL", ""),
         "ELEVENLABS_REALTIME_VOICE_ID": os.getenv("ELEVENLABS_REALTIME_VOICE_ID"),
         "ELEVENLABS_REALTIME_AGENT_ID": os.getenv("ELEVENLABS_REALTIME_AGENT_ID"),
+        # Agent sessions: how many conversations to keep parsed in memory, and
+        # where to spill evicted ones (empty disables spilling), and how long
+        # and how many spilled ones to keep
+        "AGENT_SESSION_MAX_SESSIONS": int(os.getenv("AGENT_SESSION_MAX_SESSIONS", "256")),
+        "AGENT_SESSION_SPILL_DIR": os.getenv("AGENT_SESSION_SPILL_DIR", ""),
+        "AGENT_SESSION_SPILL_MAX_AGE_HOURS": float(os.getenv("AGENT_SESSION_SPILL_MAX_AGE_HOURS", "168")),
+        "AGENT_SESSION_SPILL_MAX_FILES": int(os.getenv("AGENT_SESSION_SPILL_MAX_FILES", "10000")),
     }
 
     if not cfg["ELEVENLABS_API_KEY"]:
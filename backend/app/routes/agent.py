@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import json
+import threading
 from pprint import pprint
-from typing import Any, Iterable, Mapping
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Mapping
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 
-from ..agent.agent import run_academic_advisor_agent
+from ..agent import telemetry
+from ..services.speech_pipeline import pipeline_tts, split_sentences
+from .elevenlabs import _audio_mimetype, _client as _tts_client  # reuse client factory
+
+if TYPE_CHECKING:
+    from ..agent.sessions import SessionStore
 
 agent_bp = Blueprint("agent", __name__)
 
+# Server-held conversation sessions, created on first use from app config
+_session_store: SessionStore | None = None
+_session_store_lock = threading.Lock()
+
 # System prompt for the academic advisor agent
 SYSTEM_PROMPT = (
     "INSTRUCTIONS FOR THE CONVERSATION: You're a friendly and helpful banana named The Nanner Planner, who's helping me (a college student) plan my courses for next semester."
@@ -22,550 +33,10 @@ SYSTEM_PROMPT = (
     "Remember, though, that your responses are spoken aloud by a voice assistant, so they should be concise and to the point. "
     # "Avoid talking about courses that you know are not offered next semester. "
     "You may choose to add a second sentence to offer a specific relevant way you can help based on the tools available to you. "
-    # "DO NOT recommend taking courses that the student has already taken or is currently taking, as per their transcript."
+    "DO NOT recommend taking courses that I have already taken or am currently taking; check my transcript with the check_transcript tool first. "
     "DO NOT respond with markdown in your replies at any point."
 )
 
-# Hardcoded transcript data
-TRANSCRIPT_STRING = """{
-  "studentInfo": {
-    "name": "Anton Angeletti",
-    "studentID": "78551038",
-    "programs": [
-      {
-        "type": "Major",
-        "name": "Computer Science"
-      },
-      {
-        "type": "Major",
-        "name": "Mathematics",
-        "option": "Discrete Mathematics and Cryptography"
-      },
-      {
-        "type": "Minor",
-        "name": "Music"
-      }
-    ]
-  },
-  "academicHistory": [
-    {
-      "termName": "Fall 2022",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "ADPR",
-          "number": "189H",
-          "title": "UNIV HONORS SEMINAR Ethical Persuasion",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "CSCE",
-          "number": "10",
-          "title": "INTRODUCTION TO CSE",
-          "grade": "P",
-          "hours": 0.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "155H",
-          "title": "HONORS: COMP SCI I",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "GEOG",
-          "number": "155",
-          "title": "ELEM PHYSICAL GEOG",
-          "grade": "A",
-          "hours": 4.0,
-          "qualityPoints": 16.0
-        },
-        {
-          "department": "MATH",
-          "number": "208",
-          "title": "CALCULUS III",
-          "grade": "A",
-          "hours": 4.0,
-          "qualityPoints": 16.0
-        },
-        {
-          "department": "UHON",
-          "number": "101H",
-          "title": "HONORS COMMUNITY",
-          "grade": "A",
-          "hours": 1.0,
-          "qualityPoints": 4.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": [
-        {
-          "institution": "Other Credits",
-          "courses": [
-            {
-              "title": "MATH106",
-              "grade": null,
-              "hours": 5.0
-            },
-            {
-              "title": "MATH107",
-              "grade": null,
-              "hours": 4.0
-            }
-          ]
-        },
-        {
-          "institution": "Test Credits",
-          "courses": [
-            {
-              "title": "Computer Science Principles",
-              "grade": null,
-              "hours": 3.0
-            },
-            {
-              "title": "Human Geography",
-              "grade": null,
-              "hours": 3.0
-            },
-            {
-              "title": "Psychology",
-              "grade": null,
-              "hours": 4.0
-            }
-          ]
-        }
-      ]
-    },
-    {
-      "termName": "Spring 2023",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "156H",
-          "title": "HONORS: COMP SCI II",
-          "grade": "A+",
-          "hours": 4.0,
-          "qualityPoints": 16.0
-        },
-        {
-          "department": "CSCE",
-          "number": "235",
-          "title": "INTR DISCRETE STRUCT",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "CSCE",
-          "number": "251",
-          "title": "UNIX PROGRAMMING",
-          "grade": "A+",
-          "hours": 1.0,
-          "qualityPoints": 4.0
-        },
-        {
-          "department": "MATH",
-          "number": "314",
-          "title": "LINEAR ALGEBRA",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "PHYS",
-          "number": "211",
-          "title": "GENERAL PHYSICS I",
-          "grade": "A+",
-          "hours": 4.0,
-          "qualityPoints": 16.0
-        },
-        {
-          "department": "UHON",
-          "number": "102H",
-          "title": "HONORS DISCOVERY The Science of You",
-          "grade": "A+",
-          "hours": 1.0,
-          "qualityPoints": 4.0
-        },
-        {
-          "department": "UHON",
-          "number": "201H",
-          "title": "HONORS INTERSECTIONS VITA Tax Return Prep",
-          "grade": "P",
-          "hours": 0.0,
-          "qualityPoints": null
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Summer 2023",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "JGEN",
-          "number": "200",
-          "title": "TECH COMMUNICATION I",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": [
-        {
-          "institution": "Nebraska Wesleyan Univ",
-          "courses": [
-            {
-              "title": "ENG LANG AND WRITING",
-              "grade": "A",
-              "hours": 3.0
-            }
-          ]
-        }
-      ]
-    },
-    {
-      "termName": "Fall 2023",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "310H",
-          "title": "HNRS:DATA STRCT&ALGRTH",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "LIFE",
-          "number": "120",
-          "title": "FUND OF BIOLOGY I",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "LIFE",
-          "number": "120L",
-          "title": "FUND BIOLOGY LAB I",
-          "grade": "A+",
-          "hours": 1.0,
-          "qualityPoints": 4.0
-        },
-        {
-          "department": "MATH",
-          "number": "309",
-          "title": "INTRO TO MATH PROOFS",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "MUNM",
-          "number": "387",
-          "title": "HIST OF AMER JAZZ",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "STAT",
-          "number": "380",
-          "title": "STAT & APPLICATIONS",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Spring 2024",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "231",
-          "title": "COMP SYSTMS ENGINEERING",
-          "grade": "A+",
-          "hours": 4.0,
-          "qualityPoints": 16.0
-        },
-        {
-          "department": "CSCE",
-          "number": "361H",
-          "title": "SOFTWARE ENGINEERING",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "MATH",
-          "number": "310",
-          "title": "INTRO MODERN ALGEBRA",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "UHON",
-          "number": "298H",
-          "title": "UNIV HONORS SEMINAR Intellectual Creativity",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Summer 2024",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "UHON",
-          "number": "99H",
-          "title": "HONORS EXPERIENCE Internship Experiential Learning",
-          "grade": "P",
-          "hours": 0.0,
-          "qualityPoints": null
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 0.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Fall 2024",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "851",
-          "title": "OPERATING SYS PRINC",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "MATH",
-          "number": "417",
-          "title": "GROUP THEORY",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "SOCI",
-          "number": "101",
-          "title": "INTRO TO SOCIOLOGY",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "UHON",
-          "number": "395H",
-          "title": "UNIV HONORS SMNR Quality TV",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Spring 2025",
-      "status": "Completed",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "828",
-          "title": "AUTOMA COMP & LANG",
-          "grade": "A",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "CSCE",
-          "number": "862",
-          "title": "COMM NETWORKS",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "HIST",
-          "number": "180",
-          "title": "CLTURE, RELIGON&SOC ASIA",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        },
-        {
-          "department": "MATH",
-          "number": "471",
-          "title": "INTRO TO TOPOLOGY",
-          "grade": "A+",
-          "hours": 3.0,
-          "qualityPoints": 12.0
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 4.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    },
-    {
-      "termName": "Fall 2025",
-      "status": "In Progress",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "322",
-          "title": "PRGRM LANG CONCEPTS",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "401H",
-          "title": "HNRS:DSGN STUDIO I",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "440",
-          "title": "NUMERICAL ANALYSIS I",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "838",
-          "title": "INTERNET OF THINGS",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        }
-      ],
-      "gpaStats": {
-        "termGPA": 0.0,
-        "cumulativeGPA": 4.0
-      },
-      "transferBlocks": []
-    }
-  ],
-  "careerTotals": {
-    "enrollment": {
-      "gpa": 4.0,
-      "qhrs": 87.0,
-      "qpts": 348.0
-    },
-    "combined": {
-      "gpa": 4.0,
-      "ehrs": 109.0,
-      "qhrs": 87.0,
-      "qpts": 348.0
-    }
-  }
-}"""
-
-TRANSCRIPT_STRING = """{
-  "studentInfo": {
-    "name": "Anton Angeletti",
-    "programs": [
-      {
-        "type": "Major",
-        "name": "Computer Science"
-      },
-      {
-        "type": "Major",
-        "name": "Mathematics",
-        "option": "Discrete Mathematics and Cryptography"
-      },
-      {
-        "type": "Minor",
-        "name": "Music"
-      }
-    ]
-  },
-  "academicHistory": [
-    {
-      "termName": "Fall 2025",
-      "status": "In Progress",
-      "courses": [
-        {
-          "department": "CSCE",
-          "number": "322",
-          "title": "PRGRM LANG CONCEPTS",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "401H",
-          "title": "HNRS:DSGN STUDIO I",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "440",
-          "title": "NUMERICAL ANALYSIS I",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        },
-        {
-          "department": "CSCE",
-          "number": "838",
-          "title": "INTERNET OF THINGS",
-          "grade": null,
-          "hours": 3.0,
-          "qualityPoints": null
-        }
-      ],
-    }
-  ],
-}"""
 
 def _normalize_conversation(raw_conversation: Iterable[Any]) -> list[dict[str, Any]]:
     """Ensure each conversation item has the shape expected by the agent."""
@@ -603,53 +74,109 @@ def _normalize_conversation(raw_conversation: Iterable[Any]) -> list[dict[str, A
     return normalized
 
 
-@agent_bp.post("/chat")
-def advisor_chat():
-    """POST /api/agent/chat -> run the academic advisor agent once."""
-    payload = request.get_json(silent=True)
-    if payload is None:
-        return jsonify({"error": "Request body must be valid JSON."}), 400
-
-    conversation = payload.get("conversation")
-    print(conversation)
-    if not isinstance(conversation, list):
-        return jsonify({"error": "'conversation' must be a list."}), 400
-
-    # Prepend initial system messages to every request
-    initial_messages = [
+def _initial_messages() -> list[dict[str, Any]]:
+    """Messages prepended to every conversation before it reaches the agent."""
+    return [
         {
             "role": "user",
-            # "parts": [f"{SYSTEM_PROMPT}\n\nHere is the student's transcript: {TRANSCRIPT_STRING}\n\nThe conversation begins on my next message."],
             "parts": [f"{SYSTEM_PROMPT}"],
         },
         {
             "role": "model",
             "parts": [f"Okay, let's start! What would you like to discuss?"],
         }
-        # {
-        #     "role": "model",
-        #     "parts": ["Okay, let's start! Can you provide your transcript as a JSON object?"],
-        # },
-        # {
-        #     "role": "user",
-        #     "parts": [f"Sure, here it is:\n```json\n{TRANSCRIPT_STRING}\n```"],
-        # },
-        # {
-        #     "role": "model",
-        #     "parts": ["Thank you! Now, what would you like to discuss?"],
-        # }
     ]
 
+
+# Number of leading messages that are identical on every request
+_PREAMBLE_LENGTH = len(_initial_messages())
+
+
+def _build_history(conversation: list[Any]) -> list[dict[str, Any]]:
+    """Prepend the initial messages to a client conversation and normalize it."""
     # Combine initial messages with the request's conversation
-    full_conversation = initial_messages + conversation
+    full_conversation = _initial_messages() + conversation
     print(f"Full conversation:")
     pprint(full_conversation)
 
+    return _normalize_conversation(full_conversation)
+
+
+def _runtime():
+    """The agent runtime module, imported on first use.
+
+    It pulls in the Gemini SDK and every tool, so importing it here rather than
+    at module level keeps `create_app()` fast; `app.warm()` loads it up front.
+    """
+    from ..agent import agent
+
+    return agent
+
+
+def _sessions() -> SessionStore:
+    """Return the process-wide session store, creating it on first use."""
+    from ..agent.sessions import SessionStore
+
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            cfg = current_app.config
+            _session_store = SessionStore(
+                max_sessions=cfg.get("AGENT_SESSION_MAX_SESSIONS", 256),
+                spill_dir=cfg.get("AGENT_SESSION_SPILL_DIR") or None,
+                spill_max_age_seconds=cfg.get("AGENT_SESSION_SPILL_MAX_AGE_HOURS", 168) * 3600,
+                spill_max_files=cfg.get("AGENT_SESSION_SPILL_MAX_FILES", 10000),
+            )
+        return _session_store
+
+
+class _AudioStream:
+    """Audio chunks of one TTS response; closing it releases the pooled connection."""
+
+    def __init__(self, resp):
+        self._resp = resp
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._resp.iter_content(chunk_size=4096)
+
+    def close(self) -> None:
+        self._resp.close()
+
+
+def _sse(event: Mapping[str, Any]) -> str:
+    """Encode an agent event as a server-sent event."""
+    data = json.dumps(event, default=str)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+@agent_bp.post("/chat")
+def advisor_chat():
+    """POST /api/agent/chat -> run the academic advisor agent once.
+
+    Set `"timings": true` in the body to get per-call latency and token spans
+    back in a `timings` field.
+    """
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Request body must be valid JSON."}), 400
+
+    conversation = payload.get("conversation")
+    print(conversation)
+    if not isinstance(conversation, list):
+        return jsonify({"error": "'conversation' must be a list."}), 400
+
+    from ..agent import replay
+
     # print(f"Conversation: {full_conversation}")
     try:
-        normalized_history = _normalize_conversation(full_conversation)
+        normalized_history = _build_history(conversation)
         events: list[dict[str, Any]] = []
-        reply_text, chat_text = run_academic_advisor_agent(normalized_history, tool_events=events)
+        with telemetry.trace_turn() as trace:
+            with replay.record_turn(normalized_history, cached_prefix=_PREAMBLE_LENGTH) as recording:
+                reply_text, chat_text = _runtime().run_academic_advisor_agent(
+                    normalized_history, tool_events=events, cached_prefix=_PREAMBLE_LENGTH
+                )
+                recording.finish(reply_text, chat_text)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
     except Exception as exc:
@@ -657,5 +184,183 @@ def advisor_chat():
 
     # Bubble up events so the frontend can react (e.g., play audio)
     print({"reply": reply_text, "events": events, "chat": chat_text})
-    return jsonify({"reply": reply_text, "events": events, "chat": chat_text})
+    body = {"reply": reply_text, "events": events, "chat": chat_text}
+    if payload.get("timings"):
+        body["timings"] = trace.to_dict()
+    return jsonify(body)
+
+
+@agent_bp.post("/chat/stream")
+def advisor_chat_stream():
+    """POST /api/agent/chat/stream -> run the agent, streaming server-sent events.
+
+    Accepts the same body as `/chat`. Each SSE `event:` name matches the event's
+    `type`: `text` (reply deltas), `tool_call_start`, `tool_call`, `rmp_professor`,
+    `chat` (markdown blocks), then `done` with the full reply, or `error`.
+    """
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Request body must be valid JSON."}), 400
+
+    conversation = payload.get("conversation")
+    if not isinstance(conversation, list):
+        return jsonify({"error": "'conversation' must be a list."}), 400
+
+    try:
+        normalized_history = _build_history(conversation)
+        agent_events = _runtime().stream_academic_advisor_agent(normalized_history, cached_prefix=_PREAMBLE_LENGTH)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def generate() -> Iterator[str]:
+        try:
+            for event in agent_events:
+                yield _sse(event)
+        except Exception as exc:
+            # Headers are already sent, so errors travel in-band
+            yield _sse({"type": "error", "error": str(exc)})
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (e.g. nginx) from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@agent_bp.post("/chat/speech")
+def advisor_chat_speech():
+    """POST /api/agent/chat/speech -> run the agent and stream its reply as audio.
+
+    Accepts the same body as `/chat`, plus optional `voice_id`, `model_id` and
+    `output_format`. The reply is split into sentences as it streams from the
+    model and each sentence is sent to ElevenLabs as soon as it is complete, so
+    playback starts after the first sentence rather than the whole reply. Audio
+    for every sentence is returned in order on one response.
+    """
+    api_key = current_app.config.get("ELEVENLABS_API_KEY", "")
+    if not api_key:
+        return jsonify({"error": "ELEVENLABS_API_KEY not configured"}), 503
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Request body must be valid JSON."}), 400
+
+    conversation = payload.get("conversation")
+    if not isinstance(conversation, list):
+        return jsonify({"error": "'conversation' must be a list."}), 400
+
+    voice_id = payload.get("voice_id")
+    model_id = payload.get("model_id")
+    output_format = payload.get("output_format")
+
+    try:
+        normalized_history = _build_history(conversation)
+        agent_events = _runtime().stream_academic_advisor_agent(normalized_history, cached_prefix=_PREAMBLE_LENGTH)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    client = _tts_client()
+
+    def reply_deltas() -> Iterator[str]:
+        for event in agent_events:
+            if event.get("type") == "text":
+                yield event["delta"]
+
+    def synthesize(sentence: str) -> _AudioStream:
+        resp = client.tts_generate(
+            text=sentence, voice_id=voice_id, model_id=model_id, output_format=output_format
+        )
+        return _AudioStream(resp)
+
+    fmt = output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")
+    audio = pipeline_tts(split_sentences(reply_deltas()), synthesize)
+    return Response(audio, mimetype=_audio_mimetype(fmt))
+
+
+@agent_bp.post("/sessions")
+def create_session():
+    """POST /api/agent/sessions -> start a server-held conversation.
+
+    Optional body: `{ "conversation": [...] }` to seed the session with earlier
+    messages (same shape as `/chat`). Returns `{ "session_id": str }`.
+    """
+    payload = request.get_json(silent=True) or {}
+    conversation = payload.get("conversation", [])
+    if not isinstance(conversation, list):
+        return jsonify({"error": "'conversation' must be a list."}), 400
+
+    try:
+        history = [_runtime()._coerce_message_to_content(item) for item in _build_history(conversation)]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    session = _sessions().create(history)
+    return jsonify({"session_id": session.session_id}), 201
+
+
+@agent_bp.post("/sessions/<session_id>/chat")
+def session_chat(session_id: str):
+    """POST /api/agent/sessions/<id>/chat -> run one turn of a server-held conversation.
+
+    Body: `{ "message": str, "timings"?: bool }` with only the new user message. The parsed
+    history stays on the server, so request size and per-turn preparation do
+    not grow with the conversation. Returns the same shape as `/chat`.
+    """
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Request body must be valid JSON."}), 400
+
+    message = payload.get("message")
+    if not isinstance(message, str) or not message.strip():
+        return jsonify({"error": "'message' must be a non-empty string."}), 400
+
+    store = _sessions()
+    session = store.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found."}), 404
+
+    from ..agent import replay
+
+    with session.lock:
+        # Deleted while waiting for the previous turn to finish
+        if session.deleted:
+            return jsonify({"error": "Session not found."}), 404
+        try:
+            events: list[dict[str, Any]] = []
+            turn_input = [*session.history, {"role": "user", "parts": [message]}]
+            with telemetry.trace_turn() as trace:
+                with replay.record_turn(turn_input, cached_prefix=_PREAMBLE_LENGTH) as recording:
+                    reply_text, chat_text = _runtime().run_agent_turn(
+                        session.history, message, tool_events=events, cached_prefix=_PREAMBLE_LENGTH
+                    )
+                    recording.finish(reply_text, chat_text)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 500
+        finally:
+            # Re-admits a session evicted mid-turn; one deleted mid-turn stays deleted
+            store.put(session)
+
+    body = {"session_id": session_id, "reply": reply_text, "events": events, "chat": chat_text}
+    if payload.get("timings"):
+        body["timings"] = trace.to_dict()
+    return jsonify(body)
+
+
+@agent_bp.delete("/sessions/<session_id>")
+def delete_session(session_id: str):
+    """DELETE /api/agent/sessions/<id> -> discard a server-held conversation."""
+    if not _sessions().delete(session_id):
+        return jsonify({"error": "Session not found."}), 404
+    return jsonify({"session_id": session_id, "deleted": True})
+
 
+@agent_bp.get("/metrics")
+def agent_metrics():
+    """GET /api/agent/metrics -> latency, token and cache aggregates since startup."""
+    return jsonify({
+        **telemetry.METRICS.snapshot(),
+        "compaction": _runtime().compaction_stats(),
+        "response_cache": _runtime().response_cache_stats(),
+    })
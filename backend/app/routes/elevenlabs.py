@@ -16,6 +16,18 @@ def _client() -> ElevenLabsClient:
     )
 
 
+def _audio_mimetype(output_format: str) -> str:
+    """Map an ElevenLabs output format (e.g. mp3_44100_128) to a mime type."""
+    fmt = output_format.lower()
+    if fmt.startswith("mp3"):
+        return "audio/mpeg"
+    if fmt.startswith("pcm"):
+        return "audio/wav"  # browsers expect WAV container; client may need to handle raw PCM
+    if fmt.startswith("ulaw") or fmt.startswith("mulaw") or fmt.startswith("mu_law"):
+        return "audio/basic"
+    return "application/octet-stream"
+
+
 @elevenlabs_bp.get("/voices")
 def list_voices():
     api_key = current_app.config.get("ELEVENLABS_API_KEY", "")
@@ -70,15 +82,8 @@ def tts():
                     yield chunk
 
         # Map known output formats to mime types
-        fmt = (output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")).lower()
-        if fmt.startswith("mp3"):
-            mimetype = "audio/mpeg"
-        elif fmt.startswith("pcm"):
-            mimetype = "audio/wav"  # browsers expect WAV container; client may need to handle raw PCM
-        elif fmt.startswith("ulaw") or fmt.startswith("mulaw") or fmt.startswith("mu_law"):
-            mimetype = "audio/basic"
-        else:
-            mimetype = "application/octet-stream"
+        fmt = output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")
+        mimetype = _audio_mimetype(fmt)
 
         return Response(generate(), mimetype=mimetype)
     except Exception as e:
@@ -100,8 +105,8 @@ def tts():
                             for chunk in resp.iter_content(chunk_size=4096):
                                 if chunk:
                                     yield chunk
-                        fmt2 = (output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")).lower()
-                        mimetype2 = "audio/mpeg" if fmt2.startswith("mp3") else ("audio/wav" if fmt2.startswith("pcm") else ("audio/basic" if fmt2.startswith("ulaw") or fmt2.startswith("mulaw") or fmt2.startswith("mu_law") else "application/octet-stream"))
+                        fmt2 = output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")
+                        mimetype2 = _audio_mimetype(fmt2)
                         return Response(generate2(), mimetype=mimetype2)
                     except Exception:
                         pass
@@ -149,15 +154,8 @@ def tts_stream_get():
                 if chunk:
                     yield chunk
 
-        fmt = (output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")).lower()
-        if fmt.startswith("mp3"):
-            mimetype = "audio/mpeg"
-        elif fmt.startswith("pcm"):
-            mimetype = "audio/wav"
-        elif fmt.startswith("ulaw") or fmt.startswith("mulaw") or fmt.startswith("mu_law"):
-            mimetype = "audio/basic"
-        else:
-            mimetype = "application/octet-stream"
+        fmt = output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")
+        mimetype = _audio_mimetype(fmt)
 
         return Response(generate(), mimetype=mimetype)
     except Exception as e:
@@ -178,8 +176,8 @@ def tts_stream_get():
                             for chunk in resp.iter_content(chunk_size=4096):
                                 if chunk:
                                     yield chunk
-                        fmt2 = (output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")).lower()
-                        mimetype2 = "audio/mpeg" if fmt2.startswith("mp3") else ("audio/wav" if fmt2.startswith("pcm") else ("audio/basic" if fmt2.startswith("ulaw") or fmt2.startswith("mulaw") or fmt2.startswith("mu_law") else "application/octet-stream"))
+                        fmt2 = output_format or current_app.config.get("ELEVENLABS_OUTPUT_FORMAT", "mp3_44100_128")
+                        mimetype2 = _audio_mimetype(fmt2)
                         return Response(generate2(), mimetype=mimetype2)
                     except Exception:
                         pass
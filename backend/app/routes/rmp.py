@@ -46,5 +46,7 @@ def professor_lookup():
         return jsonify(summary)
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 502
\ No newline at end of file
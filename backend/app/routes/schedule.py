@@ -1,15 +1,36 @@
-from flask import Blueprint, request, send_file, jsonify
-from ..services.schedule_visualizer import generate_schedule_png
+import io
+import os
+
+from flask import Blueprint, Response, abort, request, send_file, jsonify
+from ..services import schedule_batch
+from ..services.render_jobs import render_jobs
+from ..services.schedule_render import (
+    FILE_EXTENSIONS,
+    FORMATS,
+    render_schedule,
+    resolve_format,
+    resolve_size,
+    schedule_key,
+)
 
 schedule_bp = Blueprint("schedule", __name__)
 
+# Stored images never change under their id
+_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# How long a request for an image that is still rendering waits before a 503
+_IMAGE_WAIT_SECONDS = float(os.getenv("SCHEDULE_IMAGE_WAIT_SECONDS", "15"))
+
 @schedule_bp.route("/generate", methods=["POST"])
 def generate_schedule():
     """
-    Generate a schedule PNG from a list of courses.
+    Generate a schedule image from a list of courses.
     
     Expected JSON body:
     {
+        "format": "svg" | "png" | "matplotlib",  (optional, also ?format=;
+                                                   default SCHEDULE_IMAGE_FORMAT)
+        "width": int, "height": int,            (optional, also ?width=&height=;
+                                                   default 1100 x 600)
         "courses": [
             {
                 "section": { ... section data ... },
@@ -20,7 +41,8 @@ def generate_schedule():
     }
     
     Returns:
-        PNG image file
+        SVG or PNG image file with an ETag derived from the schedule, size and
+        format. A request whose If-None-Match has that ETag gets 304.
     """
     try:
         data = request.get_json()
@@ -31,16 +53,141 @@ def generate_schedule():
         if not isinstance(courses, list):
             return jsonify({"error": "'courses' must be a list"}), 400
         
-        # Generate the schedule PNG
-        img_buffer = generate_schedule_png(courses)
+        fmt = resolve_format(request.args.get("format") or data.get("format"))
+        width, height = resolve_size(
+            request.args.get("width", data.get("width")),
+            request.args.get("height", data.get("height")),
+        )
+        
+        # The client already has this exact image; the key needs no render
+        key = schedule_key(courses, fmt, width, height)
+        if request.if_none_match.contains(key):
+            response = Response(status=304)
+            response.set_etag(key)
+            return response
+        
+        image = render_schedule(courses, fmt, width=width, height=height)
         
         # Return the image
-        return send_file(
-            img_buffer,
-            mimetype="image/png",
+        response = send_file(
+            io.BytesIO(image.data),
+            mimetype=image.mimetype,
             as_attachment=False,
-            download_name="schedule.png"
+            download_name=f"schedule.{image.extension}",
+            etag=image.key,
+            conditional=False,
         )
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@schedule_bp.route("/batch", methods=["POST"])
+def batch_schedules():
+    """
+    Render several schedules (e.g. alternatives being compared) in one request.
+
+    Expected JSON body:
+    {
+        "schedules": [[course, ...], ...],      (or [{"courses": [...]}, ...];
+                                                   at most SCHEDULE_BATCH_MAX)
+        "output": "ids" | "sprite" | "pdf",     (optional, default "ids")
+        "format", "width", "height":            (optional, as for /generate;
+                                                   ignored for "pdf")
+        "columns": int                          (optional, sprite only)
+    }
+
+    Returns:
+        ids: {"images": [{"id", "url"}, ...]} in request order, rendering in
+             the background and served by /image/<id>.
+        sprite: one SVG or PNG with the schedules in a grid, left to right;
+             X-Sprite-Columns and X-Sprite-Cell (e.g. "1100x600") describe it.
+        pdf: one page per schedule.
+    """
+    try:
+        data = request.get_json()
+        if not data or "schedules" not in data:
+            return jsonify({"error": "Missing 'schedules' field in request body"}), 400
+
+        schedules = schedule_batch.resolve_schedules(data["schedules"])
+        output = schedule_batch.resolve_output(request.args.get("output") or data.get("output"))
+
+        if output == "pdf":
+            return send_file(
+                io.BytesIO(schedule_batch.render_pdf(schedules)),
+                mimetype="application/pdf",
+                as_attachment=False,
+                download_name="schedules.pdf",
+            )
+
+        fmt = resolve_format(request.args.get("format") or data.get("format"))
+        width, height = resolve_size(
+            request.args.get("width", data.get("width")),
+            request.args.get("height", data.get("height")),
+        )
+
+        if output == "ids":
+            image_ids = schedule_batch.submit_images(schedules, fmt, width, height)
+            return jsonify({"images": [{"id": i, "url": f"/api/schedule/image/{i}"} for i in image_ids]})
+
+        columns = request.args.get("columns", data.get("columns"))
+        try:
+            columns = int(columns) if columns is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("'columns' must be an integer")
+        sheet, columns, (cell_width, cell_height) = schedule_batch.render_sprite(
+            schedules, fmt, width, height, columns
+        )
+        response = send_file(
+            io.BytesIO(sheet),
+            mimetype=FORMATS[fmt],
+            as_attachment=False,
+            download_name=f"schedules.{FILE_EXTENSIONS[fmt]}",
+        )
+        response.headers["X-Sprite-Columns"] = str(columns)
+        response.headers["X-Sprite-Cell"] = f"{cell_width}x{cell_height}"
+        return response
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@schedule_bp.route("/image/<image_id>", methods=["GET"])
+def get_schedule_image(image_id):
+    """
+    Serve an image saved by the generate_schedule tool.
+
+    The tool links the image before it is rendered, so this waits for a
+    pending render (up to SCHEDULE_IMAGE_WAIT_SECONDS, then 503 with
+    Retry-After). The id determines the file's bytes, so the response may be
+    cached indefinitely. The file is handed to the server as a file object,
+    which WSGI servers with `wsgi.file_wrapper` (e.g. gunicorn) send with
+    sendfile.
+    """
+    try:
+        path = render_jobs.wait(image_id, timeout=_IMAGE_WAIT_SECONDS)
+    except TimeoutError as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 503
+        response.headers["Retry-After"] = "1"
+        return response
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 500
+    if path is None:
+        abort(404)
+
+    response = send_file(
+        path,
+        mimetype=FORMATS[path.suffix[1:]],
+        etag=path.stem,
+        max_age=_IMMUTABLE_MAX_AGE,
+        conditional=True,
+    )
+    response.headers["Cache-Control"] = f"public, max-age={_IMMUTABLE_MAX_AGE}, immutable"
+    return response
@@ -5,8 +5,14 @@ from urllib.parse import quote
 
 import requests
 
+from . import deadline
+from .singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Concurrent lookups for the same course and term share one request
+_REGBLOCKS_FLIGHT = SingleFlight()
+
 
 class CollegeSchedulerClient:
     """Client for interacting with the UNL College Scheduler service."""
@@ -41,7 +47,7 @@ class CollegeSchedulerClient:
         )
 
         try:
-            response = self._session.get(url, timeout=15)
+            response = self._session.get(url, timeout=deadline.timeout(15))
             response.raise_for_status()
             data: Dict[str, Any] = response.json()
 
@@ -69,6 +75,8 @@ class CollegeSchedulerClient:
                 data["sections"] = filtered_sections
 
             return data
+        except requests.Timeout as exc:
+            raise TimeoutError(f"College Scheduler did not respond in time for course '{course_id}'.") from exc
         except requests.RequestException as exc:
             logger.error("Failed to fetch registration blocks for %s: %s", course_id, exc)
             raise RuntimeError(f"Request to College Scheduler failed for course '{course_id}'.") from exc
@@ -91,6 +99,14 @@ class CollegeSchedulerClient:
 
 
 def get_registration_blocks(course_id: str, term: str = "Spring 2026") -> Dict[str, Any]:
-    """Convenience wrapper around `CollegeSchedulerClient.get_registration_blocks`."""
-    client = CollegeSchedulerClient()
-    return client.get_registration_blocks(course_id, term=term)
\ No newline at end of file
+    """Convenience wrapper around `CollegeSchedulerClient.get_registration_blocks`.
+
+    Identical lookups that are already in flight are joined rather than repeated.
+    """
+    key = (" ".join(course_id.strip().upper().split()), term.strip())
+
+    def fetch() -> Dict[str, Any]:
+        client = CollegeSchedulerClient()
+        return client.get_registration_blocks(course_id, term=term)
+
+    return _REGBLOCKS_FLIGHT.do(key, fetch, timeout=deadline.remaining())
@@ -0,0 +1,92 @@
+"""
+Per-request time budget shared by every upstream call the request makes.
+
+A request opens `with within(seconds):` once; code underneath asks
+`timeout(default)` for the timeout of its next upstream call, which is the
+smaller of its usual timeout and the time left. The budget lives in a context
+variable, so it follows the request into `contextvars.copy_context()` pool
+tasks and asyncio tasks, but not into pools that run without a copied context
+(e.g. the agent's prefetcher, whose work should outlive the request).
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before an upstream call could start."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """An absolute point on the `time.monotonic()` clock."""
+
+    at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> Deadline:
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Seconds left, keeping `reserve` seconds back; never negative."""
+        return max(0.0, self.at - reserve - time.monotonic())
+
+    def expired(self, reserve: float = 0.0) -> bool:
+        return self.remaining(reserve) <= 0.0
+
+
+_current: ContextVar[Deadline | None] = ContextVar("request_deadline", default=None)
+
+
+def current() -> Deadline | None:
+    return _current.get()
+
+
+@contextmanager
+def bind(deadline: Deadline | None) -> Iterator[Deadline | None]:
+    """Apply `deadline` to the enclosed work; a sooner enclosing deadline still wins."""
+    outer = _current.get()
+    if deadline is None or (outer is not None and outer.at <= deadline.at):
+        yield outer
+        return
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def within(seconds: float | None) -> Iterator[Deadline | None]:
+    """Bound the enclosed work to `seconds` from now (None: no new bound)."""
+    with bind(None if seconds is None else Deadline.after(seconds)) as deadline:
+        yield deadline
+
+
+def remaining(reserve: float = 0.0) -> float | None:
+    """Seconds left in the current budget, or None if there is no deadline."""
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining(reserve)
+
+
+def expired(reserve: float = 0.0) -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.expired(reserve)
+
+
+def timeout(default: float | None, reserve: float = 0.0) -> float | None:
+    """Timeout for the next upstream call: `default`, cut down to the time left.
+
+    Raises DeadlineExceeded when nothing is left, so callers never start a
+    request that is already too late.
+    """
+    left = remaining(reserve)
+    if left is None:
+        return default
+    if left <= 0.0:
+        raise DeadlineExceeded("Request deadline exceeded.")
+    return left if default is None else min(default, left)
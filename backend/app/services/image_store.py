@@ -0,0 +1,158 @@
+"""
+Schedule images served by the backend.
+
+The `generate_schedule` tool used to drop a new file into `frontend/public` for
+every call. The store keeps them in one directory instead, named after a hash
+of their bytes (or the render key, which determines them): saving the same
+image twice writes one file, and an id always means the same content, so
+`GET /api/schedule/image/<id>` can be cached by the browser forever.
+
+Files are written atomically. While an image is still being rendered its id
+has a `.pending` marker, visible to every process sharing the directory. A
+background thread removes images older than `max_age_seconds` and, past
+`max_bytes`, the least recently saved ones.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+# "<sha256 prefix>.<extension>"; anything else is never looked up on disk
+_ID_PATTERN = re.compile(r"^[0-9a-f]{32}\.(svg|png)$")
+
+# Leftover temp files and pending markers from a crashed process are removed after this long
+_STALE_TMP_SECONDS = 300
+_TEMP_SUFFIXES = (".tmp", ".pending")
+
+
+class ImageStore:
+    """Content-addressed image directory with size and age limits."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: float = 7 * 24 * 3600,
+        gc_interval_seconds: float = 600,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.gc_interval_seconds = gc_interval_seconds
+        self._lock = threading.Lock()
+        self._gc_thread: threading.Thread | None = None
+
+    @staticmethod
+    def image_id(data: bytes, extension: str) -> str:
+        return f"{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+
+    def put(self, data: bytes, extension: str, image_id: str | None = None) -> str:
+        """Save `data` and return its id (a hash of `data` unless given)."""
+        image_id = image_id or self.image_id(data, extension)
+        if not _ID_PATTERN.match(image_id) or not image_id.endswith(f".{extension}"):
+            raise ValueError(f"Unsupported image extension: {extension!r}")
+
+        path = self.directory / image_id
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            # Already stored: refresh its age so GC keeps what is still in use
+            os.utime(path)
+        except FileNotFoundError:
+            # Write then rename, so a reader never sees half an image
+            tmp_path = path.with_name(f"{image_id}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        self._start_gc()
+        return image_id
+
+    def reserve(self, image_id: str) -> None:
+        """Mark `image_id` as being rendered until `release`."""
+        if not _ID_PATTERN.match(image_id):
+            raise ValueError(f"Invalid image id: {image_id!r}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{image_id}.pending").touch()
+        self._start_gc()
+
+    def release(self, image_id: str) -> None:
+        self._remove(str(self.directory / f"{image_id}.pending"))
+
+    def pending(self, image_id: str) -> bool:
+        return bool(_ID_PATTERN.match(image_id)) and (self.directory / f"{image_id}.pending").exists()
+
+    def path(self, image_id: str) -> Path | None:
+        """The file for `image_id`, or None if the id is malformed or unknown."""
+        if not _ID_PATTERN.match(image_id):
+            return None
+        path = self.directory / image_id
+        return path if path.is_file() else None
+
+    def gc(self, now: float | None = None) -> int:
+        """Apply the age and size limits now; returns how many files were removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            try:
+                entries = [(entry.stat(), entry) for entry in os.scandir(self.directory) if entry.is_file()]
+            except FileNotFoundError:
+                return 0
+
+            removed = 0
+            images = []
+            for stat, entry in entries:
+                age = now - stat.st_mtime
+                temp = entry.name.endswith(_TEMP_SUFFIXES)
+                if temp:
+                    expired = age > _STALE_TMP_SECONDS
+                elif _ID_PATTERN.match(entry.name):
+                    expired = age > self.max_age_seconds
+                else:
+                    continue
+                if expired:
+                    removed += self._remove(entry.path)
+                elif not temp:
+                    images.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in images)
+            for _, size, path in sorted(images):
+                if total <= self.max_bytes:
+                    break
+                removed += self._remove(path)
+                total -= size
+            return removed
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def _start_gc(self) -> None:
+        if self.gc_interval_seconds <= 0 or self._gc_thread is not None:
+            return
+        with self._lock:
+            if self._gc_thread is not None:
+                return
+            self._gc_thread = threading.Thread(target=self._gc_loop, name="schedule-image-gc", daemon=True)
+            self._gc_thread.start()
+
+    def _gc_loop(self) -> None:
+        while True:
+            try:
+                self.gc()
+            except OSError as exc:
+                print(f"[warn] Schedule image GC failed: {exc}")
+            time.sleep(self.gc_interval_seconds)
+
+
+_DEFAULT_DIR = str(Path(__file__).resolve().parents[2] / "schedule_images")
+
+image_store = ImageStore(
+    directory=os.getenv("SCHEDULE_IMAGE_DIR") or _DEFAULT_DIR,
+    max_bytes=int(os.getenv("SCHEDULE_IMAGE_MAX_MB", "256")) * 1024 * 1024,
+    max_age_seconds=float(os.getenv("SCHEDULE_IMAGE_MAX_AGE_HOURS", "168")) * 3600,
+    gc_interval_seconds=float(os.getenv("SCHEDULE_IMAGE_GC_INTERVAL_SECONDS", "600")),
+)
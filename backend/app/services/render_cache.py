@@ -0,0 +1,121 @@
+"""
+Content-addressed cache of rendered schedule images.
+
+A render is keyed by a hash of everything that determines its bytes (see
+`schedule_render.render_key`) plus its file extension, so an entry never goes
+stale: the same key always means the same image. Recent renders stay in an
+in-memory LRU. Every render is also saved to an `ImageStore` (by default the
+one that serves `/api/schedule/image/<id>`), so repeats survive restarts, are
+shared by the workers of a pre-fork server, and fall under the store's size
+and age limits. The generate_schedule tool's images use the same ids, so each
+is kept on disk once.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from .image_store import ImageStore, image_store
+from .singleflight import SingleFlight
+
+
+class RenderCache:
+    """In-memory LRU of rendered images backed by an optional image store."""
+
+    def __init__(self, max_entries: int = 128, store: ImageStore | None = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        # Concurrent requests for the same schedule share one render
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read(key)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        self._write(key, data)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Return the cached image for `key`, rendering (once) on a miss."""
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        def fill() -> bytes:
+            # Another request may have finished the same render meanwhile
+            data = self.get(key)
+            if data is None:
+                with self._lock:
+                    self.misses += 1
+                data = render()
+                self.put(key, data)
+            return data
+
+        return self._flight.do(key, fill)
+
+    def clear(self) -> None:
+        """Forget the in-memory entries (the store is left alone)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if self.max_entries < 1:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read(self, key: str) -> bytes | None:
+        path = self.store.path(key) if self.store is not None else None
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            # Removed by the store's GC in the meantime
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.put(data, key.rpartition(".")[2], image_id=key)
+        except (OSError, ValueError) as exc:
+            # The disk tier is an optimization; a full or read-only disk is not an error
+            print(f"[warn] Could not write schedule render {key}: {exc}")
+
+
+render_cache = RenderCache(
+    max_entries=int(os.getenv("SCHEDULE_RENDER_CACHE_ENTRIES", "128")),
+    store=image_store if os.getenv("SCHEDULE_RENDER_CACHE_DISK", "1") == "1" else None,
+)
@@ -0,0 +1,121 @@
+"""
+Schedule renders that finish after the tool call returns.
+
+The model only needs to know that the schedule was made; the image is for the
+user, whose browser fetches it from `/api/schedule/image/<id>` once the reply
+arrives. `submit` therefore names the image up front, by its render key (the
+same key always renders the same bytes), and renders and stores it on a
+background thread while the agent writes its reply.
+
+The image route calls `wait`, which blocks on the job when this process runs
+it, or polls the store while another process sharing the image directory
+(a pre-fork sibling) holds the image's pending marker.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from .image_store import ImageStore, image_store
+from .schedule_render import (
+    DEFAULT_HEIGHT,
+    DEFAULT_WIDTH,
+    FILE_EXTENSIONS,
+    render_schedule,
+    resolve_format,
+    schedule_key,
+)
+
+_POLL_SECONDS = 0.1
+# Failed renders are remembered so the image route can report the error
+_MAX_FAILURES = 64
+
+
+class RenderJobs:
+    """Background renders into an `ImageStore`, at most one per image."""
+
+    def __init__(self, store: ImageStore, max_workers: int = 4):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schedule-render")
+        self._jobs: dict[str, Future] = {}
+        self._failures: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        courses: Iterable[Mapping[str, Any]],
+        fmt: str | None = None,
+        *,
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT,
+    ) -> str:
+        """Start rendering `courses` unless already stored or underway; returns the image id."""
+        fmt = resolve_format(fmt)
+        courses = list(courses)
+        key = schedule_key(courses, fmt, width, height)
+        image_id = f"{key}.{FILE_EXTENSIONS[fmt]}"
+
+        with self._lock:
+            if image_id in self._jobs or self.store.path(image_id) is not None:
+                return image_id
+            self._failures.pop(image_id, None)
+            self.store.reserve(image_id)
+            # Submitted without the caller's context: the render is not bound by the turn deadline
+            job = self._executor.submit(self._render, image_id, courses, fmt, width, height)
+            self._jobs[image_id] = job
+        job.add_done_callback(lambda done: self._finished(image_id, done))
+        return image_id
+
+    def wait(self, image_id: str, timeout: float) -> Path | None:
+        """The stored image once it is rendered, or None if there is no such image.
+
+        Raises TimeoutError if it is still rendering after `timeout` seconds,
+        and RuntimeError if its render failed.
+        """
+        with self._lock:
+            job = self._jobs.get(image_id)
+            failure = self._failures.get(image_id)
+        if failure is not None:
+            raise RuntimeError(failure)
+        if job is not None:
+            try:
+                job.result(timeout=timeout)
+            except TimeoutError:
+                raise
+            except Exception as exc:
+                raise RuntimeError(f"Failed to render schedule image: {exc}") from exc
+            return self.store.path(image_id)
+
+        give_up_at = time.monotonic() + timeout
+        while True:
+            path = self.store.path(image_id)
+            if path is not None or not self.store.pending(image_id):
+                return path
+            if time.monotonic() >= give_up_at:
+                raise TimeoutError(f"Schedule image {image_id} is still rendering")
+            time.sleep(_POLL_SECONDS)
+
+    def _render(self, image_id: str, courses: list[Mapping[str, Any]], fmt: str, width: int, height: int) -> None:
+        try:
+            image = render_schedule(courses, fmt, width=width, height=height)
+            self.store.put(image.data, image.extension, image_id=image_id)
+        finally:
+            self.store.release(image_id)
+
+    def _finished(self, image_id: str, job: Future) -> None:
+        exc = job.exception()
+        with self._lock:
+            if self._jobs.get(image_id) is job:
+                del self._jobs[image_id]
+            if exc is not None:
+                print(f"[warn] Schedule render {image_id} failed: {exc}")
+                self._failures[image_id] = f"Failed to render schedule image: {exc}"
+                while len(self._failures) > _MAX_FAILURES:
+                    self._failures.popitem(last=False)
+
+
+render_jobs = RenderJobs(image_store)
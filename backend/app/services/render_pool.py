@@ -0,0 +1,131 @@
+"""
+Long-lived worker processes for raster schedule renders.
+
+Rasterizing (Pillow or matplotlib) is CPU-bound, so in a threaded server
+concurrent renders queue up behind the GIL. `render` hands the blocks to a
+pool of `SCHEDULE_RENDER_WORKERS` processes instead, so renders run on
+separate cores. Each worker loads matplotlib and the fonts when it starts and
+keeps one matplotlib figure with the axes, labels and grid already drawn;
+each render only replaces the course blocks and time labels, so no request
+pays for font discovery, figure setup or layout.
+
+With `SCHEDULE_RENDER_WORKERS=0`, or if the pool cannot be used (e.g. a
+worker died), rendering happens in the calling process instead.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Mapping, Sequence
+
+from . import deadline
+
+WORKERS = int(os.getenv("SCHEDULE_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: ProcessPoolExecutor | None = None
+# The process that created `_pool`; a forked child must not use its parent's pool
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+# In a worker: the figure every matplotlib render draws on
+_figure: Any = None
+
+
+def _init_worker() -> None:
+    """Load the renderers and their fonts before the first job arrives."""
+    global _figure
+    from . import schedule_render, schedule_visualizer
+
+    _figure = schedule_visualizer.new_figure()
+    schedule_visualizer.render_blocks_png([], _figure)
+    schedule_render.render_png([])
+
+
+def _render_in_worker(blocks: Sequence[Mapping[str, Any]], fmt: str, width: int, height: int) -> bytes:
+    from . import schedule_render
+
+    return schedule_render.render_blocks(blocks, fmt, width, height, figure=_figure)
+
+
+def _pdf_in_worker(schedules: Sequence[Sequence[Mapping[str, Any]]]) -> bytes:
+    from . import schedule_visualizer
+
+    return schedule_visualizer.render_blocks_pdf(schedules, _figure)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool, _pool_pid
+    if WORKERS < 1:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # Spawned workers start clean rather than inheriting the server's threads and locks
+            _pool = ProcessPoolExecutor(
+                max_workers=WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def start() -> list[Future]:
+    """Start every worker now (they warm up in the background) instead of on the first render."""
+    pool = _get_pool()
+    if pool is None:
+        return []
+    return [pool.submit(_warm_up) for _ in range(WORKERS)]
+
+
+def _discard(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(in_worker: Callable[..., bytes], in_process: Callable[..., bytes], *args: Any) -> bytes:
+    """`in_worker(*args)` on a worker, waiting at most until the current deadline.
+
+    Falls back to `in_process(*args)` if the pool is disabled or broken; a
+    broken pool is replaced on the next call.
+    """
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            future = pool.submit(in_worker, *args)
+            return future.result(timeout=deadline.remaining())
+        except BrokenProcessPool:
+            print("[warn] Schedule render pool broke; rendering in-process.")
+            _discard(pool)
+    return in_process(*args)
+
+
+def render(blocks: Sequence[Mapping[str, Any]], fmt: str, width: int, height: int) -> bytes:
+    """Render one schedule image on a worker (see `_run`)."""
+    from . import schedule_render
+
+    return _run(_render_in_worker, schedule_render.render_blocks, list(blocks), fmt, width, height)
+
+
+def render_pdf(schedules: Sequence[Sequence[Mapping[str, Any]]]) -> bytes:
+    """A multi-page matplotlib PDF, one page per list of blocks, drawn on a worker."""
+    from . import schedule_visualizer
+
+    return _run(_pdf_in_worker, schedule_visualizer.render_blocks_pdf, [list(blocks) for blocks in schedules])
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,10 +1,24 @@
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 import requests
 import json
 
+from . import deadline
+from .singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# RMP had no timeout at all; a hung GraphQL call used to stall the whole agent turn
+_REQUEST_TIMEOUT_SECONDS = 10
+
+# Shared across clients: concurrent identical lookups hit RMP only once,
+# and school IDs never change so they are cached for the process lifetime.
+_SCHOOL_FLIGHT = SingleFlight()
+_PROFESSOR_FLIGHT = SingleFlight()
+_SCHOOL_ID_CACHE: Dict[str, str] = {}
+_SCHOOL_ID_CACHE_LOCK = threading.Lock()
+
 
 class RMPClient:
     """Client for RateMyProfessor API using GraphQL.
@@ -22,7 +36,23 @@ class RMPClient:
         }
 
     def _get_school_id(self, school_name: str) -> Optional[str]:
-        """Search for a school's GraphQL ID."""
+        """Search for a school's GraphQL ID, reusing earlier or in-flight lookups."""
+        key = school_name.strip().lower()
+        with _SCHOOL_ID_CACHE_LOCK:
+            cached = _SCHOOL_ID_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch() -> Optional[str]:
+            school_id = self._search_school_id(school_name)
+            with _SCHOOL_ID_CACHE_LOCK:
+                _SCHOOL_ID_CACHE[key] = school_id
+            return school_id
+
+        return _SCHOOL_FLIGHT.do(key, fetch, timeout=deadline.remaining())
+
+    def _search_school_id(self, school_name: str) -> Optional[str]:
+        """Query RMP for a school's GraphQL ID."""
         query = """
         query SearchSchoolsQuery($query: SchoolSearchQuery!) {
           search: newSearch {
@@ -50,7 +80,8 @@ class RMPClient:
             resp = requests.post(
                 self.base_url,
                 headers=self.headers,
-                json={"query": query, "variables": variables}
+                json={"query": query, "variables": variables},
+                timeout=deadline.timeout(_REQUEST_TIMEOUT_SECONDS),
             )
             
             if resp.status_code == 200:
@@ -69,6 +100,10 @@ class RMPClient:
             
             raise ValueError(f"Couldn't find {school_name}... you sure that's a real school?")
                 
+        except requests.Timeout as e:
+            raise TimeoutError("RateMyProfessors did not respond in time.") from e
+        except TimeoutError:
+            raise
         except Exception as e:
             logger.error(f"School search broke: {e}")
             raise ValueError(f"Something went wrong looking for the school: {str(e)}")
@@ -86,7 +121,18 @@ class RMPClient:
           "would_take_again": 87.5,
           "recent_comments": ["...", "..."],
         }
+
+        Identical lookups that are already in flight are joined rather than repeated.
         """
+        key = (school_name.strip().lower(), professor_name.strip().lower(), comment_limit)
+        return _PROFESSOR_FLIGHT.do(
+            key,
+            lambda: self._fetch_professor_summary(school_name, professor_name, comment_limit),
+            timeout=deadline.remaining(),
+        )
+
+    def _fetch_professor_summary(self, school_name: str, professor_name: str, comment_limit: int) -> Dict[str, Any]:
+        """Query RMP for a professor and build the compact summary."""
         try:
             school_id = self._get_school_id(school_name)
             
@@ -129,7 +175,8 @@ class RMPClient:
             resp = requests.post(
                 self.base_url,
                 headers=self.headers,
-                json={"query": query, "variables": variables}
+                json={"query": query, "variables": variables},
+                timeout=deadline.timeout(_REQUEST_TIMEOUT_SECONDS),
             )
             
             if resp.status_code != 200:
@@ -172,6 +219,10 @@ class RMPClient:
                 # "recent_comments": comments
             }
                 
+        except requests.Timeout as e:
+            raise TimeoutError("RateMyProfessors did not respond in time.") from e
+        except TimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error getting professor summary: {e}")
             raise ValueError(str(e))
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Several schedules in one request, for comparing alternatives side by side.
+
+Students weighing options used to cost one `/api/schedule/generate` call (and
+one figure setup) per option. `POST /api/schedule/batch` takes them all at
+once and returns one of:
+
+- "ids": image ids from `render_jobs`, rendered in the background and served
+  by `/api/schedule/image/<id>`, like the generate_schedule tool's images
+- "sprite": one image with the schedules in a grid, each rendered in parallel
+  (raster formats across `render_pool`'s workers) and cached individually
+- "pdf": a multi-page vector PDF, every page drawn on the same worker's
+  pre-built axes and grid, with only the course blocks swapped per page
+"""
+from __future__ import annotations
+
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping, Sequence
+
+from . import render_pool
+from .render_jobs import render_jobs
+from .schedule_render import ScheduleImage, course_blocks, render_schedule
+
+OUTPUTS = ("ids", "sprite", "pdf")
+MAX_SCHEDULES = int(os.getenv("SCHEDULE_BATCH_MAX", "12"))
+
+# Threads only wait on the worker processes (or build SVG), so a few are enough
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="schedule-batch")
+
+Schedule = Sequence[Mapping[str, Any]]
+
+
+def resolve_schedules(schedules: Any) -> list[list[Mapping[str, Any]]]:
+    """Validate a list of schedules, each a course list or `{"courses": [...]}`."""
+    if not isinstance(schedules, list) or not schedules:
+        raise ValueError("'schedules' must be a non-empty list")
+    if len(schedules) > MAX_SCHEDULES:
+        raise ValueError(f"At most {MAX_SCHEDULES} schedules per batch")
+    resolved = []
+    for i, schedule in enumerate(schedules):
+        if isinstance(schedule, dict):
+            schedule = schedule.get("courses")
+        if not isinstance(schedule, list) or not all(isinstance(course, dict) for course in schedule):
+            raise ValueError(f"Schedule {i} must be a list of courses")
+        resolved.append(schedule)
+    return resolved
+
+
+def resolve_output(output: str | None) -> str:
+    output = (output or "ids").strip().lower()
+    if output not in OUTPUTS:
+        raise ValueError(f"Unsupported batch output {output!r}; choose one of: {', '.join(OUTPUTS)}")
+    return output
+
+
+def submit_images(schedules: Sequence[Schedule], fmt: str, width: int, height: int) -> list[str]:
+    """Start a background render for each schedule; returns their image ids."""
+    return [render_jobs.submit(courses, fmt, width=width, height=height) for courses in schedules]
+
+
+def render_images(schedules: Sequence[Schedule], fmt: str, width: int, height: int) -> list[ScheduleImage]:
+    return list(_executor.map(lambda courses: render_schedule(courses, fmt, width=width, height=height), schedules))
+
+
+def render_sprite(
+    schedules: Sequence[Schedule],
+    fmt: str,
+    width: int,
+    height: int,
+    columns: int | None = None,
+) -> tuple[bytes, int, tuple[int, int]]:
+    """The schedules in a grid, left to right and top to bottom.
+
+    Returns the image bytes, the number of columns and the size of one cell
+    in the image's own units (raster formats are larger than `width` x `height`).
+    """
+    if columns is not None and columns < 1:
+        raise ValueError("'columns' must be at least 1")
+    columns = min(columns or math.ceil(math.sqrt(len(schedules))), len(schedules))
+    images = render_images(schedules, fmt, width, height)
+    if fmt == "svg":
+        return _svg_sprite(images, columns, width, height), columns, (width, height)
+    return _raster_sprite(images, columns)
+
+
+def _svg_sprite(images: Sequence[ScheduleImage], columns: int, width: int, height: int) -> bytes:
+    rows = math.ceil(len(images) / columns)
+    sheet_width, sheet_height = columns * width, rows * height
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{sheet_width}" height="{sheet_height}" '
+        f'viewBox="0 0 {sheet_width} {sheet_height}">'
+    ]
+    for i, image in enumerate(images):
+        x, y = (i % columns) * width, (i // columns) * height
+        # Each render is a complete <svg>; nested, it is placed by its x and y
+        out.append(image.data.decode("utf-8").replace("<svg ", f'<svg x="{x}" y="{y}" ', 1))
+    out.append("</svg>")
+    return "".join(out).encode("utf-8")
+
+
+def _raster_sprite(images: Sequence[ScheduleImage], columns: int) -> tuple[bytes, int, tuple[int, int]]:
+    from PIL import Image
+
+    tiles = [Image.open(io.BytesIO(image.data)).convert("RGB") for image in images]
+    cell_width, cell_height = tiles[0].size
+    rows = math.ceil(len(tiles) / columns)
+    sheet = Image.new("RGB", (columns * cell_width, rows * cell_height), "white")
+    for i, tile in enumerate(tiles):
+        sheet.paste(tile, ((i % columns) * cell_width, (i // columns) * cell_height))
+
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG")
+    return buf.getvalue(), columns, (cell_width, cell_height)
+
+
+def render_pdf(schedules: Sequence[Schedule]) -> bytes:
+    return render_pool.render_pdf([course_blocks(courses) for courses in schedules])
+
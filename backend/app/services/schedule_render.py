@@ -0,0 +1,355 @@
+"""
+Schedule images without matplotlib.
+
+`generate_schedule_png` builds a matplotlib figure, lays it out and rasterizes
+it at 200 dpi for every schedule. The week grid is simple enough to place by
+hand: `_layout` turns the blocks from `extract_course_blocks` into rectangles,
+lines and text once, and each backend just writes those shapes out, as SVG
+markup or (with Pillow) as a PNG.
+
+`render_schedule(courses, fmt)` picks the renderer and caches the result
+(see render_cache.py):
+
+- "svg": vector markup, the smallest and fastest output
+- "png": raster via Pillow
+- "matplotlib": the original `generate_schedule_png` figure
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+from xml.sax.saxutils import escape
+
+from . import render_pool
+from .render_cache import render_cache
+from .schedule_visualizer import DAY_ORDER, assign_colors, extract_course_blocks, format_time_label, render_blocks_png
+
+FORMATS = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "matplotlib": "image/png",
+}
+FILE_EXTENSIONS = {"svg": "svg", "png": "png", "matplotlib": "png"}
+DEFAULT_FORMAT = os.getenv("SCHEDULE_IMAGE_FORMAT", "svg").strip().lower()
+
+DEFAULT_WIDTH = 1100
+DEFAULT_HEIGHT = 600
+MIN_SIZE, MAX_SIZE = 200, 4000
+# Bump when the layout or drawing changes, so cached renders are not reused
+RENDER_VERSION = 1
+# Pillow output is drawn at this multiple of the layout size so text stays sharp
+RASTER_SCALE = 2
+
+_FONT_FAMILY = "DejaVu Sans, Helvetica, Arial, sans-serif"
+_MARGIN_LEFT, _MARGIN_RIGHT, _MARGIN_TOP, _MARGIN_BOTTOM = 64, 16, 56, 16
+_LABEL_SIZE = 11
+_TICK_SIZE = 10
+_TITLE_SIZE = 16
+
+
+@dataclass(frozen=True)
+class _Rect:
+    x: float
+    y: float
+    width: float
+    height: float
+    fill: str
+    stroke: str | None = None
+    stroke_width: float = 0.0
+    opacity: float = 1.0
+
+
+@dataclass(frozen=True)
+class _Line:
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    color: str
+    width: float = 1.0
+
+
+@dataclass(frozen=True)
+class _Text:
+    """Lines of text centered on (x, y)."""
+
+    x: float
+    y: float
+    lines: tuple[str, ...]
+    size: float
+    bold: bool = False
+    rotate: bool = False
+
+
+def _layout(blocks: Sequence[Mapping[str, Any]], width: float, height: float) -> list[_Rect | _Line | _Text]:
+    """Shapes of the week grid, in drawing order (grid, then blocks, then labels)."""
+    shapes: list[_Rect | _Line | _Text] = [_Rect(0, 0, width, height, "#ffffff")]
+    if not blocks:
+        shapes.append(_Text(width / 2, height / 2, ("No courses scheduled",), _TITLE_SIZE))
+        return shapes
+
+    colors = assign_colors(blocks)
+    min_time = min(b["start"] for b in blocks)
+    max_time = max(b["end"] for b in blocks)
+    left, right = _MARGIN_LEFT, width - _MARGIN_RIGHT
+    top, bottom = _MARGIN_TOP, height - _MARGIN_BOTTOM
+    column = (right - left) / len(DAY_ORDER)
+    per_hour = (bottom - top) / max(max_time - min_time, 0.5)
+
+    def y_at(hour: float) -> float:
+        return top + (hour - min_time) * per_hour
+
+    shapes.append(_Text(width / 2, 18, ("Course Schedule",), _TITLE_SIZE, bold=True))
+    shapes.append(_Text(14, (top + bottom) / 2, ("Time",), _LABEL_SIZE, rotate=True))
+
+    # Grid first, behind the blocks
+    for hour in range(math.ceil(min_time), math.floor(max_time) + 1):
+        shapes.append(_Line(left, y_at(hour), right, y_at(hour), "#bbbbbb"))
+    for i in range(len(DAY_ORDER) + 1):
+        shapes.append(_Line(left + i * column, top, left + i * column, bottom, "#dddddd"))
+    shapes.append(_Rect(left, top, right - left, bottom - top, "none", "#333333", 1.0))
+
+    for i, day in enumerate(DAY_ORDER):
+        shapes.append(_Text(left + (i + 0.5) * column, top - 12, (day,), _LABEL_SIZE, bold=True))
+    for step in range(int((max_time - min_time) * 2) + 1):
+        hour = min_time + step * 0.5
+        shapes.append(_Text(left - 26, y_at(hour), (format_time_label(hour),), _TICK_SIZE))
+
+    for b in blocks:
+        x = left + DAY_ORDER.index(b["day"]) * column
+        y, y_end = y_at(b["start"]), y_at(b["end"])
+        label = b["label"]
+        shapes.append(_Rect(x + 0.05 * column, y, 0.9 * column, y_end - y, colors[label.split("\n")[0]], "#000000", 1.2, 0.92))
+        shapes.append(_Text(x + column / 2, (y + y_end) / 2, tuple(line for line in label.split("\n") if line), _LABEL_SIZE - 1))
+    return shapes
+
+
+def render_svg(blocks: Sequence[Mapping[str, Any]], width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT) -> bytes:
+    """SVG markup for a week of schedule blocks."""
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="{_FONT_FAMILY}">'
+    ]
+    for shape in _layout(blocks, width, height):
+        if isinstance(shape, _Line):
+            out.append(
+                f'<line x1="{shape.x1:.1f}" y1="{shape.y1:.1f}" x2="{shape.x2:.1f}" y2="{shape.y2:.1f}" '
+                f'stroke="{shape.color}" stroke-width="{shape.width:g}"/>'
+            )
+        elif isinstance(shape, _Rect):
+            stroke = f' stroke="{shape.stroke}" stroke-width="{shape.stroke_width:g}"' if shape.stroke else ""
+            opacity = f' fill-opacity="{shape.opacity:g}"' if shape.opacity < 1 else ""
+            out.append(
+                f'<rect x="{shape.x:.1f}" y="{shape.y:.1f}" width="{shape.width:.1f}" height="{shape.height:.1f}" '
+                f'fill="{shape.fill}"{opacity}{stroke}/>'
+            )
+        else:
+            line_height = shape.size * 1.25
+            first = shape.y - line_height * (len(shape.lines) - 1) / 2
+            weight = ' font-weight="bold"' if shape.bold else ""
+            rotate = f' transform="rotate(-90 {shape.x:.1f} {shape.y:.1f})"' if shape.rotate else ""
+            spans = "".join(
+                f'<tspan x="{shape.x:.1f}" y="{first + i * line_height:.1f}">{escape(line)}</tspan>'
+                for i, line in enumerate(shape.lines)
+            )
+            out.append(
+                f'<text font-size="{shape.size:g}" text-anchor="middle" dominant-baseline="central"'
+                f'{weight}{rotate}>{spans}</text>'
+            )
+    out.append("</svg>")
+    return "".join(out).encode("utf-8")
+
+
+def _blend(color: str, opacity: float) -> tuple[int, int, int]:
+    """`color` drawn at `opacity` over white."""
+    rgb = (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
+    return tuple(round(c * opacity + 255 * (1 - opacity)) for c in rgb)
+
+
+@functools.lru_cache(maxsize=16)
+def _font(size: int, bold: bool) -> Any:
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        # Not installed system-wide: Pillow's bundled font
+        return ImageFont.load_default(size)
+
+
+def render_png(
+    blocks: Sequence[Mapping[str, Any]],
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+    scale: int = RASTER_SCALE,
+) -> bytes:
+    """PNG of the same layout as `render_svg`, drawn with Pillow."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError as exc:  # pragma: no cover - Pillow comes with matplotlib
+        raise RuntimeError("The 'png' schedule format needs Pillow (pip install Pillow).") from exc
+
+    image = Image.new("RGB", (width * scale, height * scale), "white")
+    draw = ImageDraw.Draw(image)
+    for shape in _layout(blocks, width, height):
+        if isinstance(shape, _Line):
+            draw.line(
+                [(shape.x1 * scale, shape.y1 * scale), (shape.x2 * scale, shape.y2 * scale)],
+                fill=shape.color, width=max(1, round(shape.width * scale)),
+            )
+        elif isinstance(shape, _Rect):
+            box = [shape.x * scale, shape.y * scale, (shape.x + shape.width) * scale, (shape.y + shape.height) * scale]
+            fill = None if shape.fill == "none" else _blend(shape.fill, shape.opacity)
+            outline_width = max(1, round(shape.stroke_width * scale)) if shape.stroke else 0
+            draw.rectangle(box, fill=fill, outline=shape.stroke, width=outline_width)
+        else:
+            _draw_text(image, draw, shape, _font(round(shape.size * scale), shape.bold), scale)
+
+    # A handful of fills plus anti-aliased text: a 64-color palette looks the same,
+    # and encodes in about half the time at about half the size of RGB
+    buf = io.BytesIO()
+    image.quantize(64, method=Image.Quantize.FASTOCTREE).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _draw_text(image: Any, draw: Any, shape: _Text, font: Any, scale: int) -> None:
+    line_height = shape.size * 1.25 * scale
+    if shape.rotate:
+        from PIL import Image, ImageDraw
+
+        # Draw on a transparent strip and paste it turned a quarter left
+        text = shape.lines[0]
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        strip = Image.new("RGBA", (right - left + 2, bottom - top + 2), (255, 255, 255, 0))
+        ImageDraw.Draw(strip).text((-left + 1, -top + 1), text, font=font, fill="black")
+        strip = strip.rotate(90, expand=True)
+        image.paste(strip, (round(shape.x * scale - strip.width / 2), round(shape.y * scale - strip.height / 2)), strip)
+        return
+
+    first = shape.y * scale - line_height * (len(shape.lines) - 1) / 2
+    for i, line in enumerate(shape.lines):
+        # "mm": centered on the line's middle, so lines with and without
+        # descenders sit on the same spacing
+        draw.text((shape.x * scale, first + i * line_height), line, font=font, fill="black", anchor="mm")
+
+
+def course_blocks(courses: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    blocks: list[dict[str, Any]] = []
+    for course in courses:
+        blocks.extend(extract_course_blocks(course))
+    return blocks
+
+
+def resolve_format(fmt: str | None) -> str:
+    """Validate a requested format; None means SCHEDULE_IMAGE_FORMAT."""
+    fmt = (fmt or DEFAULT_FORMAT).strip().lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported schedule image format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+    return fmt
+
+
+def resolve_size(width: Any = None, height: Any = None) -> tuple[int, int]:
+    """Validate a requested image size in layout pixels; None means the default."""
+    size = []
+    for name, value, default in (("width", width, DEFAULT_WIDTH), ("height", height, DEFAULT_HEIGHT)):
+        if value is None or value == "":
+            size.append(default)
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' must be an integer.") from None
+        if not MIN_SIZE <= value <= MAX_SIZE:
+            raise ValueError(f"'{name}' must be between {MIN_SIZE} and {MAX_SIZE}.")
+        size.append(value)
+    return size[0], size[1]
+
+
+def render_key(blocks: Sequence[Mapping[str, Any]], fmt: str, width: int, height: int) -> str:
+    """Hash of everything that decides a render's bytes.
+
+    Blocks are compared as a set (order does not matter), and the
+    matplotlib figure has a fixed size, so its key ignores the requested one.
+    """
+    normalized = sorted(
+        (DAY_ORDER.index(b["day"]), round(b["start"], 4), round(b["end"], 4), b["label"]) for b in blocks
+    )
+    if fmt == "matplotlib":
+        width, height = DEFAULT_WIDTH, DEFAULT_HEIGHT
+    payload = json.dumps([RENDER_VERSION, fmt, width, height, normalized], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def schedule_key(
+    courses: Iterable[Mapping[str, Any]],
+    fmt: str,
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+) -> str:
+    """The key `render_schedule` would give these courses, without rendering."""
+    return render_key(course_blocks(courses), fmt, width, height)
+
+
+@dataclass(frozen=True)
+class ScheduleImage:
+    data: bytes
+    fmt: str
+    # Content hash of the render's inputs, also used as its ETag
+    key: str
+
+    @property
+    def mimetype(self) -> str:
+        return FORMATS[self.fmt]
+
+    @property
+    def extension(self) -> str:
+        return FILE_EXTENSIONS[self.fmt]
+
+
+def render_blocks(
+    blocks: Sequence[Mapping[str, Any]],
+    fmt: str,
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+    figure: Any = None,
+) -> bytes:
+    """Render blocks in this process; matplotlib draws on `figure` if given."""
+    if fmt == "matplotlib":
+        return render_blocks_png(blocks, figure)
+    if fmt == "svg":
+        return render_svg(blocks, width, height)
+    return render_png(blocks, width, height)
+
+
+def render_schedule(
+    courses: Iterable[Mapping[str, Any]],
+    fmt: str | None = None,
+    *,
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+    cache: bool = True,
+) -> ScheduleImage:
+    """Render a schedule of `{"section", "catalog"}` courses.
+
+    Repeats of the same section set, size and format come from `render_cache`
+    unless `cache` is False. Raster formats are drawn on `render_pool`'s
+    worker processes. Raises ValueError for an unknown format.
+    """
+    fmt = resolve_format(fmt)
+    blocks = course_blocks(courses)
+    key = render_key(blocks, fmt, width, height)
+
+    def render() -> bytes:
+        # SVG is cheaper to build than to send to another process
+        if fmt == "svg":
+            return render_svg(blocks, width, height)
+        return render_pool.render(blocks, fmt, width, height)
+
+    data = render_cache.get_or_render(f"{key}.{FILE_EXTENSIONS[fmt]}", render) if cache else render()
+    return ScheduleImage(data=data, fmt=fmt, key=key)
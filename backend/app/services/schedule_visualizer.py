@@ -1,10 +1,38 @@
 import json
-import math
-import random
 import io
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for server
-import matplotlib.pyplot as plt
+import threading
+import zlib
+
+_figure_module = None
+_figure_lock = threading.Lock()
+
+
+def _mpl():
+    """Import matplotlib on first render; it adds about half a second to startup.
+
+    Figures are built with the object-oriented API rather than pyplot, whose
+    global current-figure state is not safe to share between threads.
+    """
+    global _figure_module
+    if _figure_module is None:
+        with _figure_lock:
+            if _figure_module is None:
+                import matplotlib
+                matplotlib.use('Agg')  # Use non-interactive backend for server
+                import matplotlib.figure
+                import matplotlib.patches
+                _figure_module = matplotlib
+    return _figure_module
+
+
+def new_figure():
+    """A figure sized like every schedule, with its axes and grid already drawn.
+
+    Workers keep one; each render only swaps the course blocks (see `draw_schedule`).
+    """
+    fig = _mpl().figure.Figure(figsize=(11, 6))
+    _template(fig)
+    return fig
 
 DAY_ORDER = ["M", "T", "W", "R", "F"]
 
@@ -69,69 +97,98 @@ def extract_course_blocks(course):
                 })
     return blocks
 
-def generate_schedule_png(course_json_list):
+def assign_colors(blocks):
+    """Map each class identity (course + section, the label's first line) to a palette color.
+
+    Each class hashes to a preferred color, and the colors depend only on the
+    set of classes, so identical schedules render identically. If two classes
+    in one schedule want the same color, the later one (in sorted order) takes
+    the next free one, so a class keeps its color across schedules only when
+    none of the others collides with it.
     """
-    Generate a schedule PNG from a list of course objects.
-    
-    Args:
-        course_json_list: List of dicts, each with 'section' and 'catalog' keys
-    
-    Returns:
-        BytesIO object containing PNG image data
+    course_ids = sorted({(b["label"].split("\n")[0]) for b in blocks})
+    color_map = {}
+    taken = set()
+    for cid in course_ids:
+        index = zlib.crc32(cid.encode("utf-8")) % len(PALETTE)
+        if len(taken) < len(PALETTE):
+            while index in taken:
+                index = (index + 1) % len(PALETTE)
+        taken.add(index)
+        color_map[cid] = PALETTE[index]
+    return color_map
+
+class _Template:
+    """The parts of a schedule figure that every render shares."""
+
+    def __init__(self, fig):
+        fig.clear()
+        ax = fig.add_subplot()
+        ax.set_xlim(0, len(DAY_ORDER))
+        ax.set_xticks(range(len(DAY_ORDER)))
+        ax.set_xticklabels(DAY_ORDER)
+        ax.set_ylabel("Time")
+        ax.set_title("Course Schedule")
+
+        # Grid behind the blocks: every hour of the day, clipped to each
+        # schedule's time range, and a line between days
+        self.grid = [ax.axhline(t, color="#bbbbbb", linewidth=1.0, zorder=1) for t in range(25)]
+        self.grid += [ax.axvline(i, color="#dddddd", linewidth=1.0, zorder=1) for i in range(len(DAY_ORDER) + 1)]
+        self.empty = ax.text(0.5, 0.5, "No courses scheduled", ha='center', va='center',
+                             fontsize=16, transform=ax.transAxes, visible=False)
+
+        # Time labels always read HH:MM, so one layout fits every schedule
+        ax.set_ylim(9, 8)
+        ax.set_yticks([8, 8.5, 9])
+        ax.set_yticklabels([format_time_label(t) for t in (8, 8.5, 9)])
+        fig.tight_layout()
+
+        self.ax = ax
+        # The previous render's rectangles and labels
+        self.blocks = []
+
+
+def _template(fig):
+    template = getattr(fig, "_schedule_template", None)
+    if template is None:
+        template = fig._schedule_template = _Template(fig)
+    return template
+
+
+def draw_schedule(fig, blocks):
+    """Draw schedule blocks onto `fig`, replacing whatever it showed before.
+
+    Only the course blocks, time range and time labels change between
+    renders; the axes, day labels, title and grid are built once per figure.
     """
-    blocks = []
-    for c in course_json_list:
-        blocks.extend(extract_course_blocks(c))
+    mpl = _mpl()
+    template = _template(fig)
+    ax = template.ax
+    for artist in template.blocks:
+        artist.remove()
+    template.blocks.clear()
 
+    # An empty schedule shows only a placeholder message
+    template.empty.set_visible(not blocks)
+    ax.title.set_visible(bool(blocks))
+    for line in template.grid:
+        line.set_visible(bool(blocks))
     if not blocks:
-        # Return empty schedule if no blocks
-        fig, ax = plt.subplots(figsize=(11, 6))
-        ax.text(0.5, 0.5, "No courses scheduled", 
-                ha='center', va='center', fontsize=16)
-        ax.axis('off')
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=200)
-        plt.close()
-        buf.seek(0)
-        return buf
-
-    # Assign color per unique class identity (course + section)
-    course_ids = list({(b["label"].split("\n")[0]) for b in blocks})
-    shuffled_palette = PALETTE.copy()
-    random.shuffle(shuffled_palette)
-    color_map = {cid: shuffled_palette[i % len(shuffled_palette)] for i, cid in enumerate(course_ids)}
+        ax.set_axis_off()
+        return
+    ax.set_axis_on()
+
+    color_map = assign_colors(blocks)
 
     min_time = min(b["start"] for b in blocks)
     max_time = max(b["end"] for b in blocks)
-
-    fig, ax = plt.subplots(figsize=(11, 6))
-    ax.set_xlim(0, len(DAY_ORDER))
-    ax.set_ylim(min_time, max_time)
-
-    ax.set_xticks(range(len(DAY_ORDER)))
-    ax.set_xticklabels(DAY_ORDER)
+    ax.set_ylim(max_time, min_time)
 
     # Y-axis 30-min ticks
     yticks = [min_time + i*0.5 for i in range(int((max_time-min_time)*2)+1)]
     ax.set_yticks(yticks)
     ax.set_yticklabels([format_time_label(t) for t in yticks])
-    ax.invert_yaxis()
-
-    # --------------------
-    # DRAW GRID FIRST (behind blocks)
-    # --------------------
-
-    # Hour horizontal lines
-    for t in range(math.floor(min_time), math.ceil(max_time) + 1):
-        ax.axhline(t, color="#bbbbbb", linewidth=1.0, zorder=1)
 
-    # Vertical day lines (grid)
-    for i in range(len(DAY_ORDER) + 1):
-        ax.axvline(i, color="#dddddd", linewidth=1.0, zorder=1)
-
-    # --------------------
-    # DRAW BLOCKS ON TOP
-    # --------------------
     for b in blocks:
         x = DAY_ORDER.index(b["day"])
         y = b["start"]
@@ -140,7 +197,7 @@ def generate_schedule_png(course_json_list):
         course_id = b["label"].split("\n")[0]
         color = color_map[course_id]
 
-        rect = plt.Rectangle(
+        rect = mpl.patches.Rectangle(
             (x + 0.05, y),
             0.9,
             height,
@@ -152,7 +209,7 @@ def generate_schedule_png(course_json_list):
         )
         ax.add_patch(rect)
 
-        ax.text(
+        label = ax.text(
             x + 0.5,
             y + height/2,
             b["label"],
@@ -162,15 +219,43 @@ def generate_schedule_png(course_json_list):
             color="black",
             zorder=3  # Draw text on top of everything
         )
+        template.blocks += [rect, label]
 
-    ax.set_ylabel("Time")
-    ax.set_title("Course Schedule")
-    plt.tight_layout()
-    
-    # Save to BytesIO buffer
+
+def render_blocks_png(blocks, fig=None):
+    """PNG bytes of a schedule, drawn on `fig` (a new figure if None)."""
+    fig = fig if fig is not None else new_figure()
+    draw_schedule(fig, blocks)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=200)
+    return buf.getvalue()
+
+
+def render_blocks_pdf(schedules, fig=None):
+    """A PDF with one vector page per list of blocks, each swapped into the same figure's axes and grid."""
+    _mpl()
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    fig = fig if fig is not None else new_figure()
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=200)
-    plt.close()
-    buf.seek(0)
+    with PdfPages(buf) as pdf:
+        for blocks in schedules:
+            draw_schedule(fig, blocks)
+            pdf.savefig(fig)
+    return buf.getvalue()
+
+
+def generate_schedule_png(course_json_list):
+    """
+    Generate a schedule PNG from a list of course objects.
+    
+    Args:
+        course_json_list: List of dicts, each with 'section' and 'catalog' keys
     
-    return buf
+    Returns:
+        BytesIO object containing PNG image data
+    """
+    blocks = []
+    for c in course_json_list:
+        blocks.extend(extract_course_blocks(c))
+    return io.BytesIO(render_blocks_png(blocks))
@@ -0,0 +1,70 @@
+"""
+Per-key in-flight deduplication for concurrent identical lookups.
+
+When several threads ask for the same key at once, only the first one (the
+leader) runs the fetch; the others (followers) block until the leader
+finishes and then share its result or exception.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """A single in-flight fetch that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    Only calls that overlap in time are merged; once the leader returns, the
+    next call for the same key starts a fresh fetch. Pair it with a cache when
+    results should outlive the call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: float | None = None) -> Any:
+        """Run `fn` for `key`, or wait for the already running call for `key`.
+
+        A follower gives up after `timeout` seconds with TimeoutError; the
+        leader keeps running, so its result still lands in any cache it fills.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for the in-flight call for {key!r}.")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call for `key` is currently running."""
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,154 @@
+"""
+Sentence-level pipelining of streamed agent text into text-to-speech.
+
+The agent reply arrives as text deltas. `SentenceSplitter` turns those deltas
+into whole sentences as soon as each one ends, and `pipeline_tts` starts a TTS
+request per sentence while earlier sentences are still being played back,
+yielding the audio in sentence order on a single stream.
+"""
+import queue
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets,
+# then whitespace. Decimals like "3.5" and codes like "155H." at the very end
+# of the buffer are left alone until more text arrives.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+_DONE = object()
+
+
+def _close(result: object) -> None:
+    close = getattr(result, "close", None)
+    if close is not None:
+        close()
+
+
+def _close_when_done(future: Future) -> None:
+    """Close a synthesized result that will never be read (e.g. its HTTP response)."""
+
+    def close(done: Future) -> None:
+        if not done.cancelled() and done.exception() is None:
+            _close(done.result())
+
+    future.add_done_callback(close)
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text into sentences.
+
+    Fragments shorter than `min_chars` (e.g. "Hi!" or "Dr.") are held back and
+    merged with the following sentence so TTS isn't called for tiny snippets.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta and return any sentences it completed."""
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left once the stream has ended."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+
+def split_sentences(deltas: Iterable[str], min_chars: int = 20) -> Iterator[str]:
+    """Yield complete sentences from an iterable of text deltas."""
+    splitter = SentenceSplitter(min_chars=min_chars)
+    for delta in deltas:
+        yield from splitter.feed(delta)
+    yield from splitter.flush()
+
+
+def pipeline_tts(
+    sentences: Iterable[str],
+    synthesize: Callable[[str], Iterable[bytes]],
+    lookahead: int = 2,
+) -> Iterator[bytes]:
+    """Synthesize sentences concurrently and yield their audio in order.
+
+    `sentences` is consumed on a background thread, so the agent keeps
+    generating while audio is streamed out. Up to `lookahead` TTS requests run
+    ahead of the one currently being played back. `synthesize` should start the
+    upstream request and return an iterable of audio chunks; the chunks of each
+    sentence are only read once every earlier sentence has been yielded. If the
+    iterable has a `close` method (e.g. it wraps an HTTP response), it is called
+    once the audio is read, or when it never will be because the consumer left.
+    """
+    pending: "queue.Queue[object]" = queue.Queue(maxsize=max(1, lookahead))
+    stop = threading.Event()
+    # Held while queueing so nothing is added after the consumer drained the queue
+    put_lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=max(1, lookahead), thread_name_prefix="tts-pipeline")
+
+    def put(item: object) -> bool:
+        # Block while too far ahead, but give up if the consumer went away
+        while True:
+            with put_lock:
+                if stop.is_set():
+                    return False
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+
+    def produce() -> None:
+        try:
+            for sentence in sentences:
+                if stop.is_set():
+                    return
+                future = executor.submit(synthesize, sentence)
+                if not put(future):
+                    _close_when_done(future)
+                    return
+        except Exception as exc:
+            failed: Future = Future()
+            failed.set_exception(exc)
+            put(failed)
+        finally:
+            put(_DONE)
+
+    producer = threading.Thread(target=produce, name="tts-pipeline-producer", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            audio = item.result()
+            try:
+                for chunk in audio:
+                    if chunk:
+                        yield chunk
+            finally:
+                _close(audio)
+    finally:
+        with put_lock:
+            stop.set()
+        # Sentences synthesized (or being synthesized) but never played
+        while True:
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, Future):
+                _close_when_done(item)
+        executor.shutdown(wait=False, cancel_futures=True)
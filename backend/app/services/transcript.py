@@ -0,0 +1,188 @@
+"""
+The student's transcript, parsed once into set lookups.
+
+The transcript JSON (app/data/transcript.json) is large; pasting it into the
+prompt cost thousands of tokens on every model call, and the model still had
+to scan it. `TranscriptIndex` answers the questions the agent actually asks
+("has the student taken CSCE 310?", "how many credits are done?") from
+precomputed sets and totals instead.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping
+
+TRANSCRIPT_PATH = Path(__file__).resolve().parent.parent / "data" / "transcript.json"
+
+# Grades that do not earn credit for a course
+_NOT_EARNED_GRADES = {"F", "W", "WF", "WP", "NP", "N", "I", "NR", "X"}
+_COURSE_CODE = re.compile(r"([A-Z]{2,5})\s*0*(\d+[A-Z]*)")
+
+
+def normalize_course_code(code: str) -> str:
+    """'csce155h', 'CSCE  155H' -> 'CSCE 155H'; anything else is just tidied."""
+    compact = " ".join(str(code).strip().upper().split())
+    match = _COURSE_CODE.fullmatch(compact)
+    if match is None:
+        return compact
+    return f"{match.group(1)} {match.group(2)}"
+
+
+def _base_code(code: str) -> str:
+    """Honors sections share a course with the regular one: 'CSCE 155H' -> 'CSCE 155'."""
+    return code[:-1] if code.endswith("H") and code[-2:-1].isdigit() else code
+
+
+@dataclass(frozen=True)
+class TranscriptCourse:
+    code: str
+    title: str
+    term: str
+    grade: str | None
+    hours: float
+    # "completed", "in_progress" or "not_earned" (failed, withdrawn, incomplete)
+    status: str
+
+
+class TranscriptIndex:
+    """Completed and in-progress course sets, hours by term and GPA for one transcript.
+
+    Transfer and test credits whose title is a course code (e.g. "MATH106")
+    count as completed courses; the rest only add to the hours.
+    """
+
+    def __init__(self, transcript: Mapping[str, Any]):
+        info = transcript.get("studentInfo") or {}
+        self.name: str = info.get("name", "")
+        self.programs: list[str] = [_program_label(p) for p in info.get("programs") or []]
+
+        self._courses: Dict[str, TranscriptCourse] = {}
+        self.hours_by_term: Dict[str, float] = {}
+        self.transfer_credits: list[dict[str, Any]] = []
+        self.current_term: str | None = None
+        self.gpa: float | None = None
+
+        for term in transcript.get("academicHistory") or []:
+            term_name = term.get("termName", "")
+            in_progress = str(term.get("status", "")).lower() == "in progress"
+            if in_progress:
+                self.current_term = term_name
+
+            term_hours = 0.0
+            for course in term.get("courses") or []:
+                entry = _term_course(course, term_name, in_progress)
+                self._courses[entry.code] = entry
+                if entry.status == "completed":
+                    term_hours += entry.hours
+            if not in_progress:
+                self.hours_by_term[term_name] = term_hours
+
+            for block in term.get("transferBlocks") or []:
+                source = block.get("institution", "Transfer")
+                for course in block.get("courses") or []:
+                    hours = float(course.get("hours") or 0.0)
+                    title = str(course.get("title", ""))
+                    self.transfer_credits.append({"title": title, "hours": hours, "source": source})
+                    code = normalize_course_code(title)
+                    if _COURSE_CODE.fullmatch(code):
+                        self._courses.setdefault(code, TranscriptCourse(
+                            code=code, title=title, term=f"{source} ({term_name})",
+                            grade=course.get("grade"), hours=hours, status="completed",
+                        ))
+
+            gpa = (term.get("gpaStats") or {}).get("cumulativeGPA")
+            if gpa is not None:
+                self.gpa = float(gpa)
+
+        totals = (transcript.get("careerTotals") or {}).get("combined") or {}
+        if totals.get("gpa") is not None:
+            self.gpa = float(totals["gpa"])
+
+        self.completed = frozenset(c.code for c in self._courses.values() if c.status == "completed")
+        self.in_progress = frozenset(c.code for c in self._courses.values() if c.status == "in_progress")
+        self._by_base: Dict[str, list[str]] = {}
+        for code in self._courses:
+            self._by_base.setdefault(_base_code(code), []).append(code)
+
+        self.transfer_hours = sum(credit["hours"] for credit in self.transfer_credits)
+        self.hours_completed = sum(self.hours_by_term.values()) + self.transfer_hours
+        self.hours_in_progress = sum(c.hours for c in self._courses.values() if c.status == "in_progress")
+
+    def lookup(self, code: str) -> dict[str, Any]:
+        """Status of one course; honors and regular sections of a course match each other."""
+        normalized = normalize_course_code(code)
+        entry = self._courses.get(normalized)
+        if entry is None:
+            # Prefer a completed equivalent over an in-progress or failed one
+            candidates = [self._courses[c] for c in self._by_base.get(_base_code(normalized), [])]
+            candidates.sort(key=lambda c: ("completed", "in_progress", "not_earned").index(c.status))
+            entry = candidates[0] if candidates else None
+        if entry is None:
+            return {"course": normalized, "status": "not_taken"}
+
+        result: dict[str, Any] = {"course": normalized, "status": entry.status, "term": entry.term}
+        if entry.code != normalized:
+            result["matched"] = entry.code
+        if entry.grade:
+            result["grade"] = entry.grade
+        return result
+
+    def check(self, codes: Iterable[str]) -> list[dict[str, Any]]:
+        return [self.lookup(code) for code in codes]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "programs": self.programs,
+            "gpa": self.gpa,
+            "hours_completed": self.hours_completed,
+            "hours_in_progress": self.hours_in_progress,
+            "current_term": self.current_term,
+            "in_progress": sorted(self.in_progress),
+            "hours_by_term": self.hours_by_term,
+            "transfer_hours": self.transfer_hours,
+        }
+
+
+def _program_label(program: Mapping[str, Any]) -> str:
+    label = f"{program.get('type', 'Program')}: {program.get('name', '')}"
+    if program.get("option"):
+        label += f" ({program['option']})"
+    return label
+
+
+def _term_course(course: Mapping[str, Any], term_name: str, in_progress: bool) -> TranscriptCourse:
+    grade = course.get("grade")
+    if in_progress and grade is None:
+        status = "in_progress"
+    elif grade is not None and str(grade).upper() in _NOT_EARNED_GRADES:
+        status = "not_earned"
+    else:
+        status = "completed"
+    return TranscriptCourse(
+        code=normalize_course_code(f"{course.get('department', '')} {course.get('number', '')}"),
+        title=course.get("title", ""),
+        term=term_name,
+        grade=grade,
+        hours=float(course.get("hours") or 0.0),
+        status=status,
+    )
+
+
+_index: TranscriptIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_transcript_index() -> TranscriptIndex:
+    """Parse the transcript on first use and return the shared index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(TRANSCRIPT_PATH, encoding="utf-8") as handle:
+                    _index = TranscriptIndex(json.load(handle))
+    return _index
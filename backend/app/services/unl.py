@@ -3,6 +3,12 @@ import requests
 import re
 from collections import OrderedDict
 
+from . import deadline
+from .singleflight import SingleFlight
+
+# Concurrent catalog searches for the same query share one request
+_CATALOG_FLIGHT = SingleFlight()
+
 STANDARD_FIELDS = [
     "course_code",
     "course_title",
@@ -135,17 +141,28 @@ def get_unl_course_info(course_code):
     """
     Fetch and parse course information from the UNL course catalog.
     Can search by specific course code (e.g., "CSCE 322") or by words/phrases.
+    Identical searches that are already in flight are joined rather than repeated.
         
     Returns:
         dict: Course information with standardized fields (if one course found)
         list: List of course information dicts (if multiple courses found)
-        dict: Error dict with "error" key (if no courses found or error occurred)
+        dict: Error dict with "error" key (if no courses found or error occurred),
+            plus "timed_out": True if the request ran out of time
     """
+    try:
+        return _CATALOG_FLIGHT.do(
+            course_code, lambda: _fetch_unl_course_info(course_code), timeout=deadline.remaining()
+        )
+    except TimeoutError as e:
+        return {"error": f"Course catalog did not respond in time: {str(e)}", "timed_out": True}
+
+def _fetch_unl_course_info(course_code):
+    """Fetch and parse a catalog search without any request coalescing."""
     query = course_code.replace(" ", "%20")
     url = f"https://catalog.unl.edu/search/?caturl=%2Fundergraduate&scontext=courses&search={query}"
 
     try:
-        r = requests.get(url, timeout=10)
+        r = requests.get(url, timeout=deadline.timeout(10))
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "html.parser")
 
@@ -162,6 +179,8 @@ def get_unl_course_info(course_code):
         else:
             return courses
 
+    except (requests.Timeout, deadline.DeadlineExceeded) as e:
+        return {"error": f"Course catalog did not respond in time: {str(e)}", "timed_out": True}
     except requests.RequestException as e:
         return {"error": f"Failed to fetch course info: {str(e)}"}
     except Exception as e:
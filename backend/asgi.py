@@ -0,0 +1,10 @@
+import os
+from app import warm
+from app.asgi import create_asgi_app
+
+preload = os.getenv("APP_PRELOAD", "0") == "1"
+app = create_asgi_app(start_render_pool=preload)
+
+# Load the agent runtime and matplotlib at startup rather than on the first request
+if preload:
+    warm()
@@ -0,0 +1,114 @@
+"""
+Agent loop cost per turn, replayed offline from recorded fixtures.
+
+Run from backend/:
+
+    python -m benchmarks.bench_agent_replay [fixture files or directories] [--iterations N] [--stream]
+
+Fixtures are recorded from real sessions by setting AGENT_RECORD_DIR (see
+app/agent/replay.py); benchmarks/fixtures/agent holds a sample. Model and tool
+calls are served from the fixture with zero latency, so the reported time is
+what the backend itself spends per turn:
+
+- loop: preparing the conversation, projecting tool output, compaction, events
+- serialize: encoding each request body the way the SDK does before sending
+- alloc: peak and retained traced memory for one turn (tracemalloc)
+"""
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.agent import agent
+from app.agent.replay import load_fixture, replay
+
+_DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "agent"
+
+
+def _fixture_paths(targets):
+    paths = []
+    for target in targets:
+        target = Path(target)
+        paths.extend(sorted(target.glob("*.json")) if target.is_dir() else [target])
+    return paths
+
+
+def _run(fixture, stream):
+    kwargs = {"cached_prefix": fixture.get("cached_prefix", 0)}
+    if fixture.get("model"):
+        kwargs["model"] = fixture["model"]
+    if not stream:
+        reply, _ = agent.run_academic_advisor_agent(fixture["conversation"], tool_events=[], **kwargs)
+        return reply
+    for event in agent.stream_academic_advisor_agent(fixture["conversation"], **kwargs):
+        if event["type"] == "done":
+            return event["reply"]
+    return ""
+
+
+def _measure(path, iterations, stream):
+    fixture = load_fixture(path)
+
+    with replay(fixture):
+        reply = _run(fixture, stream)  # warm-up, and a correctness check
+    if reply != fixture["reply"]:
+        raise SystemExit(f"{path.name}: replayed reply differs from the recording")
+
+    wall = serialize = 0.0
+    for _ in range(iterations):
+        with replay(fixture) as client:
+            start = time.perf_counter()
+            _run(fixture, stream)
+            wall += time.perf_counter() - start
+            serialize += client.models.serialize_seconds
+
+    tracemalloc.start()
+    with replay(fixture):
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        _run(fixture, stream)
+        current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "fixture": path.name,
+        "model_calls": len(fixture["model_calls"]),
+        "tool_calls": len(fixture["tool_calls"]),
+        "loop_ms": (wall - serialize) / iterations * 1000,
+        "serialize_ms": serialize / iterations * 1000,
+        "peak_kib": (peak - baseline) / 1024,
+        "retained_kib": (current - baseline) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=[str(_DEFAULT_CORPUS)])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--stream", action="store_true", help="replay through the streaming loop")
+    args = parser.parse_args()
+
+    # The agent's debug prints still run (they are part of the per-turn cost) but go nowhere
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rows = [_measure(path, args.iterations, args.stream) for path in _fixture_paths(args.targets)]
+    if not rows:
+        raise SystemExit("No fixtures found.")
+
+    header = f"{'fixture':<32}{'calls':>8}{'loop':>12}{'serialize':>12}{'peak':>12}{'retained':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['fixture'][:31]:<32}"
+            f"{r['model_calls']:>3}m/{r['tool_calls']:<3}t"
+            f"{r['loop_ms']:>9.2f} ms"
+            f"{r['serialize_ms']:>9.2f} ms"
+            f"{r['peak_kib']:>8.0f} KiB"
+            f"{r['retained_kib']:>8.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
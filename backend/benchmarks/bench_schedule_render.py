@@ -0,0 +1,109 @@
+"""
+Schedule image renderers: renders per second and output size.
+
+Run from backend/:
+
+    python -m benchmarks.bench_schedule_render [--courses N] [--seconds S] [--concurrency C]
+
+Renders a synthetic week of N courses (each meeting two or three days) with
+every format `render_schedule` supports, with the render cache bypassed and
+after one warm-up render each, so imports and font loading are not counted:
+
+- svg: hand-placed SVG markup
+- png: the same layout drawn with Pillow
+- matplotlib: the original `generate_schedule_png` figure at 200 dpi
+
+The last row is a repeat of the same schedule served from the in-memory
+render cache (hashing the section set and looking up the key).
+
+With --concurrency C, C threads render at once (as C simultaneous requests
+would), first in the request threads and then on the `render_pool` worker
+processes, so the rows show how raster throughput scales with cores.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import render_pool
+from app.services.schedule_render import FORMATS, render_schedule
+
+_DAYS = ["MWF", "TR", "MW", "TR", "F"]
+_NAMES = ["Ada Lovelace", "Alan Turing", "Grace Hopper", "Edsger Dijkstra", "Barbara Liskov"]
+
+
+def _courses(count):
+    courses = []
+    for i in range(count):
+        start = 800 + (i * 130) % 900
+        courses.append({
+            "catalog": {"course_code": f"CSCE {300 + i * 11}"},
+            "section": {
+                "sectionNumber": f"{i + 1:03d}",
+                "instructor": [{"name": _NAMES[i % len(_NAMES)]}],
+                "meetings": [{
+                    "daysRaw": _DAYS[i % len(_DAYS)],
+                    "startTime": start,
+                    "endTime": start + 115,
+                    "buildingCode": "AVH",
+                    "room": str(100 + i),
+                }],
+            },
+        })
+    return courses
+
+
+def _measure(fmt, courses, seconds, cache=False, label=None, concurrency=1):
+    image = render_schedule(courses, fmt, cache=cache)  # warm-up
+
+    def loop(start):
+        renders = 0
+        while time.perf_counter() - start < seconds:
+            render_schedule(courses, fmt, cache=cache)
+            renders += 1
+        return renders
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        renders = sum(threads.map(loop, [start] * concurrency))
+    elapsed = time.perf_counter() - start
+    return {"format": label or fmt, "per_sec": renders / elapsed, "ms": elapsed / renders * 1000, "bytes": len(image.data)}
+
+
+def _concurrent_rows(courses, seconds, concurrency):
+    rows = []
+    for workers, where in ((0, "threads"), (render_pool.WORKERS or 1, "pool")):
+        render_pool.shutdown()
+        render_pool.WORKERS = workers
+        for future in render_pool.start():
+            future.result()
+        for fmt in ("png", "matplotlib"):
+            rows.append(_measure(fmt, courses, seconds, label=f"{fmt} x{concurrency} {where}", concurrency=concurrency))
+    render_pool.shutdown()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent rendering each format")
+    parser.add_argument("--concurrency", type=int, default=1, help="simultaneous renders (>1 compares threads with the worker pool)")
+    args = parser.parse_args()
+
+    courses = _courses(args.courses)
+    if args.concurrency > 1:
+        rows = _concurrent_rows(courses, args.seconds, args.concurrency)
+    else:
+        rows = [_measure(fmt, courses, args.seconds) for fmt in FORMATS]
+        rows.append(_measure("png", courses, args.seconds, cache=True, label="png cached"))
+    render_pool.shutdown()
+
+    width = max(12, max(len(r["format"]) for r in rows) + 2)
+    header = f"{'format':<{width}}{'renders/s':>12}{'per render':>14}{'bytes':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['format']:<{width}}{r['per_sec']:>12.1f}{r['ms']:>11.2f} ms{r['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Application cold-start time.
+
+Run from backend/:
+
+    python -m benchmarks.bench_startup [--runs N]
+
+Each run is a fresh interpreter, like a server restart. Reported per phase
+(median over runs):
+
+- import: `from app import create_app`
+- create_app: building the Flask app and registering every blueprint
+- warm: `app.warm()`, the agent runtime and matplotlib loaded up front
+  (what a `--preload` parent pays once; otherwise the first requests pay it)
+
+It also lists which heavy dependencies `create_app()` imported, which should
+be none of them.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_HEAVY_MODULES = ("google.genai", "matplotlib", "agents", "app.agent.agent")
+
+_PROBE = f"""
+import contextlib, io, json, sys, time
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import create_app, warm
+    imported = time.perf_counter()
+    create_app()
+    created = time.perf_counter()
+    loaded = [m for m in {_HEAVY_MODULES!r} if m in sys.modules]
+    warm()
+    warmed = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "create_app": created - imported,
+    "warm": warmed - created,
+    "loaded": loaded,
+}}))
+"""
+
+
+def _run_once():
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "bench")}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [_run_once() for _ in range(args.runs)]
+    header = f"{'phase':<16}{'median':>12}{'min':>12}{'max':>12}"
+    print(header)
+    print("-" * len(header))
+    for phase in ("import", "create_app", "warm"):
+        values = [r[phase] * 1000 for r in runs]
+        print(f"{phase:<16}{statistics.median(values):>9.0f} ms{min(values):>9.0f} ms{max(values):>9.0f} ms")
+    cold = [(r["import"] + r["create_app"]) * 1000 for r in runs]
+    print(f"{'cold start':<16}{statistics.median(cold):>9.0f} ms")
+
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    print(f"heavy modules loaded by create_app(): {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
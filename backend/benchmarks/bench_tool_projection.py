@@ -0,0 +1,131 @@
+"""
+Bytes and tokens per tool response, before and after projection.
+
+Run from backend/:
+
+    python -m benchmarks.bench_tool_projection
+
+Payloads are synthetic but shaped like real `get_course_info`, `search_courses`
+and `get_professor_summary` results, so no network access is needed. Tokens are
+estimated at ~4 characters each.
+"""
+import json
+import time
+
+from app.agent.tools.projection import project_tool_output
+from app.services.unl import STANDARD_FIELDS
+
+
+def _section(number, instructor, days, start, end, room):
+    meeting = {
+        "days": days,
+        "daysRaw": days,
+        "startTime": start,
+        "endTime": end,
+        "location": f"AVH {room}",
+        "buildingCode": "AVH",
+        "room": str(room),
+    }
+    return {
+        "sectionNumber": number,
+        "openSeats": 12,
+        "location": f"AVH {room}",
+        "days": days,
+        "startTime": start,
+        "endTime": end,
+        "name": "PRGRM LANG CONCEPTS",
+        "credits": "3",
+        "component": "LEC",
+        "waitlistOpen": False,
+        "instructor": [{"name": instructor, "email": f"{instructor.split()[-1].lower()}@unl.edu"}],
+        "meetings": [meeting],
+    }
+
+
+def course_info_payload():
+    catalog = {field: "" for field in STANDARD_FIELDS}
+    catalog.update({
+        "course_code": "CSCE 322",
+        "course_title": "Programming Language Concepts",
+        "Prerequisites": "CSCE 310 or CSCE 310H.",
+        "Description": "Formal syntax and semantics of programming languages. " * 4,
+        "Credit Hours": "3",
+        "min_hours": 3.0,
+        "max_hours": 3.0,
+        "Offered": ["FALL", "SPR"],
+        "Grading Option": "Graded with Option",
+    })
+    sections = [
+        _section("001", "Qing Hui", "MWF", 930, 1020, 106),
+        _section("002", "Qing Hui", "TR", 1100, 1215, 110),
+        _section("003", "Witawas Srisa-an", "MWF", 1330, 1420, 106),
+        _section("004", "Witawas Srisa-an", "TR", 1530, 1645, 19),
+        _section("150", "Qing Hui", "M", 1730, 2000, 112),
+    ]
+    return {
+        "found": True,
+        "data": {"catalog": catalog, "registration_blocks": {"sections": sections}},
+        "message": "Course data retrieved successfully.",
+    }
+
+
+def search_payload():
+    courses = [
+        {"course_code": f"CSCE {n}", "course_title": f"Course {n}", "Description": "An introduction. " * 5}
+        for n in range(101, 131)
+    ]
+    return {"found": True, "data": {"courses": courses}, "message": "Found 30 course(s) matching 'CSCE'."}
+
+
+def professor_payload():
+    return {
+        "name": "Qing Hui",
+        "department": "Computer Science",
+        "rating": 4.2,
+        "difficulty": 3.1,
+        "num_ratings": 42,
+        "would_take_again": None,
+    }
+
+
+def _measure(name, payload, iterations=2000):
+    before = json.dumps(payload)
+    after = json.dumps(project_tool_output(name, payload))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        project_tool_output(name, payload)
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return {
+        "tool": name,
+        "bytes_before": len(before),
+        "bytes_after": len(after),
+        "tokens_before": len(before) // 4,
+        "tokens_after": len(after) // 4,
+        "reduction": 1 - len(after) / len(before),
+        "projection_us": per_call_us,
+    }
+
+
+def main():
+    rows = [
+        _measure("get_course_info", course_info_payload()),
+        _measure("search_courses", search_payload()),
+        _measure("get_professor_summary", professor_payload()),
+    ]
+    header = f"{'tool':<24}{'bytes':>16}{'~tokens':>16}{'saved':>8}{'cost':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['tool']:<24}"
+            f"{r['bytes_before']:>7} -> {r['bytes_after']:<6}"
+            f"{r['tokens_before']:>7} -> {r['tokens_after']:<6}"
+            f"{r['reduction']:>8.0%}"
+            f"{r['projection_us']:>9.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# Picked up by `gunicorn` when run from `backend/`.
+
+
+def post_fork(server, worker):
+    """Start each worker's render processes; a `--preload` parent never renders."""
+    from app.services import render_pool
+
+    render_pool.start()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app.agent import agent
+from app.agent.async_agent import run_academic_advisor_agent_async
+from app.agent.replay import ReplayError, load_fixture, record_turn, replay, replay_turn
+from app.asgi import create_asgi_app
+
+FIXTURE = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures" / "agent" / "csce322_professor.json"
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+@pytest.fixture()
+def fixture():
+    return load_fixture(FIXTURE)
+
+
+def test_replay_reproduces_recorded_reply(fixture):
+    assert replay_turn(fixture) == (fixture["reply"], fixture["chat"])
+    assert replay_turn(fixture, stream=True) == (fixture["reply"], fixture["chat"])
+
+
+def test_replay_serves_async_loop(fixture):
+    with replay(fixture) as client:
+        reply, _ = asyncio.run(run_academic_advisor_agent_async(
+            fixture["conversation"], cached_prefix=fixture["cached_prefix"]
+        ))
+    assert reply == fixture["reply"]
+    assert client.models.requests == len(fixture["model_calls"])
+
+
+def test_replay_restores_live_handlers(fixture):
+    handlers = dict(agent.TOOL_HANDLERS)
+    client = agent.genai_client
+    with replay(fixture):
+        assert agent.genai_client is not client
+    assert agent.TOOL_HANDLERS == handlers
+    assert agent.genai_client is client
+
+
+def test_unrecorded_tool_call_fails_loudly(fixture):
+    with replay(fixture):
+        with pytest.raises(ReplayError):
+            agent.TOOL_HANDLERS["get_course_info"]({"course_id": "CSCE 999"})
+
+
+def test_recording_round_trips(fixture, tmp_path):
+    with replay(fixture):
+        with record_turn(fixture["conversation"], cached_prefix=fixture["cached_prefix"], record_dir=str(tmp_path)) as recording:
+            reply, chat = agent.run_academic_advisor_agent(fixture["conversation"], cached_prefix=fixture["cached_prefix"])
+            path = recording.finish(reply, chat)
+
+    recorded = load_fixture(path)
+    assert recorded["model"] == fixture["model"]
+    assert len(recorded["model_calls"]) == len(fixture["model_calls"])
+    assert sorted(c["name"] for c in recorded["tool_calls"]) == sorted(c["name"] for c in fixture["tool_calls"])
+    assert replay_turn(recorded) == (fixture["reply"], fixture["chat"])
+
+
+def test_asgi_chat_records_turn(monkeypatch, tmp_path):
+    replies = [
+        _response(types.Part.from_function_call(name="get_course_info", args={"course_id": "CSCE 310"})),
+        _response(types.Part.from_text(text="Yes, it is.")),
+    ]
+
+    async def generate_content(model, contents, config):
+        return replies.pop(0)
+
+    monkeypatch.setenv("AGENT_RECORD_DIR", str(tmp_path))
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))))
+    for flag in ("_CONTEXT_CACHE_ENABLED", "_PREFETCH_ENABLED", "_ROUTING_ENABLED", "_RESPONSE_CACHE_ENABLED"):
+        monkeypatch.setattr(agent, flag, False)
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", lambda args: ({"found": True}, "**CSCE 310**"))
+
+    body = json.dumps({"conversation": [{"role": "user", "content": "Is CSCE 310 offered?"}]}).encode("utf-8")
+    received = [{"type": "http.request", "body": body}]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/agent/chat"}
+    asyncio.run(create_asgi_app()(scope, receive, send))
+    assert sent[0]["status"] == 200
+
+    [path] = tmp_path.glob("*.json")
+    recorded = load_fixture(path)
+    assert recorded["reply"] == "Yes, it is."
+    assert len(recorded["model_calls"]) == 2
+    assert [c["name"] for c in recorded["tool_calls"]] == ["get_course_info"]
+    assert replay_turn(recorded) == ("Yes, it is.", "**CSCE 310**")
@@ -0,0 +1,189 @@
+import gc
+import os
+import threading
+import time
+
+from google.genai import types
+
+from app import create_app
+from app.agent import agent
+from app.agent.sessions import SessionStore
+from app.routes import agent as agent_routes
+
+
+def _history(text):
+    return [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
+
+
+def test_lru_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    first = store.create(_history("one"))
+    second = store.create(_history("two"))
+
+    # Touch the first session so the second becomes the eviction candidate
+    assert store.get(first.session_id) is first
+    store.create(_history("three"))
+
+    assert len(store) == 2
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) is first
+
+
+def test_evicted_sessions_spill_to_disk_and_reload(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path)
+    first = store.create(_history("what should I take next?"))
+    first.history.append(types.Content(role="model", parts=[types.Part.from_text(text="CSCE 322!")]))
+    store.put(first)
+
+    store.create(_history("another student"))
+    assert (tmp_path / f"{first.session_id}.json").exists()
+
+    reloaded = store.get(first.session_id)
+    assert reloaded is not None
+    assert [c.parts[0].text for c in reloaded.history] == ["what should I take next?", "CSCE 322!"]
+    # Reloading re-admits the session to memory and drops the spill file
+    assert not (tmp_path / f"{first.session_id}.json").exists()
+
+
+def test_rejects_unknown_and_malformed_ids(tmp_path):
+    store = SessionStore(spill_dir=tmp_path)
+    assert store.get("../../etc/passwd") is None
+    assert store.get("0" * 32) is None
+    assert store.delete("not-a-session") is False
+
+
+def test_delete_removes_session():
+    store = SessionStore()
+    session = store.create(_history("hi"))
+    assert store.delete(session.session_id) is True
+    assert store.get(session.session_id) is None
+
+
+def test_concurrent_reloads_of_a_spilled_session_share_one_object(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path)
+    session_id = store.create(_history("hi")).session_id
+    store.create(_history("another student"))
+    gc.collect()
+
+    sessions = [None] * 8
+    barrier = threading.Barrier(len(sessions))
+
+    def worker(index):
+        barrier.wait()
+        sessions[index] = store.get(session_id)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(sessions))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sessions[0] is not None
+    assert all(session is sessions[0] for session in sessions)
+
+
+def test_spilled_session_still_in_use_is_not_reloaded_as_a_copy(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path)
+    first = store.create(_history("hi"))
+    store.create(_history("another student"))
+
+    assert store.get(first.session_id) is first
+
+
+def test_session_deleted_mid_turn_is_not_readmitted(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path)
+    session = store.create(_history("hi"))
+    assert store.delete(session.session_id) is True
+    store.put(session)
+    assert store.get(session.session_id) is None
+
+    # Also when the session was evicted to disk while its turn ran
+    session = store.create(_history("hi"))
+    store.create(_history("another student"))
+    assert store.delete(session.session_id) is True
+    store.put(session)
+    assert store.get(session.session_id) is None
+    assert not (tmp_path / f"{session.session_id}.json").exists()
+
+
+def test_chat_route_does_not_resurrect_a_session_deleted_mid_turn(monkeypatch):
+    monkeypatch.setattr(agent_routes, "_session_store", None)
+    client = create_app().test_client()
+    session_id = client.post("/api/agent/sessions", json={}).get_json()["session_id"]
+
+    def run_agent_turn(history, message, **kwargs):
+        agent_routes._session_store.delete(session_id)
+        return "Sure.", "Sure."
+
+    monkeypatch.setattr(agent, "run_agent_turn", run_agent_turn)
+
+    assert client.post(f"/api/agent/sessions/{session_id}/chat", json={"message": "hi"}).status_code == 200
+    assert client.post(f"/api/agent/sessions/{session_id}/chat", json={"message": "hi"}).status_code == 404
+
+
+def test_expired_and_excess_spill_files_are_removed(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path, spill_max_age_seconds=3600, spill_max_files=2)
+    ids = [store.create(_history(str(i))).session_id for i in range(5)]
+    gc.collect()
+    spilled = [tmp_path / f"{session_id}.json" for session_id in ids[:4]]
+    assert all(path.exists() for path in spilled)
+
+    now = time.time()
+    os.utime(spilled[0], (now - 7200, now - 7200))
+    for age, path in zip((30, 20, 10), spilled[1:]):
+        os.utime(path, (now - age, now - age))
+
+    # One expired, then the oldest of the three left
+    assert store.gc(now) == 2
+    assert [path.exists() for path in spilled] == [False, False, True, True]
+
+
+def test_expired_spill_file_is_not_reloaded(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path, spill_max_age_seconds=3600)
+    session_id = store.create(_history("hi")).session_id
+    store.create(_history("another student"))
+    gc.collect()
+
+    path = tmp_path / f"{session_id}.json"
+    old = time.time() - 7200
+    os.utime(path, (old, old))
+    assert store.get(session_id) is None
+    assert not path.exists()
+
+
+def test_lookups_do_not_wait_on_a_slow_spill(tmp_path, monkeypatch):
+    store = SessionStore(max_sessions=2, spill_dir=tmp_path)
+    store.create(_history("one"))
+    second = store.create(_history("two"))
+
+    writing, release = threading.Event(), threading.Event()
+    spill = store._spill
+
+    def slow_spill(session):
+        writing.set()
+        release.wait(5)
+        spill(session)
+
+    monkeypatch.setattr(store, "_spill", slow_spill)
+    evicting = threading.Thread(target=store.create, args=(_history("three"),))
+    evicting.start()
+    try:
+        assert writing.wait(5)
+        started = time.perf_counter()
+        assert store.get(second.session_id) is second
+        assert len(store) == 2
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        evicting.join()
+
+
+def test_session_readmitted_mid_turn_drops_its_stale_spill(tmp_path):
+    store = SessionStore(max_sessions=1, spill_dir=tmp_path)
+    session = store.create(_history("hi"))
+    store.create(_history("another student"))
+    assert (tmp_path / f"{session.session_id}.json").exists()
+
+    session.history.append(types.Content(role="model", parts=[types.Part.from_text(text="hello")]))
+    store.put(session)
+    assert not (tmp_path / f"{session.session_id}.json").exists()
@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app import create_app
+from app.agent import agent
+
+
+def _chunk(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _text(text):
+    return types.Part.from_text(text=text)
+
+
+def _events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        name_line, data_line = block.split("\n")
+        event = json.loads(data_line.removeprefix("data: "))
+        assert name_line == f"event: {event['type']}"
+        events.append(event)
+    return events
+
+
+@pytest.fixture()
+def streams(monkeypatch):
+    """Each model call streams the next scripted list of chunks (or raises it)."""
+    scripted = []
+
+    def generate_content_stream(model, contents, config):
+        step = scripted.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return iter(step)
+
+    client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+    monkeypatch.setattr(agent, "genai_client", client)
+    for flag in ("_CONTEXT_CACHE_ENABLED", "_PREFETCH_ENABLED", "_ROUTING_ENABLED", "_RESPONSE_CACHE_ENABLED"):
+        monkeypatch.setattr(agent, flag, False)
+    monkeypatch.setitem(
+        agent.TOOL_HANDLERS, "get_course_info", lambda args: ({"found": True}, "**CSCE 310 Course Sections:**")
+    )
+    return scripted
+
+
+@pytest.fixture()
+def client():
+    app = create_app()
+    app.config.update({"TESTING": True})
+    with app.test_client() as client:
+        yield client
+
+
+def _ask(client, text="Is CSCE 310 offered?"):
+    return client.post("/api/agent/chat/stream", json={"conversation": [{"role": "user", "content": text}]})
+
+
+def test_stream_emits_text_tool_and_done_events_in_order(client, streams):
+    streams.append([
+        _chunk(_text("Let me ")),
+        _chunk(_text("check. "), types.Part.from_function_call(name="get_course_info", args={"course_id": "CSCE 310"})),
+    ])
+    streams.append([_chunk(_text("Yes, ")), _chunk(_text("it is."))])
+
+    response = _ask(client)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["X-Accel-Buffering"] == "no"
+
+    events = _events(response)
+    assert [e["type"] for e in events] == [
+        "text", "text", "tool_call_start", "tool_call", "chat", "text", "text", "done",
+    ]
+    assert [e["delta"] for e in events if e["type"] == "text"] == ["Let me ", "check. ", "Yes, ", "it is."]
+    assert events[2] == {"type": "tool_call_start", "name": "get_course_info", "args": {"course_id": "CSCE 310"}}
+    assert events[4]["markdown"] == "**CSCE 310 Course Sections:**"
+    assert events[-1]["reply"] == "Yes, it is."
+
+
+def test_stream_reports_errors_in_band(client, streams):
+    streams.append([_chunk(_text("Let me ")), _chunk(types.Part.from_function_call(name="get_course_info", args={}))])
+    streams.append(RuntimeError("model unavailable"))
+
+    response = _ask(client)
+    assert response.status_code == 200
+    events = _events(response)
+    assert [e["type"] for e in events][:1] == ["text"]
+    assert events[-1] == {"type": "error", "error": "model unavailable"}
+
+
+def test_stream_rejects_bad_requests(client):
+    assert client.post("/api/agent/chat/stream", data="nope").status_code == 400
+    assert client.post("/api/agent/chat/stream", json={"conversation": "hi"}).status_code == 400
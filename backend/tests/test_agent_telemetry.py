@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app import create_app
+from app.agent import agent, telemetry
+
+
+def _response(*parts, prompt_tokens=100, output_tokens=10):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens, candidates_token_count=output_tokens
+        ),
+    )
+
+
+def _cached_tool(args):
+    telemetry.record_cache(hit=args["course_id"] == "CSCE 310")
+    with telemetry.upstream():
+        pass
+    return {"found": True}, None
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    replies = [
+        _response(
+            types.Part.from_function_call(name="get_course_info", args={"course_id": "CSCE 310"}),
+            types.Part.from_function_call(name="get_course_info", args={"course_id": "CSCE 361"}),
+        ),
+        _response(types.Part.from_text(text="Both are offered."), prompt_tokens=250, output_tokens=5),
+    ]
+    models = SimpleNamespace(generate_content=lambda model, contents, config: replies.pop(0))
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=models))
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", False)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", _cached_tool)
+    telemetry.METRICS.reset()
+
+    app = create_app()
+    app.config.update({"TESTING": True})
+    with app.test_client() as client:
+        yield client
+
+
+def test_chat_returns_timings_when_requested(client):
+    resp = client.post("/api/agent/chat", json={
+        "conversation": [{"role": "user", "content": "Are 310 and 361 offered?"}],
+        "timings": True,
+    })
+    assert resp.status_code == 200
+    timings = resp.get_json()["timings"]
+
+    assert [call["input_tokens"] for call in timings["model_calls"]] == [100, 250]
+    assert [call["output_tokens"] for call in timings["model_calls"]] == [10, 5]
+    assert all(call["ttfb_ms"] is not None for call in timings["model_calls"])
+    # Tool calls ran on worker threads; their spans still reach the trace
+    assert sorted(call["cache"] for call in timings["tool_calls"]) == ["hit", "miss"]
+    assert timings["total_ms"] >= timings["model_ms"]
+
+
+def test_metrics_aggregate_turns(client):
+    client.post("/api/agent/chat", json={"conversation": [{"role": "user", "content": "hi"}]})
+
+    metrics = client.get("/api/agent/metrics").get_json()
+    assert metrics["turns"]["count"] == 1
+    assert metrics["models"][0]["calls"] == 2
+    assert metrics["models"][0]["input_tokens"] == 350
+    assert metrics["tools"]["get_course_info"]["cache_hits"] == 1
+    assert metrics["tools"]["get_course_info"]["cache_misses"] == 1
+    assert "compactions" in metrics["compaction"]
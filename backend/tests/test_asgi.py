@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from app.asgi import create_asgi_app
+
+
+async def _get(app, path):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "http_version": "1.1", "headers": []}
+    await app(scope, receive, send)
+    return sent[0]["status"], b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def test_flask_routes_are_served_concurrently():
+    app = create_asgi_app()
+    app.flask_app.add_url_rule("/slow", "slow", lambda: time.sleep(0.5) or "done")
+
+    async def main():
+        return await asyncio.gather(*(_get(app, "/slow") for _ in range(4)))
+
+    started = time.perf_counter()
+    responses = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+
+    assert responses == [(200, b"done")] * 4
+    # One at a time would take 2 s
+    assert elapsed < 1.5
@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.genai import types
+
+from app.agent import agent
+from app.agent import async_agent
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def test_async_loop_runs_tools_and_returns_reply(monkeypatch):
+    replies = [
+        _response(
+            types.Part.from_function_call(name="get_remaining_graduation_requirements", args={}),
+            types.Part.from_function_call(name="get_course_info", args={"course_id": "CSCE 310"}),
+        ),
+        _response(types.Part.from_text(text="You still need CSCE 310.")),
+    ]
+    seen = []
+
+    async def generate_content(model, contents, config):
+        seen.append(list(contents))
+        return replies.pop(0)
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))))
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", False)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", lambda args: ({"found": True, "course_id": args["course_id"]}, "**CSCE 310**"))
+
+    events = []
+    reply, chat = asyncio.run(async_agent.run_academic_advisor_agent_async(
+        [{"role": "user", "parts": ["What do I have left?"]}], tool_events=events
+    ))
+
+    assert reply == "You still need CSCE 310."
+    assert chat == "**CSCE 310**"
+    assert [e["name"] for e in events] == ["get_remaining_graduation_requirements", "get_course_info"]
+    # Both tool responses go back to the model in one function message
+    function_turn = seen[1][-1]
+    assert function_turn.role == "function"
+    assert len(function_turn.parts) == 2
@@ -0,0 +1,56 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from app.agent import batch_eval
+
+_FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+
+def test_corpus_mixes_scripted_conversations_and_fixtures(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('{"id": "hello", "messages": ["Hi!", "Thanks"]}\n\n{"messages": ["What is CSCE 310?"]}\n')
+
+    entries = batch_eval.load_corpus([corpus, _FIXTURES / "agent"])
+
+    assert [(entry["id"], entry["kind"]) for entry in entries] == [
+        ("hello", "scripted"),
+        ("corpus-3", "scripted"),
+        ("csce322_professor", "fixture"),
+    ]
+
+
+def test_corpus_rejects_conversations_without_messages(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('{"id": "empty", "messages": []}\n')
+
+    with pytest.raises(ValueError, match="corpus.jsonl:1"):
+        batch_eval.load_corpus([corpus])
+
+
+def test_rate_limiter_spaces_out_turns():
+    limiter = batch_eval.RateLimiter(rate=20)
+    started = time.perf_counter()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.perf_counter() - started >= 0.14
+
+
+def test_batch_runs_offline_on_a_process_pool(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('{"id": "hello", "messages": ["Hi!", "Thanks"]}\n')
+    output = tmp_path / "results.jsonl"
+
+    exit_code = batch_eval.main([str(corpus), str(_FIXTURES / "agent"), "--stub", "--workers", "2", "--output", str(output)])
+
+    assert exit_code == 0
+    results = {result["id"]: result for result in map(json.loads, output.read_text().splitlines())}
+    assert [turn["reply"] for turn in results["hello"]["turns"]] == [
+        "(stub reply to: Hi!)",
+        "(stub reply to: Thanks)",
+    ]
+    fixture = results["csce322_professor"]
+    assert fixture["matches_recording"] is True
+    assert fixture["tool_calls"] == 3
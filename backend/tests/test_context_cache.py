@@ -0,0 +1,170 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors, types
+
+from app.agent import agent, context_cache
+from app.agent.context_cache import ContextCache
+
+PREFIX = [
+    types.Content(role="user", parts=[types.Part.from_text(text="SYSTEM PROMPT")]),
+    types.Content(role="model", parts=[types.Part.from_text(text="Okay, let's start!")]),
+]
+TOOLS = [types.Tool(function_declarations=[types.FunctionDeclaration(name="get_course_info")])]
+
+
+class FakeCaches:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.fail_create = False
+        self.fail_update = False
+        self.configs = []
+
+    def create(self, model, config):
+        self.configs.append(config)
+        if self.fail_create:
+            raise RuntimeError("prefix below the minimum cacheable size")
+        self.created += 1
+        return SimpleNamespace(name=f"cachedContents/{self.created}")
+
+    def update(self, name, config):
+        self.configs.append(config)
+        if self.fail_update:
+            raise RuntimeError("not found")
+        self.updated += 1
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(context_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture()
+def caches():
+    return FakeCaches()
+
+
+def _get(cache, caches):
+    return cache.get(SimpleNamespace(caches=caches), "gemini-2.5-flash", PREFIX, TOOLS)
+
+
+def test_handle_is_reused_then_refreshed_before_it_expires(clock, caches):
+    cache = ContextCache(ttl_seconds=3600, refresh_margin_seconds=300)
+    key, name = _get(cache, caches)
+    assert _get(cache, caches) == (key, name)
+    assert (caches.created, caches.updated) == (1, 0)
+
+    clock[0] += 3400
+    assert _get(cache, caches) == (key, name)
+    assert (caches.created, caches.updated) == (1, 1)
+
+
+def test_failed_refresh_recreates_the_cache(clock, caches):
+    cache = ContextCache(ttl_seconds=3600, refresh_margin_seconds=300)
+    _, first = _get(cache, caches)
+
+    caches.fail_update = True
+    clock[0] += 3400
+    _, second = _get(cache, caches)
+    assert second != first and caches.created == 2
+
+
+def test_creation_failure_backs_off_then_retries(clock, caches):
+    cache = ContextCache(retry_after_seconds=600)
+    caches.fail_create = True
+    assert _get(cache, caches) is None
+
+    # No new attempt (and no added latency) until the backoff has passed
+    caches.fail_create = False
+    clock[0] += 599
+    assert _get(cache, caches) is None
+    assert caches.created == 0
+
+    clock[0] += 2
+    assert _get(cache, caches) is not None
+    assert caches.created == 1
+
+
+def test_create_and_refresh_are_bounded_by_the_timeout(clock, caches):
+    cache = ContextCache(ttl_seconds=3600, refresh_margin_seconds=300)
+    client = SimpleNamespace(caches=caches)
+    assert cache.get(client, "gemini-2.5-flash", PREFIX, TOOLS, timeout=2.5) is not None
+
+    clock[0] += 3400
+    assert cache.get(client, "gemini-2.5-flash", PREFIX, TOOLS, timeout=0.75) is not None
+    assert [config.http_options.timeout for config in caches.configs] == [2500, 750]
+
+
+@pytest.fixture()
+def model_calls(monkeypatch, caches):
+    """The agent's model client, recording what each request sent."""
+    state = SimpleNamespace(calls=[], rejected=[], error=(403, "PERMISSION_DENIED"))
+
+    def generate_content(model, contents, config):
+        state.calls.append((list(contents), config.cached_content))
+        if config.cached_content and config.cached_content in state.rejected:
+            code, status = state.error
+            raise errors.ClientError(code, {"error": {"message": "cache gone", "status": status}})
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part.from_text(text="Hi!")]))]
+        )
+
+    client = SimpleNamespace(caches=caches, models=SimpleNamespace(generate_content=generate_content))
+    monkeypatch.setattr(agent, "genai_client", client)
+    monkeypatch.setattr(agent, "_context_cache", ContextCache())
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", True)
+    for flag in ("_PREFETCH_ENABLED", "_ROUTING_ENABLED", "_RESPONSE_CACHE_ENABLED"):
+        monkeypatch.setattr(agent, flag, False)
+    return state
+
+
+def _chat():
+    conversation = [
+        {"role": "user", "parts": ["SYSTEM PROMPT"]},
+        {"role": "model", "parts": ["Okay, let's start!"]},
+        {"role": "user", "parts": ["hello"]},
+    ]
+    return agent.run_academic_advisor_agent(conversation, cached_prefix=2)[0]
+
+
+def test_agent_sends_only_the_suffix_with_a_cache(model_calls):
+    assert _chat() == "Hi!"
+    contents, cached_content = model_calls.calls[-1]
+    assert cached_content == "cachedContents/1"
+    assert [c.parts[0].text for c in contents] == ["hello"]
+
+
+def test_agent_sends_full_requests_when_no_cache_can_be_created(model_calls, caches):
+    caches.fail_create = True
+    assert _chat() == "Hi!"
+    contents, cached_content = model_calls.calls[-1]
+    assert cached_content is None and len(contents) == 3
+
+
+def test_agent_resends_in_full_when_the_cache_is_rejected(model_calls):
+    model_calls.rejected.append("cachedContents/1")
+    assert _chat() == "Hi!"
+    assert [(len(c), name) for c, name in model_calls.calls] == [(1, "cachedContents/1"), (3, None)]
+    # The rejected handle is dropped, so the next call creates a new cache
+    assert agent._context_cache._handles == {}
+
+
+def test_agent_keeps_the_cache_on_other_client_errors(model_calls):
+    model_calls.rejected.append("cachedContents/1")
+    model_calls.error = (429, "RESOURCE_EXHAUSTED")
+    with pytest.raises(errors.ClientError):
+        _chat()
+
+    # Not resent in full straight away, and the handle still stands
+    assert [(len(c), name) for c, name in model_calls.calls] == [(1, "cachedContents/1")]
+    assert list(agent._context_cache._handles.values())[0][0] == "cachedContents/1"
+
+
+def test_agent_bounds_cache_creation_by_the_turn_deadline(model_calls, caches, monkeypatch):
+    monkeypatch.setattr(agent, "_TURN_DEADLINE_SECONDS", 30)
+    monkeypatch.setattr(agent, "_FINAL_ANSWER_RESERVE_SECONDS", 8)
+    assert _chat() == "Hi!"
+    assert 20000 < caches.configs[0].http_options.timeout <= 22000
@@ -0,0 +1,126 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app.agent import agent
+from app.services import deadline
+from app.services.singleflight import SingleFlight
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _text(text):
+    return _response(types.Part.from_text(text=text))
+
+
+def _call(name, **args):
+    return _response(types.Part.from_function_call(name=name, args=args))
+
+
+def test_timeout_is_cut_to_the_time_left():
+    assert deadline.timeout(10) == 10
+    with deadline.within(0.5):
+        assert 0 < deadline.timeout(10) <= 0.5
+        assert deadline.timeout(0.1) == 0.1
+        # An inner, longer budget does not extend the outer one
+        with deadline.within(30):
+            assert deadline.timeout(10) <= 0.5
+    assert deadline.current() is None
+
+
+def test_timeout_raises_once_the_deadline_has_passed():
+    with deadline.within(0):
+        assert deadline.expired()
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.timeout(10)
+
+
+def test_singleflight_follower_stops_waiting_at_its_timeout():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    leader = threading.Thread(target=lambda: flight.do("key", slow))
+    leader.start()
+    started.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            flight.do("key", lambda: "unused", timeout=0.05)
+    finally:
+        release.set()
+        leader.join()
+
+
+@pytest.fixture()
+def scripted(monkeypatch):
+    """Serve scripted model responses and record the config of each call."""
+    configs = []
+    script = []
+
+    def generate_content(model, contents, config):
+        configs.append(config)
+        return script.pop(0)
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", False)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_TURN_DEADLINE_SECONDS", 1.0)
+    monkeypatch.setattr(agent, "_FINAL_ANSWER_RESERVE_SECONDS", 0.5)
+    return script, configs
+
+
+def test_model_calls_carry_the_remaining_budget(scripted):
+    script, configs = scripted
+    script.append(_text("Hello!"))
+
+    agent.run_academic_advisor_agent([{"role": "user", "parts": ["hi"]}])
+
+    # At most the turn's 1 s minus the 0.5 s final-answer reserve
+    assert 0 < configs[0].http_options.timeout <= 500
+
+
+def test_slow_tool_forces_a_final_answer_without_tools(scripted, monkeypatch):
+    script, configs = scripted
+    script.extend([_call("get_course_info", course_id="CSCE 310"), _text("CSCE 310 is offered in the spring.")])
+
+    def slow_tool(args):
+        time.sleep(0.6)
+        return {"found": True}, None
+
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", slow_tool)
+    events = []
+    reply, _ = agent.run_academic_advisor_agent(
+        [{"role": "user", "parts": ["Is CSCE 310 offered?"]}], tool_events=events
+    )
+
+    assert reply == "CSCE 310 is offered in the spring."
+    assert configs[-1].tool_config.function_calling_config.mode == types.FunctionCallingConfigMode.NONE
+    assert [event["type"] for event in events] == ["tool_call", "deadline"]
+    assert not agent._cacheable(events)
+
+
+def test_tool_timeout_is_reported_to_the_model(scripted, monkeypatch):
+    script, _ = scripted
+    script.extend([_call("get_professor_summary", professor_name="Ada"), _text("RMP is slow right now.")])
+
+    def timing_out(args):
+        raise TimeoutError("RateMyProfessors did not respond in time.")
+
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_professor_summary", timing_out)
+    events = []
+    agent.run_academic_advisor_agent([{"role": "user", "parts": ["Is Ada a good professor?"]}], tool_events=events)
+
+    assert events[0]["output"]["timed_out"] is True
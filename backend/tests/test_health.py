@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 import pytest
 from app import create_app
 
@@ -17,3 +19,33 @@ def test_health_ok(client):
     resp = client.get("/api/health")
     assert resp.status_code == 200
     assert resp.get_json() == {"status": "ok"}
+
+
+def test_create_app_defers_heavy_imports():
+    # A fresh interpreter: the test session has already imported everything
+    probe = (
+        "import sys\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "print(sorted(m for m in ('google.genai', 'matplotlib', 'agents') if m in sys.modules))\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "GEMINI_API_KEY")}
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_warm_leaves_render_workers_to_the_serving_process(monkeypatch):
+    from app import warm
+    from app.services import render_pool
+
+    started = []
+    monkeypatch.setattr(render_pool, "start", lambda: started.append(os.getpid()))
+    warm()
+    assert started == []
@@ -0,0 +1,94 @@
+from google.genai import types
+
+from app.agent.compaction import HistoryCompactor, estimate_tokens
+
+
+def _user(text):
+    return types.Content(role="user", parts=[types.Part.from_text(text=text)])
+
+
+def _model(text):
+    return types.Content(role="model", parts=[types.Part.from_text(text=text)])
+
+
+def _course_turn(course_id):
+    sections = [{"sectionNumber": f"{i:03d}", "instructor": [{"name": "Qing Hui"}], "notes": "x" * 80} for i in range(6)]
+    output = {
+        "found": True,
+        "data": {
+            "catalog": {"course_code": course_id, "course_title": "PRGRM LANG CONCEPTS"},
+            "registration_blocks": {"sections": sections},
+        },
+        "message": "Course data retrieved successfully.",
+    }
+    return [
+        _user(f"Tell me about {course_id}"),
+        types.Content(role="model", parts=[types.Part.from_function_call(name="get_course_info", args={"course_id": course_id})]),
+        types.Content(role="function", parts=[types.Part.from_function_response(name="get_course_info", response={"output": output})]),
+        _model(f"{course_id} has six sections."),
+    ]
+
+
+def _conversation(turns):
+    conversation = [_user("SYSTEM PROMPT"), _model("Okay, let's start!")]
+    for i in range(turns):
+        conversation += _course_turn(f"CSCE {300 + i}")
+    conversation.append(_user("Which one should I take?"))
+    return conversation
+
+
+def test_below_trigger_leaves_history_alone():
+    conversation = _conversation(2)
+    before = [c.model_dump() for c in conversation]
+    compactor = HistoryCompactor(trigger_tokens=10**6)
+    assert compactor.maybe_compact(conversation, start=2) == 0
+    assert [c.model_dump() for c in conversation] == before
+
+
+def test_consumed_tool_responses_are_digested():
+    conversation = _conversation(2)
+    compactor = HistoryCompactor(trigger_tokens=0, token_budget=10**6)
+    before = estimate_tokens(conversation)
+
+    saved = compactor.maybe_compact(conversation, start=2)
+
+    assert saved > 0
+    assert estimate_tokens(conversation) < before
+    response = conversation[4].parts[0].function_response.response
+    assert response["compacted"] is True
+    assert response["output"]["course"] == "CSCE 300 PRGRM LANG CONCEPTS"
+    assert response["output"]["sections_offered"] == 6
+    assert compactor.stats()["tool_responses_digested"] == 2
+
+
+def test_old_turns_are_summarized_past_budget():
+    conversation = _conversation(5)
+    compactor = HistoryCompactor(trigger_tokens=0, token_budget=0, keep_recent_turns=2)
+
+    compactor.maybe_compact(conversation, start=2)
+
+    # Preamble untouched, then the summary pair, then the two most recent turns
+    assert conversation[0].parts[0].text == "SYSTEM PROMPT"
+    summary = conversation[2].parts[0].text
+    assert summary.startswith("Summary of our earlier conversation:")
+    assert "Tell me about CSCE 300" in summary
+    assert "get_course_info" in summary
+    assert conversation[3].role == "model"
+    assert conversation[4].parts[0].text == "Tell me about CSCE 304"
+    assert conversation[-1].parts[0].text == "Which one should I take?"
+    assert compactor.stats()["turns_summarized"] == 4
+
+
+def test_repeated_summaries_fold_together():
+    conversation = _conversation(5)
+    compactor = HistoryCompactor(trigger_tokens=0, token_budget=0, keep_recent_turns=2)
+    compactor.maybe_compact(conversation, start=2)
+    conversation[-1:] = [_user("Which one should I take?"), _model("CSCE 304!")]
+    conversation += _course_turn("CSCE 400") + [_user("Thanks")]
+
+    compactor.maybe_compact(conversation, start=2)
+
+    summaries = [c for c in conversation if c.parts[0].text and c.parts[0].text.startswith("Summary of")]
+    assert len(summaries) == 1
+    assert "Tell me about CSCE 300" in summaries[0].parts[0].text
+    assert "Tell me about CSCE 304" in summaries[0].parts[0].text
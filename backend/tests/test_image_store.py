@@ -0,0 +1,161 @@
+import os
+import threading
+
+import pytest
+
+from app import create_app
+from app.agent.tools import generate_schedule_tool
+from app.routes import schedule as schedule_routes
+from app.services import render_jobs as render_jobs_module, schedule_render
+from app.services.image_store import ImageStore
+from app.services.render_jobs import RenderJobs
+from app.services.schedule_render import ScheduleImage
+
+_PNG = b"\x89PNG\r\n\x1a\nnot really a png"
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return ImageStore(tmp_path / "images", max_bytes=1024, max_age_seconds=3600, gc_interval_seconds=0)
+
+
+@pytest.fixture()
+def jobs(monkeypatch, store):
+    jobs = RenderJobs(store, max_workers=2)
+    monkeypatch.setattr(schedule_routes, "render_jobs", jobs)
+    return jobs
+
+
+@pytest.fixture()
+def gate(monkeypatch):
+    """Renders block until the test sets the event; `calls` counts them."""
+    release = threading.Event()
+    release.calls = 0
+
+    def render_schedule(courses, fmt, **size):
+        release.calls += 1
+        release.wait(5)
+        if not courses:
+            raise RuntimeError("nothing to draw")
+        return ScheduleImage(data=b"<svg/>", fmt=fmt, key="unused")
+
+    monkeypatch.setattr(render_jobs_module, "render_schedule", render_schedule)
+    return release
+
+
+@pytest.fixture()
+def client():
+    app = create_app()
+    app.config.update({"TESTING": True})
+    with app.test_client() as client:
+        yield client
+
+
+def test_same_bytes_are_stored_once(store):
+    first = store.put(_PNG, "png")
+    assert store.put(_PNG, "png") == first
+    assert first.endswith(".png")
+    assert [p.name for p in store.directory.iterdir()] == [first]
+    assert store.path(first).read_bytes() == _PNG
+
+    assert store.path("../../etc/passwd") is None
+    assert store.path("0" * 32 + ".png") is None
+    with pytest.raises(ValueError):
+        store.put(_PNG, "exe")
+
+
+def test_gc_applies_age_then_size_limits(store):
+    now = 1_000_000.0
+    old = store.put(b"<svg>old</svg>", "svg")
+    kept = [store.put(bytes([i]) * 400, "png") for i in range(3)]
+    os.utime(store.directory / old, (now - 7200, now - 7200))
+    for age, image_id in zip((30, 20, 10), kept):
+        os.utime(store.directory / image_id, (now - age, now - age))
+    (store.directory / "stray.tmp").write_bytes(b"x")
+    os.utime(store.directory / "stray.tmp", (now - 600, now - 600))
+
+    # The expired image and temp file go, then the oldest image until under 1 KiB
+    assert store.gc(now=now) == 3
+    assert sorted(p.name for p in store.directory.iterdir()) == sorted(kept[1:])
+
+
+def test_image_route_serves_immutable_files(store, jobs, client):
+    image_id = store.put(b"<svg xmlns='http://www.w3.org/2000/svg'/>", "svg")
+
+    response = client.get(f"/api/schedule/image/{image_id}")
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert "immutable" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    response.close()
+
+    assert client.get(f"/api/schedule/image/{image_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/schedule/image/" + "f" * 32 + ".png").status_code == 404
+    assert client.get("/api/schedule/image/nope.txt").status_code == 404
+
+
+_COURSE = {
+    "catalog": {"course_code": "CSCE 310"},
+    "section": {"sectionNumber": "001", "meetings": [{"daysRaw": "MWF", "startTime": 930, "endTime": 1020}]},
+}
+
+
+def test_render_job_is_linked_before_it_finishes(monkeypatch, store, jobs, gate, client):
+    monkeypatch.setattr(schedule_routes, "_IMAGE_WAIT_SECONDS", 0.05)
+
+    image_id = jobs.submit([_COURSE], "svg")
+    assert jobs.submit([_COURSE], "svg") == image_id
+    assert store.pending(image_id) and store.path(image_id) is None
+
+    still_rendering = client.get(f"/api/schedule/image/{image_id}")
+    assert still_rendering.status_code == 503
+    assert still_rendering.headers["Retry-After"] == "1"
+
+    gate.set()
+    assert jobs.wait(image_id, timeout=5).read_bytes() == b"<svg/>"
+    assert not store.pending(image_id)
+    assert client.get(f"/api/schedule/image/{image_id}").status_code == 200
+
+    # Stored images are not rendered again
+    assert jobs.submit([_COURSE], "svg") == image_id
+    assert gate.calls == 1
+
+
+def test_failed_render_is_reported(store, jobs, gate, client):
+    gate.set()
+    image_id = jobs.submit([], "svg")
+    with pytest.raises(RuntimeError, match="nothing to draw"):
+        jobs.wait(image_id, timeout=5)
+    assert client.get(f"/api/schedule/image/{image_id}").status_code == 500
+
+
+def test_wait_polls_a_render_in_another_process(store, jobs):
+    image_id = "a" * 32 + ".svg"
+    store.reserve(image_id)
+
+    def other_process():
+        store.put(b"<svg/>", "svg", image_id=image_id)
+        store.release(image_id)
+
+    threading.Timer(0.2, other_process).start()
+    assert jobs.wait(image_id, timeout=5) == store.path(image_id)
+    assert jobs.wait("b" * 32 + ".svg", timeout=5) is None
+
+
+def test_generate_schedule_tool_renders_the_requested_format(monkeypatch, jobs, gate):
+    course_info = {
+        "found": True,
+        "data": {"catalog": dict(_COURSE["catalog"]), "registration_blocks": {"sections": [_COURSE["section"]]}},
+    }
+    monkeypatch.setattr(generate_schedule_tool, "render_jobs", jobs)
+    monkeypatch.setattr(generate_schedule_tool, "_handle_get_course_info", lambda payload: (course_info, None))
+    monkeypatch.setattr(schedule_render, "DEFAULT_FORMAT", "svg")
+    handler = generate_schedule_tool.TOOL_HANDLERS["generate_schedule"]
+    courses = [{"course_id": "CSCE 310", "section_id": "001"}]
+    gate.set()
+
+    result, markdown = handler({"courses": courses, "format": "png"})
+    assert result["success"] and markdown.endswith(".png)")
+    assert handler({"courses": courses})[1].endswith(".svg)")
+    with pytest.raises(ValueError):
+        handler({"courses": courses, "format": "gif"})
@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app.agent import agent, telemetry
+from app.agent.routing import ModelRouter
+
+
+def _user(text):
+    return types.Content(role="user", parts=[types.Part.from_text(text=text)])
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _text(text):
+    return _response(types.Part.from_text(text=text))
+
+
+def _call(name, **args):
+    return _response(types.Part.from_function_call(name=name, args=args))
+
+
+@pytest.mark.parametrize("message, tier", [
+    ("hi there!", "fast"),
+    ("Thanks, that's all for today", "fast"),
+    ("What should I take next semester?", "full"),
+    ("Is CSCE 310 hard?", "full"),
+    ("Who teaches programming languages?", "full"),
+])
+def test_router_tiers_user_messages(message, tier):
+    router = ModelRouter(fast_model="fast-model")
+    assert router.route([_user(message)], full_model="full-model")[1] == tier
+
+
+def test_router_sends_tool_results_to_fast_tier():
+    router = ModelRouter(fast_model="fast-model")
+    function_turn = types.Content(role="function", parts=[
+        types.Part.from_function_response(name="get_course_info", response={"output": {"found": True}}),
+    ])
+    assert router.route([_user("Is CSCE 310 offered?"), function_turn], full_model="full-model") == ("fast-model", "fast")
+
+
+@pytest.fixture()
+def scripted(monkeypatch):
+    """Serve scripted responses per model and record which model got each call."""
+    calls = []
+    scripts = {}
+
+    def generate_content(model, contents, config):
+        calls.append(model)
+        return scripts[model].pop(0)
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", True)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_router", ModelRouter(fast_model="fast-model"))
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", lambda args: ({"found": True}, None))
+    return scripts, calls
+
+
+def test_chit_chat_stays_on_fast_tier(scripted):
+    scripts, calls = scripted
+    scripts["fast-model"] = [_text("Hi! Ready to plan?")]
+
+    reply, _ = agent.run_academic_advisor_agent([{"role": "user", "parts": ["hello!"]}], model="full-model")
+
+    assert reply == "Hi! Ready to plan?"
+    assert calls == ["fast-model"]
+
+
+def test_planning_uses_full_tier_then_fast_tier_phrases(scripted):
+    scripts, calls = scripted
+    scripts["full-model"] = [_call("get_course_info", course_id="CSCE 310")]
+    scripts["fast-model"] = [_text("CSCE 310 is offered.")]
+
+    with telemetry.trace_turn() as trace:
+        reply, _ = agent.run_academic_advisor_agent([{"role": "user", "parts": ["Is CSCE 310 offered?"]}], model="full-model")
+
+    assert reply == "CSCE 310 is offered."
+    assert calls == ["full-model", "fast-model"]
+    assert [span["tier"] for span in trace.to_dict()["model_calls"]] == ["full", "fast"]
+
+
+def test_fast_tier_tool_call_escalates(scripted):
+    scripts, calls = scripted
+    scripts["fast-model"] = [_call("get_course_info", course_id="CSCE 310")]
+    scripts["full-model"] = [_call("get_course_info", course_id="CSCE 310"), _text("Done.")]
+
+    agent.run_academic_advisor_agent([{"role": "user", "parts": ["hmm, any ideas?"]}], model="full-model")
+
+    # Once escalated, the turn stays on the full tier
+    assert calls == ["fast-model", "full-model", "full-model"]
+
+
+def test_router_keeps_escalated_turn_on_full_tier():
+    router = ModelRouter(fast_model="fast-model")
+    function_turn = types.Content(role="function", parts=[
+        types.Part.from_function_response(name="get_course_info", response={"output": {"found": True}}),
+    ])
+    conversation = [_user("Is CSCE 310 offered?"), function_turn]
+    assert router.route(conversation, full_model="full-model", escalated=True) == ("full-model", "full")
+
+
+def test_tool_chain_escalates_once_per_turn(scripted, monkeypatch):
+    scripts, calls = scripted
+    # Course info, then the instructor's ratings, then the answer
+    scripts["full-model"] = [
+        _call("get_course_info", course_id="CSCE 310"),
+        _call("get_professor_summary", professor_name="Qing Hui"),
+        _text("CSCE 310 is offered; Dr. Hui is rated 4.5."),
+    ]
+    scripts["fast-model"] = [_call("get_professor_summary", professor_name="Qing Hui")]
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_professor_summary", lambda args: ({"rating": 4.5}, None))
+
+    with telemetry.trace_turn() as trace:
+        reply, _ = agent.run_academic_advisor_agent(
+            [{"role": "user", "parts": ["Is CSCE 310 offered, and who teaches it?"]}], model="full-model"
+        )
+
+    assert reply == "CSCE 310 is offered; Dr. Hui is rated 4.5."
+    assert calls == ["full-model", "fast-model", "full-model", "full-model"]
+    assert [span["tier"] for span in trace.to_dict()["model_calls"]] == ["full", "fast", "escalated", "full"]
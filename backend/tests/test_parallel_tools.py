@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from google.genai import types
+
+from app.agent import agent, async_agent, telemetry
+
+PREAMBLE = [
+    {"role": "user", "parts": ["SYSTEM PROMPT"]},
+    {"role": "model", "parts": ["Okay, let's start!"]},
+]
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def test_parallel_calls_keep_order_and_isolate_failures(monkeypatch):
+    started = threading.Barrier(3, timeout=2)
+    finished = []
+
+    def handler(name, delay, fail=False):
+        def run(args):
+            # All three are running at once, or the barrier times out
+            started.wait()
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError("upstream exploded")
+            finished.append(name)
+            return {"name": name}, None
+        return run
+
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "slow_tool", handler("slow_tool", 0.1))
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "broken_tool", handler("broken_tool", 0, fail=True))
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "fast_tool", handler("fast_tool", 0))
+
+    requests = []
+
+    def generate_content(model, contents, config):
+        requests.append(list(contents))
+        if contents[-1].role == "function":
+            return _response(types.Part.from_text(text="Done."))
+        return _response(*(
+            types.Part.from_function_call(name=name, args={})
+            for name in ("slow_tool", "broken_tool", "fast_tool")
+        ))
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    for flag in ("_CONTEXT_CACHE_ENABLED", "_PREFETCH_ENABLED", "_ROUTING_ENABLED", "_RESPONSE_CACHE_ENABLED"):
+        monkeypatch.setattr(agent, flag, False)
+
+    telemetry.METRICS.reset()
+    conversation = PREAMBLE + [{"role": "user", "parts": ["Look everything up"]}]
+    reply, _ = agent.run_academic_advisor_agent(conversation, cached_prefix=2)
+
+    assert reply == "Done."
+    # The failure did not stop the slower call beside it
+    assert sorted(finished) == ["fast_tool", "slow_tool"]
+
+    responses = [part.function_response for part in requests[-1][-1].parts]
+    assert [r.name for r in responses] == ["slow_tool", "broken_tool", "fast_tool"]
+    assert responses[0].response["output"] == {"name": "slow_tool"}
+    assert "upstream exploded" in responses[1].response["output"]["error"]
+    assert responses[2].response["output"] == {"name": "fast_tool"}
+
+    # The failure still counts as a tool error
+    tools = telemetry.METRICS.snapshot()["tools"]
+    assert tools["broken_tool"]["errors"] == 1
+    assert tools["slow_tool"]["errors"] == tools["fast_tool"]["errors"] == 0
+
+
+def test_failing_async_tool_is_counted_as_an_error(monkeypatch):
+    async def broken(args):
+        raise RuntimeError("upstream exploded")
+
+    monkeypatch.setitem(async_agent.ASYNC_TOOL_HANDLERS, "broken_tool", broken)
+    telemetry.METRICS.reset()
+
+    _, output, _ = asyncio.run(async_agent._call_tool_async("broken_tool", None, {}))
+
+    assert "upstream exploded" in output["error"]
+    assert telemetry.METRICS.snapshot()["tools"]["broken_tool"]["errors"] == 1
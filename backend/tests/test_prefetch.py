@@ -0,0 +1,118 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent.prefetch import Prefetcher
+from app.agent.tools import course_info_tool, rmp_tool
+
+
+def _search_output(*codes):
+    return {"data": {"courses": [{"course_code": code} for code in codes]}}
+
+
+def _course_output(*names):
+    sections = [{"instructor": [{"name": name}]} for name in names]
+    return {"data": {"registration_blocks": {"sections": sections}}}
+
+
+def _drain(prefetcher):
+    prefetcher._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Counts course and professor fetches; set `gate` to hold them until released."""
+    state = SimpleNamespace(courses=[], professors=[], gate=None, fail=False)
+
+    def course_info(course_id):
+        if state.gate is not None:
+            state.gate.wait(5)
+        state.courses.append(course_id)
+        return {"course_code": course_id}
+
+    def professor_summary(school_name, professor_name):
+        state.professors.append(professor_name)
+        if state.fail:
+            raise RuntimeError("RateMyProfessors is down")
+        return {"name": professor_name, "rating": 4.5}
+
+    monkeypatch.setattr(course_info_tool, "_COURSE_INFO_CACHE", {})
+    monkeypatch.setattr(course_info_tool, "get_unl_course_info", course_info)
+    monkeypatch.setattr(course_info_tool, "get_registration_blocks", lambda course_id: {"sections": []})
+    monkeypatch.setattr(rmp_tool, "_PROFESSOR_SUMMARY_CACHE", {})
+    monkeypatch.setattr(
+        rmp_tool, "get_rmp_client", lambda: SimpleNamespace(get_professor_summary=professor_summary)
+    )
+    return state
+
+
+def test_search_results_warm_course_info(upstream):
+    prefetcher = Prefetcher(max_courses=2)
+
+    assert prefetcher.after_tool("search_courses", _search_output("CSCE 310", "CSCE 310", "CSCE 361", "CSCE 322")) == 2
+    _drain(prefetcher)
+
+    assert sorted(upstream.courses) == ["CSCE 310", "CSCE 361"]
+    assert course_info_tool.is_course_info_cached("csce  310")
+    assert not course_info_tool.is_course_info_cached("CSCE 322")
+
+
+def test_cached_and_in_flight_ids_are_skipped(upstream):
+    course_info_tool.TOOL_HANDLERS["get_course_info"]({"course_id": "CSCE 310"})
+    upstream.gate = threading.Event()
+    prefetcher = Prefetcher()
+
+    # CSCE 310 is cached; CSCE 361 is fetched once and then in flight
+    assert prefetcher.after_tool("search_courses", _search_output("CSCE 310", "CSCE 361")) == 1
+    assert prefetcher.after_tool("search_courses", _search_output("CSCE 361")) == 0
+
+    upstream.gate.set()
+    _drain(prefetcher)
+    assert upstream.courses == ["CSCE 310", "CSCE 361"]
+
+
+def test_outstanding_prefetches_are_capped(upstream):
+    upstream.gate = threading.Event()
+    prefetcher = Prefetcher(max_workers=1, max_pending=2, max_courses=5)
+
+    assert prefetcher.after_tool("search_courses", _search_output("CSCE 155", "CSCE 156", "CSCE 230")) == 2
+    assert prefetcher.after_tool("search_courses", _search_output("CSCE 231")) == 0
+
+    upstream.gate.set()
+    _drain(prefetcher)
+    assert sorted(upstream.courses) == ["CSCE 155", "CSCE 156"]
+    assert prefetcher._pending == 0
+
+
+def test_course_info_warms_distinct_professors(upstream):
+    prefetcher = Prefetcher()
+
+    output = _course_output("Qing Hui", "Staff", "Qing Hui", "TBA", "Chris Bourke")
+    assert prefetcher.after_tool("get_course_info", output) == 2
+    _drain(prefetcher)
+
+    assert sorted(upstream.professors) == ["Chris Bourke", "Qing Hui"]
+    assert rmp_tool.is_professor_summary_cached("Qing  Hui")
+    assert Prefetcher().after_tool("get_course_info", output) == 0
+
+
+def test_failed_prefetch_is_logged_and_frees_its_slot(upstream, capsys):
+    upstream.fail = True
+    prefetcher = Prefetcher(max_pending=1)
+
+    assert prefetcher.after_tool("get_course_info", _course_output("Qing Hui")) == 1
+    _drain(prefetcher)
+
+    assert "Prefetch {'professor_name': 'Qing Hui'} failed: RateMyProfessors is down" in capsys.readouterr().out
+    assert prefetcher._pending == 0
+    assert not rmp_tool.is_professor_summary_cached("Qing Hui")
+
+
+def test_other_tools_schedule_nothing(upstream):
+    prefetcher = Prefetcher()
+
+    assert prefetcher.after_tool("generate_schedule", {"success": True}) == 0
+    assert prefetcher.after_tool("search_courses", {"error": "boom"}) == 0
+    _drain(prefetcher)
+    assert upstream.courses == [] and upstream.professors == []
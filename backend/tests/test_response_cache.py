@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+
+from google.genai import types
+
+from app.agent import agent
+from app.agent.response_cache import ResponseCache
+from app.agent.tools import course_info_tool
+from app.agent.tools.course_info_tool import clear_course_info_cache
+
+PREAMBLE = [
+    {"role": "user", "parts": ["SYSTEM PROMPT"]},
+    {"role": "model", "parts": ["Okay, let's start!"]},
+]
+
+
+def _opener(text):
+    return PREAMBLE + [{"role": "user", "parts": [text]}]
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _install(monkeypatch, calls):
+    tool = {"name": "get_remaining_graduation_requirements", "args": {}}
+
+    def generate_content(model, contents, config):
+        calls.append(model)
+        if contents[-1].role == "function":
+            return _response(types.Part.from_text(text=f"Answer #{len(calls)}"))
+        return _response(types.Part.from_function_call(name=tool["name"], args=tool["args"]))
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", False)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "generate_schedule", lambda args: ({"success": True}, None))
+    return tool
+
+
+def _ask(text, history=None):
+    events = []
+    reply, _ = agent.run_academic_advisor_agent(history or _opener(text), tool_events=events, cached_prefix=2)
+    return reply, events
+
+
+def test_repeated_opener_is_served_from_cache(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache())
+    _install(monkeypatch, calls)
+
+    first = _ask("What should I take next semester?")
+    second = _ask("what should i take next semester")
+
+    assert first == second
+    assert len(calls) == 2
+    assert second[1][0]["name"] == "get_remaining_graduation_requirements"
+    assert agent.response_cache_stats()["hits"] == 1
+
+
+def test_near_duplicate_matches_but_course_numbers_must_agree(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache(similarity=0.8))
+    _install(monkeypatch, calls)
+
+    _ask("What classes should I take next semester?")
+    _ask("What should I take next semester?")
+    assert len(calls) == 2
+
+    _ask("Is CSCE 310 offered next semester with Qing Hui?")
+    _ask("Is CSCE 361 offered next semester with Qing Hui?")
+    assert len(calls) == 6
+
+
+def test_near_duplicates_are_opt_in_and_respect_negation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache())
+    _install(monkeypatch, calls)
+
+    _ask("What classes should I take next semester?")
+    _ask("What should I take next semester?")
+    assert len(calls) == 4
+
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache(similarity=0.8))
+    _ask("What should I take next semester?")
+    _ask("What should I not take next semester?")
+    _ask("What shouldn't I take next semester?")
+    _ask("What should I drop next semester?")
+    assert len(calls) == 12
+
+
+def test_course_data_change_invalidates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache())
+    _install(monkeypatch, calls)
+
+    _ask("What's left for my degree?")
+    clear_course_info_cache()
+    _ask("What's left for my degree?")
+
+    assert len(calls) == 4
+
+
+def test_refetched_course_data_invalidates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache())
+    tool = _install(monkeypatch, calls)
+    tool.update(name="get_course_info", args={"course_id": "CSCE 310"})
+
+    sections = [{"sectionNumber": "001"}]
+    monkeypatch.setattr(course_info_tool, "get_unl_course_info", lambda course_id: {"course_code": course_id})
+    monkeypatch.setattr(course_info_tool, "get_registration_blocks", lambda course_id: {"sections": list(sections)})
+    monkeypatch.setattr(course_info_tool, "_COURSE_INFO_CACHE", {})
+
+    _ask("Is CSCE 310 offered next semester?")
+    _ask("Is CSCE 310 offered next semester?")
+    assert len(calls) == 2
+
+    # The tool cache entry expires and a later turn elsewhere refetches it; the
+    # upstream data has changed, so the cached opener reply is no longer served
+    monkeypatch.setattr(course_info_tool, "_COURSE_INFO_TTL_SECONDS", 0)
+    sections.append({"sectionNumber": "002"})
+    history = _opener("hi") + [
+        {"role": "model", "parts": ["Hello!"]},
+        {"role": "user", "parts": ["Tell me about CSCE 310"]},
+    ]
+    _ask(None, history)
+    assert len(calls) == 4
+
+    _ask("Is CSCE 310 offered next semester?")
+    assert len(calls) == 6
+    assert agent.response_cache_stats()["hits"] == 1
+
+
+def test_later_turns_and_schedules_are_not_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "_response_cache", ResponseCache())
+    tool = _install(monkeypatch, calls)
+
+    history = _opener("hi") + [
+        {"role": "model", "parts": ["Hello!"]},
+        {"role": "user", "parts": ["What's left for my degree?"]},
+    ]
+    _ask(None, history)
+    _ask(None, history)
+    assert len(calls) == 4
+
+    tool.update(name="generate_schedule", args={"courses": ["CSCE 310"]})
+    _ask("Make me a schedule")
+    _ask("Make me a schedule")
+    assert len(calls) == 8
+    assert agent.response_cache_stats()["skipped"] == 2
@@ -0,0 +1,88 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+from PIL import Image
+
+from app import create_app
+from app.services import render_pool, schedule_batch, schedule_render
+from app.services.image_store import ImageStore
+from app.services.render_cache import RenderCache
+from app.services.render_jobs import RenderJobs
+
+_SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _course(code, days, start, end):
+    return {
+        "catalog": {"course_code": code},
+        "section": {"sectionNumber": "001", "meetings": [{"daysRaw": days, "startTime": start, "endTime": end}]},
+    }
+
+
+_OPTIONS = [
+    [_course("CSCE 310", "MWF", 930, 1020)],
+    [_course("CSCE 310", "TR", 1100, 1215)],
+    {"courses": [_course("MATH 314", "MWF", 1330, 1420)]},
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    """Renders stay in-process and out of the shared cache and image store."""
+    monkeypatch.setattr(schedule_render, "render_cache", RenderCache(max_entries=8))
+    monkeypatch.setattr(render_pool, "WORKERS", 0)
+    jobs = RenderJobs(ImageStore(tmp_path / "images", gc_interval_seconds=0))
+    monkeypatch.setattr(schedule_batch, "render_jobs", jobs)
+    return jobs
+
+
+@pytest.fixture()
+def client():
+    app = create_app()
+    app.config.update({"TESTING": True})
+    with app.test_client() as client:
+        yield client
+
+
+def test_batch_returns_image_ids_in_order(client, isolated):
+    response = client.post("/api/schedule/batch", json={"schedules": _OPTIONS, "format": "svg"})
+    assert response.status_code == 200
+    images = response.get_json()["images"]
+    assert len(images) == 3 and len({image["id"] for image in images}) == 3
+    assert images[0]["url"] == f"/api/schedule/image/{images[0]['id']}"
+
+    single = schedule_render.render_schedule(_OPTIONS[1], "svg")
+    assert isolated.wait(images[1]["id"], timeout=5).read_bytes() == single.data
+
+
+def test_svg_sprite_places_each_schedule_in_a_cell(client):
+    response = client.post("/api/schedule/batch?output=sprite&columns=2&width=400&height=300", json={"schedules": _OPTIONS})
+    assert response.mimetype == "image/svg+xml"
+    assert response.headers["X-Sprite-Columns"] == "2"
+    assert response.headers["X-Sprite-Cell"] == "400x300"
+
+    root = ET.fromstring(response.data)
+    assert (root.get("width"), root.get("height")) == ("800", "600")
+    cells = [(svg.get("x"), svg.get("y")) for svg in root.findall(f"{_SVG}svg")]
+    assert cells == [("0", "0"), ("400", "0"), ("0", "300")]
+
+
+def test_png_sprite_and_pdf(client):
+    body = {"schedules": _OPTIONS[:2], "format": "png", "width": 300, "height": 200}
+    sprite = client.post("/api/schedule/batch", json={**body, "output": "sprite"})
+    assert sprite.headers["X-Sprite-Cell"] == "600x400"
+    assert Image.open(io.BytesIO(sprite.data)).size == (1200, 400)
+
+    pdf = client.post("/api/schedule/batch", json={**body, "output": "pdf"})
+    assert pdf.mimetype == "application/pdf"
+    assert pdf.data.startswith(b"%PDF") and b"/Count 2" in pdf.data
+
+
+def test_batch_rejects_bad_requests(client):
+    assert client.post("/api/schedule/batch", json={}).status_code == 400
+    assert client.post("/api/schedule/batch", json={"schedules": []}).status_code == 400
+    assert client.post("/api/schedule/batch", json={"schedules": ["CSCE 310"]}).status_code == 400
+    assert client.post("/api/schedule/batch", json={"schedules": _OPTIONS, "output": "gif"}).status_code == 400
+    too_many = {"schedules": [_OPTIONS[0]] * (schedule_batch.MAX_SCHEDULES + 1)}
+    assert client.post("/api/schedule/batch", json=too_many).status_code == 400
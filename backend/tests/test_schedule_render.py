@@ -0,0 +1,177 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+from PIL import Image
+
+from app import create_app
+from app.routes import schedule as schedule_routes
+from app.services import render_pool, schedule_render, schedule_visualizer
+from app.services.image_store import ImageStore
+from app.services.render_cache import RenderCache
+from app.services.schedule_render import render_png, render_schedule, render_svg
+from app.services.schedule_visualizer import assign_colors, extract_course_blocks
+
+_SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _course(code, section, days, start, end, instructor="Ada Lovelace"):
+    return {
+        "catalog": {"course_code": code},
+        "section": {
+            "sectionNumber": section,
+            "instructor": [{"name": instructor}],
+            "meetings": [{"daysRaw": days, "startTime": start, "endTime": end, "buildingCode": "AVH", "room": "106"}],
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, tmp_path):
+    """A fresh render cache per test, on disk under tmp_path; renders stay in-process."""
+    store = ImageStore(tmp_path / "renders", gc_interval_seconds=0)
+    cache = RenderCache(max_entries=8, store=store)
+    monkeypatch.setattr(schedule_render, "render_cache", cache)
+    monkeypatch.setattr(render_pool, "WORKERS", 0)
+    return cache
+
+
+@pytest.fixture()
+def client():
+    app = create_app()
+    app.config.update({"TESTING": True})
+    with app.test_client() as client:
+        yield client
+
+
+def test_svg_has_a_block_per_meeting_day():
+    courses = [_course("CSCE 310", "001", "MWF", 930, 1020), _course("MATH 314", "002", "TR", 1300, 1415, "O'Brien & Co")]
+    root = ET.fromstring(render_schedule(courses, "svg").data)
+
+    blocks = [rect for rect in root.iter(f"{_SVG}rect") if rect.get("stroke") == "#000000"]
+    assert len(blocks) == 5
+    text = " ".join(span.text or "" for span in root.iter(f"{_SVG}tspan"))
+    assert "CSCE 310 Sec 001" in text
+    assert "O'Brien & Co" in text
+
+
+def test_empty_schedule_renders_a_placeholder():
+    root = ET.fromstring(render_svg([]))
+    assert [span.text for span in root.iter(f"{_SVG}tspan")] == ["No courses scheduled"]
+
+
+def test_png_is_drawn_at_the_raster_scale():
+    image = Image.open(io.BytesIO(render_png([], width=300, height=200, scale=2)))
+    assert image.format == "PNG"
+    assert image.size == (600, 400)
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported schedule image format"):
+        render_schedule([], "gif")
+
+
+def test_generate_route_picks_the_format(client):
+    body = {"courses": [_course("CSCE 310", "001", "MWF", 930, 1020)]}
+
+    svg = client.post("/api/schedule/generate?format=svg", json=body)
+    assert svg.status_code == 200
+    assert svg.mimetype == "image/svg+xml"
+
+    png = client.post("/api/schedule/generate", json={**body, "format": "png"})
+    assert png.mimetype == "image/png"
+    assert png.data.startswith(b"\x89PNG")
+
+    assert client.post("/api/schedule/generate?format=gif", json=body).status_code == 400
+
+
+def test_colors_depend_only_on_the_set_of_classes():
+    csce = extract_course_blocks(_course("CSCE 310", "001", "MWF", 930, 1020))
+    math = extract_course_blocks(_course("MATH 314", "002", "TR", 1300, 1415))
+
+    assert assign_colors(csce + math) == assign_colors(math + csce)
+    assert assign_colors(csce)["CSCE 310 Sec 001"] == assign_colors(csce + math)["CSCE 310 Sec 001"]
+
+
+def test_repeat_renders_come_from_the_cache(cache, tmp_path):
+    courses = [_course("CSCE 310", "001", "MWF", 930, 1020), _course("MATH 314", "002", "TR", 1300, 1415)]
+
+    first = render_schedule(courses, "png")
+    again = render_schedule(list(reversed(courses)), "png")
+    assert again.key == first.key and again.data == first.data
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+    assert render_schedule(courses, "png", width=800).key != first.key
+    assert render_schedule(courses, "svg").key != first.key
+
+    # A new process finds the render in the image store, under the id the
+    # image route serves, and the store's limits apply to it
+    restarted = RenderCache(store=cache.store)
+    assert restarted.get(f"{first.key}.png") == first.data
+    assert restarted.stats()["disk_hits"] == 1
+    cache.store.max_bytes = 0
+    cache.store.gc()
+    assert RenderCache(store=cache.store).get(f"{first.key}.png") is None
+
+
+def test_generate_route_revalidates_with_etag(client, monkeypatch):
+    body = {"courses": [_course("CSCE 310", "001", "MWF", 930, 1020)], "format": "svg"}
+
+    first = client.post("/api/schedule/generate", json=body)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag
+
+    # Revalidating does not render, even when the render cache has lost the image
+    def no_render(*args, **kwargs):
+        raise AssertionError("rendered for a 304")
+
+    with monkeypatch.context() as m:
+        m.setattr(schedule_routes, "render_schedule", no_render)
+        repeat = client.post("/api/schedule/generate", json=body, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["ETag"] == etag
+
+    resized = client.post("/api/schedule/generate?width=800&height=500", json=body, headers={"If-None-Match": etag})
+    assert resized.status_code == 200
+    assert b'width="800" height="500"' in resized.data
+
+    assert client.post("/api/schedule/generate?width=10", json=body).status_code == 400
+
+
+def test_worker_pool_renders_the_same_bytes(monkeypatch):
+    blocks = schedule_render.course_blocks([_course("CSCE 310", "001", "MWF", 930, 1020)])
+    monkeypatch.setattr(render_pool, "WORKERS", 1)
+    try:
+        assert render_pool.render(blocks, "png", 400, 300) == render_png(blocks, 400, 300)
+        assert render_pool.render(blocks, "matplotlib", 400, 300).startswith(b"\x89PNG")
+    finally:
+        render_pool.shutdown()
+
+
+def test_broken_pool_falls_back_in_process(monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise render_pool.BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    monkeypatch.setattr(render_pool, "_get_pool", BrokenPool)
+    assert render_pool.render([], "png", 300, 200) == render_png([], 300, 200)
+
+
+def test_reused_figure_keeps_its_grid_and_matches_a_fresh_one():
+    first = extract_course_blocks(_course("CSCE 310", "001", "MWF", 930, 1020))
+    second = extract_course_blocks(_course("MATH 314", "002", "TR", 1300, 1415))
+
+    fresh = schedule_visualizer.render_blocks_png(first)
+    fig = schedule_visualizer.new_figure()
+    ax = fig.axes[0]
+    grid = list(ax.lines)
+    schedule_visualizer.render_blocks_png(second, fig)
+    schedule_visualizer.render_blocks_png([], fig)
+
+    assert schedule_visualizer.render_blocks_png(first, fig) == fresh
+    assert fig.axes == [ax] and list(ax.lines) == grid
+    # Only this render's blocks: three meetings, each a rectangle and a label
+    assert len(ax.patches) == 3
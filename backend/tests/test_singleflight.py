@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from app.agent.tools import course_info_tool
+from app.services.singleflight import SingleFlight
+
+
+def _run_concurrently(fn, count):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = fn()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"value": 42}
+
+    results = _run_concurrently(lambda: flight.do("CSCE 322", fetch), 8)
+
+    assert len(calls) == 1
+    assert all(r == {"value": 42} for r in results)
+    assert not flight.in_flight("CSCE 322")
+
+
+def test_followers_receive_leader_error():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing_fetch():
+        started.set()
+        release.wait()
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("key", failing_fetch)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.02)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert errors == ["upstream down", "upstream down"]
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+    flight.do("key", lambda: calls.append(1))
+    flight.do("key", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+@pytest.fixture()
+def stub_course_services(monkeypatch):
+    calls = {"catalog": 0, "registration": 0}
+
+    def fake_catalog(course_id):
+        calls["catalog"] += 1
+        time.sleep(0.05)
+        return {"course_code": course_id, "course_title": "PRGRM LANG CONCEPTS"}
+
+    def fake_registration(course_id):
+        calls["registration"] += 1
+        return {"sections": []}
+
+    monkeypatch.setattr(course_info_tool, "get_unl_course_info", fake_catalog)
+    monkeypatch.setattr(course_info_tool, "get_registration_blocks", fake_registration)
+    monkeypatch.setattr(course_info_tool, "_COURSE_INFO_CACHE", {})
+    return calls
+
+
+def test_course_info_handler_dedupes_concurrent_lookups(stub_course_services):
+    handler = course_info_tool._handle_get_course_info
+    results = _run_concurrently(lambda: handler({"course_id": "csce  322"}), 6)
+
+    assert stub_course_services == {"catalog": 1, "registration": 1}
+    assert all(result[0]["found"] for result in results)
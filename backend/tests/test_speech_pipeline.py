@@ -0,0 +1,69 @@
+import time
+
+from app.services.speech_pipeline import SentenceSplitter, pipeline_tts, split_sentences
+
+
+def test_splitter_emits_sentences_as_they_complete():
+    splitter = SentenceSplitter(min_chars=5)
+    assert splitter.feed("You should take CSCE") == []
+    assert splitter.feed(" 322 next. It's a gr") == ["You should take CSCE 322 next."]
+    assert splitter.feed("eat class!") == []
+    assert splitter.flush() == ["It's a great class!"]
+
+
+def test_short_fragments_are_merged_with_the_next_sentence():
+    deltas = ["Hi! ", "Dr. Hui teaches it. ", "Want more?"]
+    assert list(split_sentences(deltas, min_chars=12)) == [
+        "Hi! Dr. Hui teaches it.",
+        "Want more?",
+    ]
+
+
+def test_decimals_do_not_split():
+    assert list(split_sentences(["Rated 4.5 out of 5 stars overall."], min_chars=1)) == [
+        "Rated 4.5 out of 5 stars overall."
+    ]
+
+
+def test_pipeline_preserves_order_and_overlaps_requests():
+    delays = {"first": 0.2, "second": 0.0, "third": 0.0}
+    started = []
+
+    def synthesize(sentence):
+        started.append(sentence)
+        time.sleep(delays[sentence])
+        return [sentence.encode(), b"|"]
+
+    begin = time.monotonic()
+    audio = b"".join(pipeline_tts(iter(["first", "second", "third"]), synthesize, lookahead=3))
+    elapsed = time.monotonic() - begin
+
+    assert audio == b"first|second|third|"
+    assert sorted(started) == ["first", "second", "third"]
+    assert elapsed < 0.35
+
+
+def test_abandoned_pipeline_closes_every_response():
+    opened, closed = [], []
+
+    class FakeResponse:
+        def __init__(self, sentence):
+            self.sentence = sentence
+            opened.append(sentence)
+
+        def __iter__(self):
+            return iter([self.sentence.encode()])
+
+        def close(self):
+            closed.append(self.sentence)
+
+    sentences = [f"Sentence number {i}." for i in range(6)]
+    audio = pipeline_tts(iter(sentences), FakeResponse, lookahead=2)
+    assert next(audio) == b"Sentence number 0."
+
+    # The client disconnects after the first chunk
+    audio.close()
+    deadline = time.monotonic() + 2
+    while sorted(closed) != sorted(opened) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert opened and sorted(closed) == sorted(opened)
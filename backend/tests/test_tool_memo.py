@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app.agent import agent, memo
+
+
+def _response(*parts):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+
+def _text(text):
+    return _response(types.Part.from_text(text=text))
+
+
+def _call(name, **args):
+    return _response(types.Part.from_function_call(name=name, args=args))
+
+
+def test_keys_ignore_case_spacing_and_argument_order():
+    same = memo.TurnMemo.key("search_courses", {"query": "Machine  Learning", "level": "400"})
+    assert memo.TurnMemo.key("search_courses", {"level": "400", "query": " machine learning"}) == same
+    assert memo.TurnMemo.key("search_courses", {"query": "databases", "level": "400"}) != same
+    assert memo.TurnMemo.key("get_course_info", {"query": "machine learning", "level": "400"}) != same
+
+
+def test_failed_call_is_not_remembered():
+    turn_memo = memo.TurnMemo()
+
+    def failing():
+        raise ValueError("upstream error")
+
+    with pytest.raises(ValueError):
+        turn_memo.call("get_course_info", {"course_id": "CSCE 310"}, failing)
+    assert turn_memo.call("get_course_info", {"course_id": "CSCE 310"}, lambda: "ok") == ("ok", False)
+
+
+@pytest.fixture()
+def scripted(monkeypatch):
+    """Serve scripted model responses and count tool runs."""
+    script = []
+    runs = []
+
+    def generate_content(model, contents, config):
+        return script.pop(0)
+
+    def course_info(args):
+        runs.append(args["course_id"])
+        return {"found": True, "message": "Course data retrieved successfully."}, "| table |"
+
+    monkeypatch.setattr(agent, "genai_client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    monkeypatch.setattr(agent, "_CONTEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(agent, "_PREFETCH_ENABLED", False)
+    monkeypatch.setattr(agent, "_ROUTING_ENABLED", False)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setitem(agent.TOOL_HANDLERS, "get_course_info", course_info)
+    return script, runs
+
+
+def test_duplicate_call_in_a_turn_reuses_the_first_result(scripted):
+    script, runs = scripted
+    script.extend([
+        _call("get_course_info", course_id="CSCE 310"),
+        _call("get_course_info", course_id="csce  310"),
+        _text("CSCE 310 is offered."),
+    ])
+    events = []
+    reply, chat = agent.run_academic_advisor_agent(
+        [{"role": "user", "parts": ["Is CSCE 310 offered?"]}], tool_events=events
+    )
+
+    assert reply == "CSCE 310 is offered."
+    assert runs == ["CSCE 310"]
+    assert "note" in events[1]["output"]
+    # The repeated call does not add the sections table to the chat again
+    assert chat == "| table |"
+
+
+def test_repeated_rounds_force_a_final_answer(scripted):
+    script, runs = scripted
+    script.extend([_call("get_course_info", course_id="CSCE 310")] * 3)
+    script.append(_text("CSCE 310 is offered in the spring."))
+    events = []
+    reply, _ = agent.run_academic_advisor_agent(
+        [{"role": "user", "parts": ["Is CSCE 310 offered?"]}], tool_events=events
+    )
+
+    assert reply == "CSCE 310 is offered in the spring."
+    assert runs == ["CSCE 310"]
+    assert [event["type"] for event in events] == ["tool_call"] * 3 + ["tool_loop"]
+    assert not agent._cacheable(events)
+
+
+def test_calls_made_in_a_new_turn_run_again(scripted):
+    script, runs = scripted
+    for _ in range(2):
+        script.extend([_call("get_course_info", course_id="CSCE 310"), _text("Yes.")])
+        agent.run_academic_advisor_agent([{"role": "user", "parts": ["Is CSCE 310 offered?"]}])
+
+    assert runs == ["CSCE 310", "CSCE 310"]
@@ -0,0 +1,54 @@
+from app.agent.tools.projection import project_tool_output
+
+
+def _course_info(sections):
+    return {
+        "found": True,
+        "data": {
+            "catalog": {"course_code": "CSCE 322", "course_title": "PRGRM LANG CONCEPTS", "Notes": "", "ACE": "", "Offered": []},
+            "registration_blocks": {"sections": sections},
+        },
+        "message": "Course data retrieved successfully.",
+    }
+
+
+def _section(number, instructor, days="MWF", start=930, end=1020):
+    return {
+        "sectionNumber": number,
+        "component": "LEC",
+        "credits": "3",
+        "openSeats": 4,
+        "waitlistOpen": False,
+        "instructor": [{"name": instructor}],
+        "meetings": [{"days": days, "startTime": start, "endTime": end, "location": "AVH 106"}],
+    }
+
+
+def test_course_info_is_flattened_and_deduplicated():
+    output = _course_info([_section("001", "Qing Hui"), _section("002", "Qing Hui", "TR", 1100, 1215)])
+
+    projected = project_tool_output("get_course_info", output)
+
+    assert projected["course"] == {"course_code": "CSCE 322", "course_title": "PRGRM LANG CONCEPTS"}
+    assert projected["instructors"] == {"I1": "Qing Hui"}
+    assert projected["sections"] == [
+        "001 LEC 3cr | MWF 09:30-10:20 @ AVH 106 | I1 | 4 open",
+        "002 LEC 3cr | TR 11:00-12:15 @ AVH 106 | I1 | 4 open",
+    ]
+    # The original result (sent to the frontend) is untouched
+    assert output["data"]["registration_blocks"]["sections"][0]["meetings"]
+
+
+def test_course_without_sections_keeps_empty_list():
+    projected = project_tool_output("get_course_info", _course_info([]))
+    assert projected["sections"] == []
+    assert "instructors" not in projected
+
+
+def test_other_tools_drop_empty_fields_only():
+    summary = {"name": "Qing Hui", "rating": 4.2, "would_take_again": None, "num_ratings": 0, "department": ""}
+    assert project_tool_output("get_professor_summary", summary) == {
+        "name": "Qing Hui",
+        "rating": 4.2,
+        "num_ratings": 0,
+    }
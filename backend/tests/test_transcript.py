@@ -0,0 +1,58 @@
+import pytest
+
+from app.agent.tools.transcript_tool import _handle_check_transcript
+from app.services.transcript import TranscriptIndex, get_transcript_index, normalize_course_code
+
+
+@pytest.mark.parametrize("raw, code", [
+    ("csce155h", "CSCE 155H"),
+    ("  MATH   208 ", "MATH 208"),
+    ("MATH106", "MATH 106"),
+    ("Human Geography", "HUMAN GEOGRAPHY"),
+])
+def test_normalize_course_code(raw, code):
+    assert normalize_course_code(raw) == code
+
+
+def test_index_of_shipped_transcript_matches_registrar_totals():
+    index = get_transcript_index()
+    assert index.hours_completed == 109.0  # careerTotals.combined.ehrs
+    assert index.gpa == 4.0
+    assert index.current_term == "Fall 2025"
+    assert index.in_progress == {"CSCE 322", "CSCE 401H", "CSCE 440", "CSCE 838"}
+    assert "CSCE 155H" in index.completed
+
+
+def test_lookup_statuses():
+    index = TranscriptIndex({
+        "academicHistory": [
+            {"termName": "Fall 2024", "status": "Completed", "courses": [
+                {"department": "CSCE", "number": "310H", "grade": "A", "hours": 3.0},
+                {"department": "MATH", "number": "314", "grade": "W", "hours": 3.0},
+            ], "transferBlocks": [
+                {"institution": "Test Credits", "courses": [{"title": "MATH106", "hours": 5.0}]},
+            ]},
+            {"termName": "Spring 2025", "status": "In Progress", "courses": [
+                {"department": "CSCE", "number": "322", "grade": None, "hours": 3.0},
+            ]},
+        ],
+    })
+
+    assert index.lookup("csce 310") == {
+        "course": "CSCE 310", "status": "completed", "term": "Fall 2024", "matched": "CSCE 310H", "grade": "A",
+    }
+    assert index.lookup("MATH 314")["status"] == "not_earned"
+    assert index.lookup("MATH 106")["status"] == "completed"
+    assert index.lookup("CSCE 322")["status"] == "in_progress"
+    assert index.lookup("CSCE 990") == {"course": "CSCE 990", "status": "not_taken"}
+    assert index.hours_completed == 8.0
+    assert index.hours_in_progress == 3.0
+
+
+def test_check_transcript_tool():
+    checked, chat = _handle_check_transcript({"course_ids": ["CSCE 322"]})
+    assert checked == {"courses": [{"course": "CSCE 322", "status": "in_progress", "term": "Fall 2025"}]}
+    assert chat is None
+
+    summary, _ = _handle_check_transcript({})
+    assert summary["summary"]["hours_in_progress"] == 12.0
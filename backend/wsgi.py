@@ -1,8 +1,12 @@
 import os
-from app import create_app
+from app import create_app, warm
 
 app = create_app()
 
+# With `gunicorn --preload`, load the agent runtime and matplotlib once in the parent
+if os.getenv("APP_PRELOAD", "0") == "1":
+    warm()
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
     app.run(host="0.0.0.0", port=port)